@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
+import asyncio
+import json
 from datetime import datetime, timedelta
+from app.cache import response_cache
+from app.config import settings
 from app.database import get_db
-from app.schemas import ArticleResponse, ArticleListResponse
-from app.services import ArticleService
+from app.schemas import ArticleResponse, ArticleListResponse, ArticleSearchResult, ArticleSearchResponse
+from app.services import ArticleService, scheduler_service
+from app.services.broadcast_service import broadcast_hub
+from app.services.export_service import ExportService, EXPORT_MEDIA_TYPES, parquet_available
+from app.scraper import DataNormalizer
 from app.models import Article
+from app.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 article_service = ArticleService()
+export_service = ExportService()
 
 
 @router.get("/", response_model=ArticleListResponse)
 async def get_articles(
-    skip: int = Query(0, ge=0, description="Number of articles to skip"),
+    request: Request,
+    skip: int = Query(0, ge=0, description="Number of articles to skip (prefer cursor)"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of articles to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     since: Optional[str] = Query(None, description="ISO format datetime, e.g., 2024-01-01T00:00:00"),
     category: Optional[str] = Query(None, description="Filter by category"),
     db: AsyncSession = Depends(get_db)
@@ -22,12 +34,21 @@ async def get_articles(
     """
     Get articles with optional filters
     
-    - **skip**: Pagination offset
+    - **skip**: Pagination offset (deprecated, deep offsets are slow; ignored when cursor is set)
     - **limit**: Maximum number of results
+    - **cursor**: Opaque cursor returned as next_cursor; pass it with the same filters to get the next page
     - **since**: Only return articles created after this datetime
     - **category**: Filter by category (news, lifestyle, entertainment, etc.)
+    
+    **total** is exact for small result sets; for large ones it is an estimate
+    and **total_is_estimate** is true.
     """
     try:
+        # Served from cache until the next fetch commits new articles
+        cached, cache_key = await response_cache.get(request)
+        if cached is not None:
+            return cached
+        
         # Parse since parameter or default to last 3 days
         since_dt = None
         if since:
@@ -39,24 +60,39 @@ async def get_articles(
             # Default: only show articles from last 3 days
             since_dt = datetime.utcnow() - timedelta(days=3)
         
-        # Get articles
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        # Get one extra article to know whether there is a next page
         articles = await article_service.get_articles(
             db=db,
             skip=skip,
-            limit=limit,
+            limit=limit + 1,
             since=since_dt,
-            category=category
+            category=category,
+            after=after
         )
         
-        # Get total count (simplified - in production, use a separate count query)
-        total = len(articles)
+        next_cursor = None
+        if len(articles) > limit:
+            articles = articles[:limit]
+            last = articles[-1]
+            next_cursor = encode_cursor(last.published_at, last.id)
+        
+        total, total_is_estimate = await article_service.count_articles(db, since=since_dt, category=category)
         
-        return ArticleListResponse(
+        return await response_cache.store(request, cache_key, ArticleListResponse(
             articles=articles,
             total=total,
-            page=skip // limit + 1,
-            page_size=limit
-        )
+            total_is_estimate=total_is_estimate,
+            page=1 if cursor else skip // limit + 1,
+            page_size=limit,
+            next_cursor=next_cursor
+        ))
     
     except HTTPException:
         raise
@@ -64,6 +100,158 @@ async def get_articles(
         raise HTTPException(status_code=500, detail=f"Error fetching articles: {str(e)}")
 
 
+@router.get("/export")
+async def export_articles(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$", description="ndjson, csv or parquet"),
+    since: Optional[str] = Query(None, description="Watermark: only articles created at or after this ISO datetime"),
+    after_id: Optional[int] = Query(None, ge=0, description="Resume after this article ID"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+):
+    """
+    Stream all matching articles for bulk download
+    
+    - **format**: `ndjson` (one JSON object per line), `csv`, or `parquet` (needs pyarrow on the server)
+    - **since**: Only export articles created at or after this datetime (use the last export's max created_at)
+    - **after_id**: Resume an interrupted export after the last ID received
+    - **category**: Filter by category
+    
+    Rows are ordered by created_at, then id, and streamed from a server-side
+    cursor, so memory use does not grow with the size of the export.
+    """
+    since_dt = None
+    if since:
+        try:
+            since_dt = datetime.fromisoformat(since.replace('Z', '+00:00'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid datetime format. Use ISO format.")
+    
+    if format == 'parquet' and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server. Use ndjson or csv.")
+    
+    rows = export_service.stream_rows(since=since_dt, category=category, after_id=after_id)
+    if format == 'csv':
+        body = export_service.csv_chunks(rows)
+    elif format == 'parquet':
+        body = export_service.parquet_chunks(rows)
+    else:
+        body = export_service.ndjson_chunks(rows)
+    
+    filename = f"articles-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/stream")
+async def stream_articles(
+    request: Request,
+    category: Optional[List[str]] = Query(None, description="Only these categories (repeatable)"),
+    source_id: Optional[List[int]] = Query(None, description="Only these sources (repeatable)")
+):
+    """
+    Live feed of new articles as Server-Sent Events
+    
+    - **category**: Only articles in these categories
+    - **source_id**: Only articles from these sources
+    
+    Each new article is sent as an `article` event as soon as its fetch commits.
+    A client that reads too slowly loses its oldest queued events and receives
+    a `dropped` event with the running count. Comment lines are sent as
+    keep-alives while idle.
+    """
+    try:
+        subscription = broadcast_hub.subscribe(category, source_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def events():
+        reported_dropped = 0
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.stream_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if subscription.dropped != reported_dropped:
+                    reported_dropped = subscription.dropped
+                    yield f"event: dropped\ndata: {json.dumps({'count': reported_dropped})}\n\n"
+                
+                data = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+                yield f"id: {event['id']}\nevent: article\ndata: {data}\n\n"
+        finally:
+            broadcast_hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Let events through reverse proxies immediately
+        }
+    )
+
+
+@router.get("/search", response_model=ArticleSearchResponse)
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text (Thai or English)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, le=500, description="Number of results to skip"),
+    since: Optional[str] = Query(None, description="ISO format datetime, e.g., 2024-01-01T00:00:00"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over article titles, summaries and content
+    
+    - **q**: Search text; Thai is segmented into words, and every word must match
+    - **limit**: Maximum number of results
+    - **offset**: Number of results to skip
+    - **since**: Only search articles created after this datetime
+    - **category**: Filter by category
+    
+    Results are ranked best first; title matches weigh more than body matches.
+    **snippet** is HTML-escaped with matched words wrapped in `<mark>`.
+    """
+    try:
+        since_dt = None
+        if since:
+            try:
+                since_dt = datetime.fromisoformat(since.replace('Z', '+00:00'))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid datetime format. Use ISO format.")
+        
+        matches = await article_service.search_articles(
+            db=db,
+            query_text=q,
+            limit=limit,
+            offset=offset,
+            since=since_dt,
+            category=category
+        )
+        
+        terms = DataNormalizer.search_terms(q).split()
+        results = [
+            ArticleSearchResult(
+                **ArticleResponse.model_validate(article).model_dump(),
+                rank=rank,
+                snippet=DataNormalizer.highlight(article.summary or article.content or article.title, terms)
+            )
+            for article, rank in matches
+        ]
+        
+        return ArticleSearchResponse(results=results, query=q, count=len(results))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching articles: {str(e)}")
+
+
 @router.get("/{article_id}", response_model=ArticleResponse)
 async def get_article(
     article_id: int,
@@ -91,19 +279,21 @@ async def trigger_fetch(
     """
     Manually trigger article fetching from all sources
     
-    This endpoint is useful for testing or forcing an immediate fetch
+    Every active source is made due and the scheduler leader fetches them,
+    so a manual fetch never overlaps the scheduled one. This returns once
+    the fetch is queued; new articles arrive through /articles/stream.
     """
     try:
-        results = await article_service.fetch_from_all_sources(db)
+        sources_due = await article_service.mark_sources_due(db)
         
         return {
-            "status": "success",
-            "total_new_articles": results['total_new'],
-            "by_source": results['by_source']
+            "status": "queued",
+            "sources_due": sources_due,
+            "started_here": scheduler_service.run_fetch_now()
         }
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching articles: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queueing fetch: {str(e)}")
 
 
 @router.post("/fetch/{source_id}", response_model=dict)
@@ -135,13 +325,14 @@ async def trigger_fetch_by_source(
             raise HTTPException(status_code=400, detail=f"Source '{source.name}' is not active")
         
         # Fetch from this source
-        count = await article_service.fetch_from_source(db, source)
+        inserted = await article_service.fetch_from_source(db, source)
         
         return {
             "status": "success",
             "source_id": source_id,
             "source_name": source.name,
-            "new_articles": count
+            "new_articles": len(inserted),
+            "new_article_ids": [article['id'] for article in inserted]
         }
     
     except HTTPException:
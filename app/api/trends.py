@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from datetime import datetime, date, timedelta
+from datetime import datetime, timedelta
+from app.cache import response_cache
 from app.database import get_db
 from app.schemas import TrendListResponse
 from app.services import TrendService
+from app.services.trend_service import trend_today
 
 router = APIRouter(prefix="/trends", tags=["trends"])
 trend_service = TrendService()
@@ -12,27 +13,32 @@ trend_service = TrendService()
 
 @router.get("/today", response_model=TrendListResponse)
 async def get_today_trends(
+    request: Request,
     limit: int = Query(20, ge=1, le=100, description="Maximum number of trends to return"),
+    rank: str = Query("score", pattern="^(score|frequency)$", description="Rank by burst score or raw frequency"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get today's trending keywords
     
     - **limit**: Maximum number of trends to return
+    - **rank**: `score` (rising against the keyword's usual rate) or `frequency` (raw count)
     """
     try:
-        today = date.today()
+        today = trend_today()
         
-        # Extract trends if not already done
-        await trend_service.extract_trends_for_date(db, today)
+        # Keyed by the date too, so the entry is not served past midnight
+        cached, cache_key = await response_cache.get(request, vary=today.isoformat())
+        if cached is not None:
+            return cached
         
-        # Get trends
-        trends = await trend_service.get_trends_for_date(db, today, limit)
+        # Trends are counted at ingest, so this is a top-K index read
+        trends = await trend_service.get_trends_for_date(db, today, limit, rank=rank)
         
-        return TrendListResponse(
+        return await response_cache.store(request, cache_key, TrendListResponse(
             trends=trends,
             date=datetime.combine(today, datetime.min.time())
-        )
+        ))
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trends: {str(e)}")
@@ -40,8 +46,10 @@ async def get_today_trends(
 
 @router.get("/date/{target_date}", response_model=TrendListResponse)
 async def get_trends_by_date(
+    request: Request,
     target_date: str,
     limit: int = Query(20, ge=1, le=100, description="Maximum number of trends to return"),
+    rank: str = Query("score", pattern="^(score|frequency)$", description="Rank by burst score or raw frequency"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -49,24 +57,26 @@ async def get_trends_by_date(
     
     - **target_date**: Date in YYYY-MM-DD format
     - **limit**: Maximum number of trends to return
+    - **rank**: `score` (rising against the keyword's usual rate) or `frequency` (raw count)
     """
     try:
+        cached, cache_key = await response_cache.get(request)
+        if cached is not None:
+            return cached
+        
         # Parse date
         try:
             dt = datetime.strptime(target_date, "%Y-%m-%d").date()
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
         
-        # Extract trends if not already done
-        await trend_service.extract_trends_for_date(db, dt)
-        
-        # Get trends
-        trends = await trend_service.get_trends_for_date(db, dt, limit)
+        # Trends are counted at ingest, so this is a top-K index read
+        trends = await trend_service.get_trends_for_date(db, dt, limit, rank=rank)
         
-        return TrendListResponse(
+        return await response_cache.store(request, cache_key, TrendListResponse(
             trends=trends,
             date=datetime.combine(dt, datetime.min.time())
-        )
+        ))
     
     except HTTPException:
         raise
@@ -76,6 +86,7 @@ async def get_trends_by_date(
 
 @router.get("/categories", response_model=dict)
 async def get_trending_categories(
+    request: Request,
     days: int = Query(7, ge=1, le=30, description="Number of days to look back"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of categories"),
     db: AsyncSession = Depends(get_db)
@@ -87,13 +98,17 @@ async def get_trending_categories(
     - **limit**: Maximum number of categories to return
     """
     try:
+        cached, cache_key = await response_cache.get(request)
+        if cached is not None:
+            return cached
+        
         since = datetime.utcnow() - timedelta(days=days)
         categories = await trend_service.get_trending_categories(db, since, limit)
         
-        return {
+        return await response_cache.store(request, cache_key, {
             "categories": categories,
             "period_days": days
-        }
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trending categories: {str(e)}")
@@ -101,6 +116,7 @@ async def get_trending_categories(
 
 @router.get("/sources", response_model=dict)
 async def get_top_sources(
+    request: Request,
     days: int = Query(7, ge=1, le=30, description="Number of days to look back"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of sources"),
     db: AsyncSession = Depends(get_db)
@@ -112,13 +128,17 @@ async def get_top_sources(
     - **limit**: Maximum number of sources to return
     """
     try:
+        cached, cache_key = await response_cache.get(request)
+        if cached is not None:
+            return cached
+        
         since = datetime.utcnow() - timedelta(days=days)
         sources = await trend_service.get_top_sources(db, since, limit)
         
-        return {
+        return await response_cache.store(request, cache_key, {
             "sources": sources,
             "period_days": days
-        }
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching top sources: {str(e)}")
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from urllib.parse import urlencode
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """In-process LRU store with per-entry TTL (also the local stand-in for the shared backend)"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._generation = 0
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    async def get_generation(self) -> int:
+        return self._generation
+    
+    async def bump_generation(self) -> int:
+        self._generation += 1
+        # Entries of older generations can never be read again
+        self._entries.clear()
+        return self._generation
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Redis store shared by all workers and replicas, so one bump invalidates everywhere"""
+    
+    GENERATION_KEY = 'cache:generation'
+    
+    def __init__(self, url: str):
+        # Optional dependency, only needed when CACHE_BACKEND=redis
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+    
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self._redis.set(key, value, ex=ttl)
+    
+    async def get_generation(self) -> int:
+        value = await self._redis.get(self.GENERATION_KEY)
+        return int(value) if value else 0
+    
+    async def bump_generation(self) -> int:
+        return await self._redis.incr(self.GENERATION_KEY)
+    
+    def __len__(self) -> int:
+        return 0
+
+
+class ResponseCache:
+    """
+    Cache of serialized JSON responses for read endpoints
+    
+    Keys combine the path, the normalized query string and a generation
+    counter. Ingest bumps the generation after committing new articles, which
+    invalidates every cached response at once. With the in-process backend
+    each worker has its own generation: other workers only see an ingest
+    through the STREAM_PG_NOTIFY bridge, and without it serve stale responses
+    for up to CACHE_TTL_SECONDS. Responses carry an ETag so clients can
+    revalidate with If-None-Match.
+    """
+    
+    def __init__(self):
+        self._backend = None
+        self.enabled = settings.cache_enabled
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'errors': 0}
+    
+    @property
+    def backend(self):
+        """Get the backend, creating it on first use"""
+        if self._backend is None:
+            if settings.cache_backend == 'redis':
+                try:
+                    self._backend = RedisCacheBackend(settings.cache_redis_url)
+                    logger.info("Response cache using Redis")
+                except ImportError:
+                    logger.warning("CACHE_BACKEND=redis but the 'redis' package is not installed, using in-process cache")
+            if self._backend is None:
+                self._backend = MemoryCacheBackend(settings.cache_max_entries)
+                if not settings.stream_pg_notify:
+                    logger.warning(
+                        "In-process response cache without STREAM_PG_NOTIFY: with several workers, "
+                        f"others serve stale responses for up to {settings.cache_ttl_seconds}s after an ingest"
+                    )
+        return self._backend
+    
+    @staticmethod
+    def _key(request: Request, generation: int, vary: Optional[str] = None) -> str:
+        # Sorted, without empty values, so equivalent query strings share an entry
+        params = sorted((k, v) for k, v in request.query_params.multi_items() if v != '')
+        key = f"resp:{generation}:{request.url.path}?{urlencode(params)}"
+        return key if vary is None else f"{key}#{vary}"
+    
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    
+    @staticmethod
+    def _build_response(request: Request, etag: str, body: bytes) -> Response:
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f"public, max-age={settings.cache_client_max_age}"
+        }
+        
+        if_none_match = request.headers.get('if-none-match', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*':
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=body, media_type='application/json', headers=headers)
+    
+    async def get(self, request: Request, vary: Optional[str] = None) -> Tuple[Optional[Response], Optional[str]]:
+        """
+        Look up a cached response for the request
+        
+        vary adds anything else the response depends on to the key, such as
+        the date an endpoint resolved "today" to. Returns (response, key): the
+        response is None on a miss, and key is then passed to store().
+        """
+        if not self.enabled:
+            return None, None
+        
+        try:
+            generation = await self.backend.get_generation()
+            key = self._key(request, generation, vary)
+            cached = await self.backend.get(key)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Response cache lookup failed: {e}")
+            return None, None
+        
+        if cached is None:
+            self._stats['misses'] += 1
+            return None, key
+        
+        self._stats['hits'] += 1
+        etag, body = cached.split(b'\n', 1)
+        response = self._build_response(request, etag.decode(), body)
+        if response.status_code == 304:
+            self._stats['not_modified'] += 1
+        return response, key
+    
+    async def store(self, request: Request, key: Optional[str], content: Any) -> Response:
+        """Serialize content, cache it under key, and return it with ETag/Cache-Control headers"""
+        body = json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = self._etag(body)
+        
+        if key is not None:
+            try:
+                await self.backend.set(key, etag.encode() + b'\n' + body, settings.cache_ttl_seconds)
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"Response cache store failed: {e}")
+        
+        response = self._build_response(request, etag, body)
+        if response.status_code == 304:
+            self._stats['not_modified'] += 1
+        return response
+    
+    async def invalidate(self):
+        """Invalidate all cached responses (called after new data is committed)"""
+        if not self.enabled:
+            return
+        
+        try:
+            generation = await self.backend.bump_generation()
+            logger.debug(f"Response cache generation is now {generation}")
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Response cache invalidation failed: {e}")
+    
+    def stats(self) -> dict:
+        """Get hit/miss statistics"""
+        return {
+            **self._stats,
+            'enabled': self.enabled,
+            'entries': len(self._backend) if self._backend is not None else 0
+        }
+
+
+# Global response cache instance
+response_cache = ResponseCache()
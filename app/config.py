@@ -18,6 +18,23 @@ class Settings(BaseSettings):
     api_workers: int = 4
     api_key: str = "change-this-secret-key"
     cors_origins: Union[str, List[str]] = "*"
+    api_count_exact_limit: int = 10000  # Larger list totals are planner estimates
+    search_candidate_limit: int = 1000  # Newest matches ranked per search
+    export_batch_size: int = 1000  # Rows per server-side cursor fetch in /articles/export
+    
+    # Response cache (read endpoints, invalidated when ingest commits new articles)
+    cache_enabled: bool = True
+    cache_backend: str = "memory"  # 'memory' (per process) or 'redis' (shared, requires the 'redis' package)
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_ttl_seconds: int = 300  # Upper bound on staleness when a worker misses an invalidation (memory backend without stream_pg_notify)
+    cache_max_entries: int = 1000
+    cache_client_max_age: int = 15  # Cache-Control max-age sent to clients
+    
+    # Live feed (/articles/stream)
+    stream_queue_size: int = 100  # Events buffered per subscriber before the oldest are dropped
+    stream_max_subscribers: int = 1000  # Per worker
+    stream_keepalive_seconds: int = 15
+    stream_pg_notify: bool = True  # Relay new articles to every worker via Postgres LISTEN/NOTIFY
     
     @field_validator('cors_origins', mode='before')
     @classmethod
@@ -31,21 +48,83 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(',') if origin.strip()]
         return ["*"]
     
+    @field_validator('simhash_max_distance')
+    @classmethod
+    def check_simhash_max_distance(cls, v):
+        """The SimHash band index only finds every match within bands - 1 bits"""
+        if not 0 <= v <= 3:
+            raise ValueError("SIMHASH_MAX_DISTANCE must be 0-3: the band index (4 bands of 16 bits) misses farther matches")
+        return v
+    
     # Scraper
     scraper_user_agent: str = "ThaiNewsBot/1.0 (+https://yourwebsite.com/bot)"
     scraper_timeout: int = 30
-    scraper_max_retries: int = 3
-    scraper_delay_seconds: int = 2
+    scraper_max_retries: int = 3  # Retries of timeouts, connection errors, 429 and 5xx
+    scraper_delay_seconds: float = 2  # Sustained per-host request spacing, and the retry backoff base
+    scraper_host_burst: int = 2  # Requests a host may get back to back before spacing applies
+    scraper_retry_max_delay: float = 30.0  # Longest retry wait (longer Retry-After parks the source)
+    scraper_breaker_failures: int = 3  # Consecutive failed fetches before a source is parked
+    scraper_breaker_cooldown_minutes: int = 30  # First parking period, doubled on each further trip
+    scraper_breaker_max_cooldown_minutes: int = 720
     scraper_respect_robots_txt: bool = True
+    scraper_max_concurrency: int = 10  # Sources fetched in parallel
+    scraper_max_connections_per_host: int = 2
+    scraper_source_timeout: int = 60  # Seconds allowed per source, including robots.txt
+    html_max_articles_per_fetch: int = 10  # Article pages followed per HTML listing fetch
+    html_article_concurrency: int = 3  # Article pages of one source fetched at once
+    html_article_timeout: int = 120  # Seconds for an HTML source's article pages, on top of the source timeout
+    html_article_max_attempts: int = 3  # Fetches of an article page that keeps failing before it is skipped
+    enrichment_enabled: bool = False  # Fetch article pages after ingest to fill in short content
+    enrichment_concurrency: int = 4  # Article pages fetched at once by the enrichment workers
+    enrichment_queue_size: int = 1000  # Articles waiting for enrichment (more are dropped)
+    enrichment_min_content_chars: int = 500  # Articles with less content than this are enriched
+    enrichment_min_extracted_chars: int = 200  # Shorter extracted text is treated as no article body
+    robots_ttl_hours: int = 24  # How long a fetched robots.txt is trusted
+    robots_error_ttl_minutes: int = 30  # How long a failed robots.txt fetch is remembered
+    robots_max_crawl_delay: float = 60.0  # Cap on Crawl-delay honoured per host
+    robots_cache_max_entries: int = 1000
+    dedupe_window_days: int = 7  # Content hashes kept in the in-memory dedupe index
+    simhash_max_distance: int = 3  # Max differing bits for near-duplicates (at most 3: 4 bands of 16 bits)
+    simhash_window_hours: int = 48  # How far back to look for near-duplicates
+    thai_dictionary_path: str = ""  # Word list for Thai segmentation (empty = built-in)
+    parser_executor: str = "process"  # 'process' (multi-core), 'thread' or 'inline'
+    parser_workers: int = 2
+    
+    # HTTP client (shared connection pool)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    http_http2: bool = False  # Requires the 'h2' package (pip install httpx[http2])
     
     # Scheduler
     scheduler_enabled: bool = True
-    scheduler_fetch_interval_minutes: int = 30
+    scheduler_fetch_interval_minutes: int = 30  # Default for sources without their own interval
+    scheduler_tick_seconds: int = 60  # How often due sources are checked
+    scheduler_min_interval_minutes: int = 5
+    scheduler_max_interval_minutes: int = 240
+    scheduler_jitter_ratio: float = 0.1
+    scheduler_leader_election: bool = True  # Only one worker/replica runs scheduled jobs
+    scheduler_leader_lock_key: int = 7242001  # Postgres advisory lock key
+    
+    # Trends
+    trend_baseline_alpha: float = 0.1  # EWMA weight of the newest day in keyword baselines
+    trend_baseline_min_rate: float = 0.00001  # Baselines that decay below this rate are dropped
+    trend_rescore_minutes: int = 15  # How often today's burst scores are refreshed
+    trend_timezone: str = "Asia/Bangkok"  # Where trend days start and end
     
     # Webhook Notifications (n8n)
     webhook_enabled: bool = False
     webhook_url: str = ""  # n8n webhook URL
     webhook_secret: str = ""  # Optional: for webhook authentication
+    webhook_batch_size: int = 100  # Articles per webhook request
+    webhook_linger_seconds: float = 2.0  # Wait after new articles so deliveries fill up
+    webhook_concurrency: int = 4  # Webhook requests in flight at once
+    webhook_poll_seconds: int = 10  # Outbox poll interval (picks up retries and other processes' rows)
+    webhook_timeout: float = 10.0
+    webhook_lease_seconds: int = 60  # Claimed rows are redelivered if not acknowledged in time
+    webhook_max_attempts: int = 12  # Then the row is kept as failed
+    webhook_backoff_base_seconds: float = 5.0
+    webhook_backoff_max_seconds: float = 3600.0
     
     # Logging
     log_level: str = "INFO"
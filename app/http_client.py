@@ -0,0 +1,127 @@
+import httpx
+import logging
+from typing import Dict, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Connection-pooling transport that records pool usage statistics"""
+
+    def __init__(self, stats: Dict[str, int], max_connections: int, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+        self._max_connections = max_connections
+        self._in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats['requests'] += 1
+
+        # Every slot busy: this request has to wait for a connection to free up
+        if self._in_flight >= self._max_connections:
+            self._stats['waited'] += 1
+
+        # httpcore only emits connect/TLS events when a new connection is opened,
+        # so any request without them was served from a kept-alive connection
+        parent_trace = request.extensions.get('trace')
+        stats = self._stats
+
+        async def trace(event_name: str, info: dict):
+            if event_name == 'connection.connect_tcp.started':
+                stats['connections_opened'] += 1
+            elif event_name == 'connection.start_tls.complete':
+                stats['tls_handshakes'] += 1
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions['trace'] = trace
+
+        self._in_flight += 1
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self._in_flight -= 1
+
+    def open_connections(self) -> int:
+        """Number of connections currently held by the pool"""
+        return len(self._pool.connections)
+
+
+class SharedHTTPClient:
+    """Application-scoped pooled HTTP client shared by scraper and webhooks"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[InstrumentedTransport] = None
+        self._stats = {
+            'requests': 0,
+            'connections_opened': 0,
+            'tls_handshakes': 0,
+            'waited': 0
+        }
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the pooled client from settings"""
+        http2 = settings.http_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+
+        self._transport = InstrumentedTransport(
+            self._stats,
+            max_connections=settings.http_max_connections,
+            limits=limits,
+            http2=http2
+        )
+
+        return httpx.AsyncClient(
+            transport=self._transport,
+            timeout=settings.scraper_timeout,
+            headers={"User-Agent": settings.scraper_user_agent}
+        )
+
+    async def start(self):
+        """Create the client (called from app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+            logger.info("Shared HTTP client started")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the shared client, creating it on first use outside the app lifespan"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def close(self):
+        """Close the client and all pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Shared HTTP client closed")
+        self._client = None
+
+    def stats(self) -> Dict[str, int]:
+        """Get connection pool statistics"""
+        open_connections = 0
+        if self._client is not None and not self._client.is_closed and self._transport is not None:
+            open_connections = self._transport.open_connections()
+
+        return {
+            **self._stats,
+            'connections_open': open_connections,
+            'connections_reused': max(self._stats['requests'] - self._stats['connections_opened'], 0)
+        }
+
+
+# Global shared HTTP client instance
+http_client = SharedHTTPClient()
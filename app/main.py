@@ -6,10 +6,16 @@ import logging
 import yaml
 from pathlib import Path
 
+from app.cache import response_cache
 from app.config import settings
 from app.database import init_db, AsyncSessionLocal
+from app.http_client import http_client
+from app.scraper import parse_pool, robots_cache, host_limiter, source_breakers
 from app.api import articles_router, trends_router, sources_router
 from app.services import scheduler_service
+from app.services.broadcast_service import broadcast_hub
+from app.services.webhook_service import webhook_notifier
+from app.services.enrichment_service import enrichment_service
 from app.models import Source
 from sqlalchemy import select
 
@@ -32,6 +38,18 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database initialized")
         
+        # Start shared HTTP connection pool
+        await http_client.start()
+        
+        # Relay new articles from the scheduler leader to this worker's live feed
+        await broadcast_hub.start()
+        
+        # Deliver queued webhook events (only where the scheduler runs, while this process is its leader)
+        await webhook_notifier.start()
+        
+        # Fetch full article text for new articles whose feed only had a summary
+        await enrichment_service.start()
+        
         # Load sources from config
         await load_sources_from_config()
         
@@ -45,6 +63,12 @@ async def lifespan(app: FastAPI):
         # Shutdown
         logger.info("Shutting down Thai News Scraper API")
         scheduler_service.shutdown()
+        await scheduler_service.release_leadership()
+        await broadcast_hub.stop()
+        await webhook_notifier.stop()
+        await enrichment_service.stop()
+        await http_client.close()
+        parse_pool.shutdown()
 
 
 async def load_sources_from_config():
@@ -71,7 +95,12 @@ async def load_sources_from_config():
                 )
                 existing = result.scalar_one_or_none()
                 
-                if not existing:
+                if existing:
+                    # Selector changes in the YAML apply to sources already stored
+                    if existing.config != source_config.get('config'):
+                        existing.config = source_config.get('config')
+                        logger.info(f"Updated config of source: {existing.name}")
+                else:
                     # Create new source
                     source = Source(
                         name=source_config['name'],
@@ -80,6 +109,7 @@ async def load_sources_from_config():
                         category=source_config.get('category'),
                         country=source_config.get('country', 'TH'),
                         language=source_config.get('language', 'th'),
+                        config=source_config.get('config'),
                         is_active=True
                     )
                     db.add(source)
@@ -127,7 +157,16 @@ async def health_check():
     return {
         "status": "healthy",
         "version": "1.0.0",
-        "scheduler": "running" if scheduler_service.scheduler.running else "stopped"
+        "scheduler": "running" if scheduler_service.scheduler.running else "stopped",
+        "scheduler_leader": scheduler_service.leader.is_leader,
+        "http_pool": http_client.stats(),
+        "robots_txt": robots_cache.stats(),
+        "host_rate_limits": host_limiter.stats(),
+        "source_breakers": source_breakers.stats(),
+        "response_cache": response_cache.stats(),
+        "live_feed": broadcast_hub.stats(),
+        "webhooks": webhook_notifier.stats(),
+        "enrichment": enrichment_service.stats()
     }
 
 
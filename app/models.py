@@ -1,8 +1,19 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ARRAY, Float, Date, ForeignKey
+from sqlalchemy import literal_column, Column, Integer, BigInteger, String, Text, Boolean, TIMESTAMP, ARRAY, Float, Date, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
+# Articles are indexed pre-segmented, so the 'simple' config (no stemming) fits Thai
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def build_search_vector(title_terms: str, body_terms: str):
+    """SQL expression for an article's search vector from segmented title and body text"""
+    return func.setweight(func.to_tsvector(SEARCH_CONFIG, title_terms), literal_column("'A'")).op('||')(
+        func.setweight(func.to_tsvector(SEARCH_CONFIG, body_terms), literal_column("'B'"))
+    )
+
 
 class Source(Base):
     """News source configuration"""
@@ -17,7 +28,13 @@ class Source(Base):
     language = Column(String(10), default='th')
     is_active = Column(Boolean, default=True)
     fetch_interval_minutes = Column(Integer, default=30)
+    adaptive_interval_minutes = Column(Integer)  # Interval adapted to publishing rate
+    next_fetch_at = Column(TIMESTAMP(timezone=True), index=True)
     last_fetched_at = Column(TIMESTAMP(timezone=True))
+    etag = Column(Text)  # Validators for conditional GET
+    last_modified = Column(String(64))
+    feed_hash = Column(String(64))  # SHA256 of last fetched body
+    config = Column(postgresql.JSONB)  # Type-specific settings, e.g. selectors of an 'html' source
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -36,14 +53,33 @@ class Article(Base):
     content = Column(Text)
     url = Column(Text, nullable=False, unique=True)
     author = Column(String(255))
-    category = Column(String(100), index=True)
+    category = Column(String(100))
     tags = Column(ARRAY(Text))
-    published_at = Column(TIMESTAMP(timezone=True), index=True)
+    published_at = Column(TIMESTAMP(timezone=True))
     fetched_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     content_hash = Column(String(64), nullable=False, unique=True, index=True)
     image_url = Column(Text)
     language = Column(String(10), default='th')
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), index=True)
+    simhash = Column(BigInteger)  # 64-bit SimHash for near-duplicate detection
+    simhash_bands = Column(postgresql.ARRAY(Integer))  # LSH band keys of simhash (postgresql.ARRAY for &&)
+    cluster_id = Column(Integer, ForeignKey("articles.id"), index=True)  # First article of a near-duplicate cluster
+    # Full-text vector of Thai-segmented title (weight A) and body (weight B); deferred, only search reads it
+    search_vector = deferred(Column(postgresql.TSVECTOR))
+    
+    __table_args__ = (
+        Index('ix_articles_simhash_bands', 'simhash_bands', postgresql_using='gin'),
+        Index('ix_articles_search_vector', 'search_vector', postgresql_using='gin'),
+        # Listing order (published_at DESC NULLS LAST, id DESC), with and without a category;
+        # the INCLUDE columns let per-category/per-source aggregates over a date range run index-only
+        Index(
+            'ix_articles_published_id',
+            published_at.desc().nulls_last(), id.desc(),
+            postgresql_include=['category', 'source_id', 'cluster_id']
+        ),
+        Index('ix_articles_category_published_id', category, published_at.desc().nulls_last(), id.desc()),
+        Index('ix_articles_source_published', source_id, published_at.desc()),
+    )
     
     # Relationships
     source = relationship("Source", back_populates="articles")
@@ -55,13 +91,70 @@ class Trend(Base):
     __tablename__ = "trends"
     
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, nullable=False, index=True)
+    date = Column(Date, nullable=False)
     keyword = Column(String(255), nullable=False)
     category = Column(String(100))
-    frequency = Column(Integer, default=1, index=True)
+    frequency = Column(Integer, default=1)
+    score = Column(Float, nullable=False, default=0.0)  # Burst score against the keyword's baseline rate
     article_ids = Column(ARRAY(Integer))
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('date', 'keyword', name='uq_trends_date_keyword'),
+        Index('ix_trends_date_frequency', 'date', 'frequency'),
+        Index('ix_trends_date_score', 'date', 'score'),
+    )
+
+
+class DailyArticleCount(Base):
+    """Articles counted towards trends per day (denominator for keyword rates)"""
+    __tablename__ = "daily_article_counts"
+    
+    date = Column(Date, primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+
+
+class KeywordBaseline(Base):
+    """Rolling per-keyword daily rate, updated once a day from the trend counters"""
+    __tablename__ = "keyword_baselines"
+    
+    keyword = Column(String(255), primary_key=True)
+    mean_rate = Column(Float, nullable=False, default=0.0)  # EWMA of daily share of articles
+    var_rate = Column(Float, nullable=False, default=0.0)  # EWMA variance of that share
+    days_seen = Column(Integer, nullable=False, default=0)
+    updated_date = Column(Date, nullable=False)
+
+
+class WebhookOutbox(Base):
+    """Webhook events waiting for delivery, written in the same transaction as the data they announce"""
+    __tablename__ = "webhook_outbox"
+    
+    id = Column(BigInteger, primary_key=True)
+    event = Column(String(50), nullable=False)  # 'new_articles'
+    payload = Column(postgresql.JSONB, nullable=False)  # One item of the event (e.g. one article)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    locked_until = Column(TIMESTAMP(timezone=True))  # Lease of the worker delivering it
+    last_error = Column(Text)
+    failed_at = Column(TIMESTAMP(timezone=True))  # Set when attempts are exhausted
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Only pending rows are ever polled
+        Index('ix_webhook_outbox_pending', 'next_attempt_at', postgresql_where=failed_at.is_(None)),
+    )
+
+
+class RobotsTxt(Base):
+    """Cached robots.txt per origin, so restarts do not refetch every file"""
+    __tablename__ = "robots_txt"
+    
+    origin = Column(Text, primary_key=True)  # scheme://host[:port]
+    status_code = Column(Integer, nullable=False)  # 0 when the fetch failed
+    body = Column(Text)
+    fetched_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
 
 
 class ContentIdea(Base):
@@ -0,0 +1,26 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(published_at: Optional[datetime], article_id: int) -> str:
+    """Encode the sort key of the last article on a page as an opaque cursor"""
+    payload = json.dumps(
+        [published_at.isoformat() if published_at else None, article_id],
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor back into (published_at, id); raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        published_at, article_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (
+            datetime.fromisoformat(published_at) if published_at else None,
+            int(article_id)
+        )
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
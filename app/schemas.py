@@ -21,6 +21,8 @@ class SourceCreate(SourceBase):
 
 class SourceResponse(SourceBase):
     id: int
+    adaptive_interval_minutes: Optional[int] = None
+    next_fetch_at: Optional[datetime] = None
     last_fetched_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
@@ -53,6 +55,7 @@ class ArticleResponse(ArticleBase):
     source_id: int
     fetched_at: datetime
     created_at: datetime
+    cluster_id: Optional[int] = None
     source: Optional[SourceResponse] = None
     
     class Config:
@@ -62,8 +65,21 @@ class ArticleResponse(ArticleBase):
 class ArticleListResponse(BaseModel):
     articles: List[ArticleResponse]
     total: int
+    total_is_estimate: bool = False
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+class ArticleSearchResult(ArticleResponse):
+    rank: float
+    snippet: Optional[str] = None  # HTML-escaped, matches wrapped in <mark>
+
+
+class ArticleSearchResponse(BaseModel):
+    results: List[ArticleSearchResult]
+    query: str
+    count: int
 
 
 # Trend Schemas
@@ -76,6 +92,7 @@ class TrendBase(BaseModel):
 class TrendResponse(TrendBase):
     id: int
     date: datetime
+    score: Optional[float] = None
     article_ids: Optional[List[int]] = None
     created_at: datetime
     
@@ -1,6 +1,14 @@
 # Scraper package initialization
 from app.scraper.rss_parser import RSSParser
+from app.scraper.html_scraper import HTMLScraper
+from app.scraper.content_extractor import ContentExtractor
 from app.scraper.normalizer import DataNormalizer
+from app.scraper.thai_tokenizer import ThaiTokenizer, get_tokenizer
 from app.scraper.deduplicator import Deduplicator
+from app.scraper.dedupe_index import DedupeIndex, dedupe_index
+from app.scraper.rate_limit import HostRateLimiter, CircuitBreaker, host_limiter, source_breakers
+from app.scraper.robots import RobotsCache, robots_cache
+from app.scraper.fetch_engine import FetchEngine
+from app.scraper.parse_pool import ParsePool, parse_pool
 
-__all__ = ['RSSParser', 'DataNormalizer', 'Deduplicator']
+__all__ = ['RSSParser', 'HTMLScraper', 'ContentExtractor', 'DataNormalizer', 'ThaiTokenizer', 'get_tokenizer', 'Deduplicator', 'DedupeIndex', 'dedupe_index', 'HostRateLimiter', 'CircuitBreaker', 'host_limiter', 'source_breakers', 'RobotsCache', 'robots_cache', 'FetchEngine', 'ParsePool', 'parse_pool']
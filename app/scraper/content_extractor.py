@@ -0,0 +1,163 @@
+import json
+import re
+from typing import Dict, List, Optional
+import logging
+from lxml import etree
+from app.scraper.html_scraper import HTMLScraper
+
+logger = logging.getLogger(__name__)
+
+# Never part of the article body
+STRIP_TAGS = ('script', 'style', 'noscript', 'template', 'iframe', 'form', 'nav', 'footer', 'aside', 'svg', 'button', 'select')
+
+POSITIVE_PATTERN = re.compile(r'article|body|content|entry|main|post|story|text|detail|news|blog', re.IGNORECASE)
+NEGATIVE_PATTERN = re.compile(
+    r'comment|footer|sidebar|related|share|social|advert|\bads?\b|promo|sponsor|menu|nav|widget|banner|popup|cookie|subscribe|breadcrumb|tag-?list|author-?box',
+    re.IGNORECASE
+)
+
+# Elements whose text counts as a paragraph of the body
+PARAGRAPH_TAGS = ('p', 'pre', 'blockquote', 'h2', 'h3', 'h4', 'li')
+BLOCK_TAGS = frozenset({'p', 'div', 'section', 'article', 'table', 'ul', 'ol', 'pre', 'blockquote', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+JSON_LD_XPATH = etree.XPath("//script[@type='application/ld+json']/text()")
+
+MIN_PARAGRAPH_CHARS = 25
+
+
+def _class_weight(element) -> int:
+    """Readability-style weight from class and id names"""
+    weight = 0
+    for value in (element.get('class'), element.get('id')):
+        if not value:
+            continue
+        if NEGATIVE_PATTERN.search(value):
+            weight -= 25
+        if POSITIVE_PATTERN.search(value):
+            weight += 25
+    return weight
+
+
+def _text(element) -> str:
+    return WHITESPACE_PATTERN.sub(' ', element.text_content()).strip()
+
+
+def _link_density(element, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(_text(link)) for link in element.iter('a'))
+    return min(link_length / text_length, 1.0)
+
+
+def _json_ld_body(tree) -> Optional[str]:
+    """articleBody from schema.org JSON-LD, which many news sites publish"""
+    for raw in JSON_LD_XPATH(tree):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                body = item.get('articleBody')
+                if isinstance(body, str) and body.strip():
+                    return body.strip()
+                stack.extend(value for key, value in item.items() if key == '@graph')
+    return None
+
+
+class ContentExtractor:
+    """
+    Main-content extraction in the spirit of Readability, on lxml
+
+    Every paragraph adds a score, based on its length and punctuation, to its
+    parent and half of that to its grandparent. Containers are then adjusted
+    by their class/id names and link density, and the paragraphs of the best
+    one are returned as text. A JSON-LD articleBody, when present, wins.
+    """
+
+    def __init__(self, min_length: int = 200):
+        self.min_length = min_length
+
+    def extract(self, content: bytes, url: str = '') -> Optional[str]:
+        """Main article text, paragraphs separated by blank lines, or None if nothing substantial"""
+        try:
+            tree = HTMLScraper.parse_document(content, url)
+        except (etree.ParserError, ValueError) as e:
+            logger.debug(f"Could not parse {url}: {e}")
+            return None
+
+        body = _json_ld_body(tree)
+        if body and len(body) >= self.min_length:
+            return body
+
+        etree.strip_elements(tree, *STRIP_TAGS, with_tail=False)
+
+        scores: Dict = {}
+        for paragraph in tree.iter(*PARAGRAPH_TAGS):
+            text = _text(paragraph)
+            if len(text) < MIN_PARAGRAPH_CHARS:
+                continue
+
+            # Thai separates clauses with spaces rather than commas, so count both sparingly
+            score = 1 + text.count(',') + text.count(' ') // 10 + min(len(text) // 100, 3)
+
+            parent = paragraph.getparent()
+            if parent is None:
+                continue
+            for ancestor, share in ((parent, 1.0), (parent.getparent(), 0.5)):
+                if ancestor is None:
+                    continue
+                if ancestor not in scores:
+                    scores[ancestor] = _class_weight(ancestor)
+                scores[ancestor] += score * share
+
+        if not scores:
+            return None
+
+        best = None
+        best_score = None
+        for candidate, score in scores.items():
+            score *= 1 - _link_density(candidate, len(_text(candidate)))
+            if best_score is None or score > best_score:
+                best, best_score = candidate, score
+
+        paragraphs = self._paragraphs(best)
+        text = '\n\n'.join(paragraphs)
+        if len(text) < self.min_length:
+            return None
+        return text
+
+    @staticmethod
+    def _paragraphs(container) -> List[str]:
+        """Text blocks of the chosen container, skipping link lists and boilerplate blocks"""
+        paragraphs = []
+        for element in container.iter(*PARAGRAPH_TAGS, 'div'):
+            # Divs only count when they hold text directly rather than other blocks
+            if element.tag == 'div' and any(child.tag in BLOCK_TAGS for child in element):
+                continue
+            if _class_weight(element) < 0:
+                continue
+
+            skip = False
+            for ancestor in element.iterancestors():
+                if ancestor is container:
+                    break
+                # Nested matches (a p inside a blockquote) are covered by the outer element;
+                # anything inside a share box or comment block is not body text
+                if ancestor.tag in PARAGRAPH_TAGS or _class_weight(ancestor) < 0:
+                    skip = True
+                    break
+            if skip:
+                continue
+
+            text = _text(element)
+            if not text or _link_density(element, len(text)) > 0.5:
+                continue
+            paragraphs.append(text)
+        return paragraphs
@@ -0,0 +1,80 @@
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Iterable, Optional, Tuple
+import logging
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models import Article
+
+logger = logging.getLogger(__name__)
+
+
+class DedupeIndex:
+    """
+    Process-level index of recent content hashes
+
+    Warmed from the database once, then updated as articles are inserted.
+    Hashes older than the window are evicted; anything missed here is still
+    caught by the unique constraint on insert.
+    """
+
+    def __init__(self, window_days: Optional[int] = None):
+        self.window = timedelta(days=window_days or settings.dedupe_window_days)
+        # 128-bit digest prefix -> last seen time; deque keeps eviction order
+        self._hashes: Dict[bytes, datetime] = {}
+        self._order: Deque[Tuple[datetime, bytes]] = deque()
+        self.warmed = False
+
+    @staticmethod
+    def _key(content_hash: str) -> bytes:
+        return bytes.fromhex(content_hash)[:16]
+
+    async def warm(self, db: AsyncSession):
+        """Load hashes inside the window from the database"""
+        since = datetime.now(timezone.utc) - self.window
+        result = await db.execute(
+            select(Article.content_hash, Article.created_at)
+            .where(Article.created_at >= since)
+            .order_by(Article.created_at)
+        )
+
+        self._hashes.clear()
+        self._order.clear()
+        for content_hash, created_at in result.all():
+            self._add(content_hash, created_at)
+
+        self.warmed = True
+        logger.info(f"Dedupe index warmed with {len(self._hashes)} hashes")
+
+    def _add(self, content_hash: str, seen_at: datetime):
+        key = self._key(content_hash)
+        self._hashes[key] = seen_at
+        self._order.append((seen_at, key))
+
+    def add_many(self, content_hashes: Iterable[str], seen_at: Optional[datetime] = None):
+        """Record hashes that are now stored in the database"""
+        seen_at = seen_at or datetime.now(timezone.utc)
+        for content_hash in content_hashes:
+            self._add(content_hash, seen_at)
+        self.evict()
+
+    def contains(self, content_hash: str) -> bool:
+        """Check if a hash was seen inside the window"""
+        return self._key(content_hash) in self._hashes
+
+    def evict(self, now: Optional[datetime] = None):
+        """Drop hashes older than the window"""
+        cutoff = (now or datetime.now(timezone.utc)) - self.window
+        while self._order and self._order[0][0] < cutoff:
+            seen_at, key = self._order.popleft()
+            # Only remove if the hash was not seen again later
+            if self._hashes.get(key) == seen_at:
+                del self._hashes[key]
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+# Global dedupe index instance
+dedupe_index = DedupeIndex()
@@ -0,0 +1,390 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+import logging
+import httpx
+from dateutil import parser as date_parser
+from lxml import etree, html as lxml_html
+from app.config import settings
+from app.http_client import http_client
+from app.scraper.rate_limit import request_with_retries, retry_after_seconds, source_breakers
+from app.scraper.robots import robots_cache
+
+logger = logging.getLogger(__name__)
+
+# "css selector::attr(name)" / "css selector::text"; XPath selectors start with "xpath:"
+SELECTOR_PATTERN = re.compile(r'^(?P<selector>.*?)(?:::(?:attr\((?P<attr>[\w:-]+)\)|(?P<text>text)))?\s*$', re.DOTALL)
+XPATH_PREFIX = 'xpath:'
+
+# Declared charset near the top of the page; UTF-8 when there is none
+CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+# Article fields read when a source does not configure its own selector
+DEFAULT_ARTICLE_SELECTORS = {
+    'title': ["meta[property='og:title']::attr(content)", 'h1'],
+    'summary': ["meta[property='og:description']::attr(content)", "meta[name='description']::attr(content)"],
+    'content': ['article', "[itemprop='articleBody']"],
+    'published_at': [
+        "meta[property='article:published_time']::attr(content)",
+        'time::attr(datetime)',
+        "[itemprop='datePublished']::attr(content)"
+    ],
+    'author': ["meta[name='author']::attr(content)", "[rel='author']"],
+    'image_url': ["meta[property='og:image']::attr(content)"],
+    'tags': ["meta[property='article:tag']::attr(content)"],
+}
+
+# schema.org types whose JSON-LD describes the article itself
+JSON_LD_ARTICLE_TYPES = frozenset({'Article', 'NewsArticle', 'ReportageNewsArticle', 'BlogPosting'})
+JSON_LD_XPATH = etree.XPath("//script[@type='application/ld+json']/text()")
+
+# Fields whose matched elements are kept as HTML (cleaned later by the normalizer)
+HTML_FIELDS = frozenset({'content'})
+LIST_FIELDS = frozenset({'tags'})
+
+# Article URLs whose failed fetches are counted; the oldest are forgotten past this
+MAX_TRACKED_PAGE_FAILURES = 5000
+
+
+class HTMLScraper:
+    """
+    Scraper for sources that only publish listing pages (Source.type == 'html')
+
+    A source's config (from sources.yaml) names a selector for article links
+    on the listing page and optional selectors for article fields:
+
+        config:
+          link_selector: "h3.post-title a::attr(href)"
+          max_articles: 10
+          article:
+            title: "h1.headline"
+            content: "xpath://div[@id='story']"
+
+    Selectors are CSS unless prefixed with "xpath:". A CSS selector returns
+    element text, or an attribute with "::attr(name)". Article fields fall
+    back to Open Graph / schema.org metadata, then to the page's JSON-LD
+    Article object, when not configured or not found.
+    """
+
+    def __init__(self):
+        self.user_agent = settings.scraper_user_agent
+        self.timeout = settings.scraper_timeout
+        self._compiled: Dict[str, Tuple[etree.XPath, Optional[str]]] = {}
+        self._page_failures: Dict[str, int] = {}
+
+    def _compile(self, spec: str) -> Tuple[etree.XPath, Optional[str]]:
+        """Compile a selector spec once into an XPath and an optional attribute"""
+        compiled = self._compiled.get(spec)
+        if compiled is None:
+            if spec.startswith(XPATH_PREFIX):
+                compiled = (etree.XPath(spec[len(XPATH_PREFIX):].strip()), None)
+            else:
+                # lxml's CSS support needs the cssselect package
+                from cssselect import GenericTranslator
+                match = SELECTOR_PATTERN.match(spec)
+                xpath = GenericTranslator().css_to_xpath(match.group('selector').strip())
+                compiled = (etree.XPath(xpath), match.group('attr'))
+            self._compiled[spec] = compiled
+        return compiled
+
+    def select(self, tree, spec: str, as_html: bool = False) -> List[str]:
+        """Values matched by a selector spec, in document order"""
+        xpath, attr = self._compile(spec)
+        values = []
+        for node in xpath(tree):
+            if isinstance(node, str):
+                value = str(node)
+            elif attr is not None:
+                value = node.get(attr)
+            elif as_html:
+                value = lxml_html.tostring(node, encoding='unicode')
+            else:
+                value = node.text_content()
+
+            if value and value.strip():
+                values.append(value.strip())
+        return values
+
+    @staticmethod
+    def _selectors(config: Dict, field: str) -> List[str]:
+        """Configured selectors for a field, then the metadata defaults"""
+        configured = (config.get('article') or {}).get(field) or []
+        if isinstance(configured, str):
+            configured = [configured]
+        return list(configured) + DEFAULT_ARTICLE_SELECTORS.get(field, [])
+
+    @staticmethod
+    def parse_document(content: bytes, url: str):
+        """Parse page bytes, decoded with the charset the page declares"""
+        match = CHARSET_PATTERN.search(content[:4096])
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+        try:
+            text = content.decode(encoding, errors='replace')
+        except LookupError:
+            text = content.decode('utf-8', errors='replace')
+        return lxml_html.fromstring(text, base_url=url)
+
+    @staticmethod
+    def json_ld_fields(tree) -> Dict:
+        """Article fields from the page's JSON-LD (schema.org Article/NewsArticle), if any"""
+        for script in JSON_LD_XPATH(tree):
+            try:
+                data = json.loads(script)
+            except ValueError:
+                continue
+
+            items = data if isinstance(data, list) else [data]
+            if isinstance(data, dict) and isinstance(data.get('@graph'), list):
+                items = data['@graph']
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                types = item.get('@type')
+                types = types if isinstance(types, list) else [types]
+                if not JSON_LD_ARTICLE_TYPES.intersection(t for t in types if isinstance(t, str)):
+                    continue
+
+                author, image = item.get('author'), item.get('image')
+                if isinstance(author, list):
+                    author = author[0] if author else None
+                if isinstance(author, dict):
+                    author = author.get('name')
+                if isinstance(image, list):
+                    image = image[0] if image else None
+                if isinstance(image, dict):
+                    image = image.get('url')
+                keywords = item.get('keywords')
+                if isinstance(keywords, str):
+                    keywords = [keyword.strip() for keyword in keywords.split(',')]
+
+                fields = {
+                    'title': item.get('headline') or item.get('name'),
+                    'summary': item.get('description'),
+                    'content': item.get('articleBody'),
+                    'published_at': item.get('datePublished'),
+                    'author': author,
+                    'image_url': image,
+                    'tags': [keyword for keyword in keywords or [] if isinstance(keyword, str) and keyword],
+                }
+                return {field: value for field, value in fields.items() if value and isinstance(value, (str, list))}
+        return {}
+
+    def extract_links(self, content: bytes, base_url: str, config: Dict) -> List[str]:
+        """Absolute article URLs from a listing page, de-duplicated in page order"""
+        tree = self.parse_document(content, base_url)
+        origin = urlparse(base_url).netloc
+        links = []
+        for href in self.select(tree, config['link_selector']):
+            url = urljoin(base_url, href).split('#', 1)[0]
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https'):
+                continue
+            # Listing pages link to other sites too; only follow the source's own unless allowed
+            if parsed.netloc != origin and not config.get('follow_external_links'):
+                continue
+            if url not in links:
+                links.append(url)
+
+        return links[:config.get('max_articles') or settings.html_max_articles_per_fetch]
+
+    def parse_article(self, content: bytes, url: str, source_id: int, category: str, config: Dict) -> Optional[Dict]:
+        """Extract article data from an article page (same fields as RSSParser.parse_entry)"""
+        try:
+            tree = self.parse_document(content, url)
+
+            fields = {}
+            for field in DEFAULT_ARTICLE_SELECTORS:
+                for spec in self._selectors(config, field):
+                    values = self.select(tree, spec, as_html=field in HTML_FIELDS)
+                    if values:
+                        fields[field] = values if field in LIST_FIELDS else values[0]
+                        break
+
+            for field, value in self.json_ld_fields(tree).items():
+                fields.setdefault(field, value)
+
+            if not fields.get('title'):
+                logger.warning(f"No title found on {url}")
+                return None
+
+            published_at = None
+            if fields.get('published_at'):
+                try:
+                    published_at = date_parser.parse(fields['published_at'])
+                except (ValueError, OverflowError):
+                    logger.debug(f"Unparseable date {fields['published_at']!r} on {url}")
+
+            image_url = fields.get('image_url')
+            if image_url:
+                image_url = urljoin(url, image_url)
+
+            return {
+                'source_id': source_id,
+                'title': fields['title'],
+                'summary': fields.get('summary'),
+                'content': fields.get('content'),
+                'url': url,
+                'author': fields.get('author'),
+                'category': category,
+                'tags': fields.get('tags', []),
+                'published_at': published_at,
+                'image_url': image_url,
+                'language': config.get('language', 'th')
+            }
+
+        except Exception as e:
+            logger.error(f"Error parsing article page {url}: {e}")
+            return None
+
+    def parse_articles(self, pages: Iterable[Tuple[str, bytes]], source_id: int, category: str, config: Dict) -> List[Dict]:
+        """Extract article data from fetched (url, body) pages"""
+        articles = []
+        for url, content in pages:
+            article_data = self.parse_article(content, url, source_id, category, config)
+            if article_data:
+                articles.append(article_data)
+        return articles
+
+    async def fetch_page(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        previous_hash: Optional[str] = None,
+        track_failures: bool = True,
+        deadline: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Fetch a page politely (robots.txt, per-host rate limit, retries)
+
+        Returns the same dict as RSSParser.fetch_feed_content, so listing
+        pages get conditional GET and unchanged-body detection too, or None
+        on error. Only listing pages (track_failures) count towards the
+        source's circuit breaker or are parked on a long Retry-After.
+        Requests and retries stop at deadline (time.monotonic()) when given.
+        """
+        try:
+            if track_failures and not source_breakers.allow(url):
+                logger.info(f"Skipping {url}: parked after repeated failures")
+                return None
+
+            if not await robots_cache.can_fetch(url):
+                logger.warning(f"URL {url} is disallowed by robots.txt")
+                return None
+
+            headers = {
+                "User-Agent": self.user_agent,
+                "Accept": "text/html, application/xhtml+xml"
+            }
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+            response = await request_with_retries(
+                lambda timeout: http_client.client.get(
+                    url,
+                    timeout=timeout,
+                    headers=headers,
+                    follow_redirects=True
+                ),
+                url,
+                timeout=self.timeout,
+                deadline=deadline
+            )
+
+            if response.status_code == 304:
+                source_breakers.record_success(url)
+                return {
+                    'content': None,
+                    'not_modified': True,
+                    'etag': response.headers.get('etag', etag),
+                    'last_modified': response.headers.get('last-modified', last_modified),
+                    'body_hash': previous_hash
+                }
+
+            if track_failures and response.status_code in (429, 503):
+                retry_after = retry_after_seconds(response)
+                if retry_after:
+                    source_breakers.park(url, retry_after)
+
+            response.raise_for_status()
+            if track_failures:
+                source_breakers.record_success(url)
+
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            not_modified = previous_hash is not None and body_hash == previous_hash
+
+            return {
+                'content': None if not_modified else response.content,
+                'not_modified': not_modified,
+                'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified'),
+                'body_hash': body_hash
+            }
+
+        except httpx.HTTPError as e:
+            if track_failures:
+                source_breakers.record_failure(url)
+            logger.error(f"HTTP error fetching page {url}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching page {url}: {e}")
+            return None
+
+    async def fetch_article_pages(self, urls: List[str], deadline: Optional[float] = None) -> List[Tuple[str, bytes]]:
+        """
+        Fetch article pages concurrently, at most HTML_ARTICLE_CONCURRENCY at a time
+
+        Pages not fetched by deadline (time.monotonic()) are cancelled and
+        left out; the pages that were fetched are returned in URL order.
+        Pages left out count as a failed attempt (see gave_up).
+        """
+        semaphore = asyncio.Semaphore(settings.html_article_concurrency)
+
+        async def fetch_one(url: str) -> Optional[Tuple[str, bytes]]:
+            async with semaphore:
+                await robots_cache.wait_for_slot(url)
+                # Article pages are fetched once, so no validators
+                result = await self.fetch_page(url, track_failures=False, deadline=deadline)
+                if result and result['content']:
+                    return url, result['content']
+                return None
+
+        if not urls:
+            return []
+
+        tasks = [asyncio.create_task(fetch_one(url)) for url in urls]
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if pending:
+            logger.warning(f"{len(pending)} of {len(urls)} article pages not fetched in time")
+
+        pages = []
+        for url, task in zip(urls, tasks):
+            if task in done and task.exception() is None and task.result() is not None:
+                pages.append(task.result())
+                self._page_failures.pop(url, None)
+            else:
+                self._record_page_failure(url)
+        return pages
+
+    def _record_page_failure(self, url: str):
+        self._page_failures[url] = self._page_failures.pop(url, 0) + 1
+        while len(self._page_failures) > MAX_TRACKED_PAGE_FAILURES:
+            del self._page_failures[next(iter(self._page_failures))]
+
+    def gave_up(self, url: str) -> bool:
+        """Whether an article page failed HTML_ARTICLE_MAX_ATTEMPTS fetches in a row (404, robots.txt, timeouts)"""
+        return self._page_failures.get(url, 0) >= settings.html_article_max_attempts
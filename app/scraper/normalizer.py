@@ -1,28 +1,65 @@
+import html
 import re
-from typing import Dict
-from bs4 import BeautifulSoup
+from collections import Counter
+from typing import Dict, List
 import logging
+from lxml import etree, html as lxml_html
+from app.scraper.thai_tokenizer import get_tokenizer
 
 logger = logging.getLogger(__name__)
 
+KEYWORD_CLEAN_PATTERN = re.compile(r'[^\u0E00-\u0E7Fa-zA-Z0-9\s]')
+THAI_CHAR_PATTERN = re.compile(r'[\u0E00-\u0E7F]')
+SEARCH_CLEAN_PATTERN = re.compile(r'[^\u0E00-\u0E7F\w]+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Markup whose text is not part of the article
+NON_TEXT_TAGS = ('script', 'style', 'template')
+
+# Text indexed for search per article (title is indexed in full). Segmenting
+# runs at roughly 0.2M chars/s per parse worker (scripts/bench_tokenizer.py),
+# so 3,000 chars cost about 15 ms an article: about 4,000 articles per minute
+# per worker, where the whole of a 10,000 char body would allow about 1,200.
+SEARCH_MAX_CHARS = 3000
+
+THAI_STOPWORDS = frozenset({
+    'ที่', 'และ', 'ใน', 'เป็น', 'ของ', 'มี', 'จาก', 'ได้', 'ว่า', 'ให้', 'แล้ว', 'ไป', 'มา', 'ไม่', 'ก็', 'ถ้า', 'จะ', 'ทั้ง', 'นี้', 'นั้น',
+    'การ', 'ความ', 'กับ', 'แต่', 'หรือ', 'เพื่อ', 'ซึ่ง', 'อยู่', 'คือ', 'ยัง', 'อย่าง', 'เมื่อ', 'ต่อ', 'กว่า', 'โดย', 'ด้วย',
+    'อีก', 'เพราะ', 'หาก', 'แม้', 'จึง', 'ถึง', 'ตาม', 'ขึ้น', 'ลง', 'เข้า', 'ออก', 'กัน', 'ไว้', 'เอง', 'นั่น', 'ทำ', 'ทำให้',
+    'ได้รับ', 'เคย', 'ควร', 'ต้อง', 'อาจ', 'คง', 'เพียง', 'แค่', 'ละ', 'ราย', 'คน', 'ครั้ง', 'ทาง', 'ส่วน', 'เรื่อง', 'ระหว่าง',
+    'หลัง', 'ก่อน', 'ภายใน', 'ขณะ', 'ขณะที่', 'ทั้งนี้', 'ดังกล่าว', 'รวม', 'แห่ง', 'เช่น', 'บาง', 'ทุก', 'อื่น', 'เขา', 'เรา',
+    'คุณ', 'ผม', 'ฉัน', 'มาก', 'น้อย', 'นาย', 'นาง', 'นางสาว'
+})
+
 
 class DataNormalizer:
     """Normalize and clean article data"""
     
     @staticmethod
     def clean_html(html_text: str) -> str:
-        """Remove HTML tags and clean text"""
+        """
+        Remove HTML tags and clean text
+        
+        Most titles and authors are plain text, so the parser only runs when
+        there is markup; text with entities alone is just unescaped. Text nodes
+        are joined with spaces, so words in adjacent elements stay apart.
+        """
         if not html_text:
             return ""
         
+        if '<' not in html_text:
+            if '&' in html_text:
+                html_text = html.unescape(html_text)
+            return WHITESPACE_PATTERN.sub(' ', html_text).strip()
+        
         try:
-            soup = BeautifulSoup(html_text, 'lxml')
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # Remove extra whitespace
-            text = re.sub(r'\s+', ' ', text)
+            document = lxml_html.document_fromstring(html_text)
+            etree.strip_elements(document, etree.Comment, etree.ProcessingInstruction, *NON_TEXT_TAGS, with_tail=False)
             
-            return text.strip()
+            return WHITESPACE_PATTERN.sub(' ', ' '.join(document.itertext())).strip()
+        except etree.ParserError:
+            # Nothing but comments or empty tags
+            return ""
         except Exception as e:
             logger.error(f"Error cleaning HTML: {e}")
             return html_text
@@ -70,23 +107,26 @@ class DataNormalizer:
     
     @staticmethod
     def extract_keywords(text: str, max_keywords: int = 10) -> list:
-        """Extract keywords from text (simple implementation)"""
+        """Extract keywords from text, segmenting Thai into words"""
         if not text:
             return []
         
         try:
             # Remove special characters and convert to lowercase
-            cleaned = re.sub(r'[^\u0E00-\u0E7Fa-zA-Z0-9\s]', '', text.lower())
+            cleaned = KEYWORD_CLEAN_PATTERN.sub('', text.lower())
             
-            # Split into words
-            words = cleaned.split()
+            # Thai has no spaces between words, so segment with the dictionary tokenizer
+            words = get_tokenizer().tokenize(cleaned)
             
             # Filter out short words and common Thai stop words
-            thai_stopwords = {'ที่', 'และ', 'ใน', 'เป็น', 'ของ', 'มี', 'จาก', 'ได้', 'ว่า', 'ให้', 'แล้ว', 'ไป', 'มา', 'ไม่', 'ก็', 'ถ้า', 'จะ', 'ทั้ง', 'นี้', 'นั้น'}
-            filtered_words = [w for w in words if len(w) > 2 and w not in thai_stopwords]
+            # (Thai words are shorter in characters, e.g. รถ, ไฟ)
+            filtered_words = [
+                w for w in words
+                if w not in THAI_STOPWORDS
+                and (len(w) > 1 if THAI_CHAR_PATTERN.match(w) else len(w) > 2)
+            ]
             
             # Count frequency
-            from collections import Counter
             word_freq = Counter(filtered_words)
             
             # Get top keywords
@@ -97,6 +137,63 @@ class DataNormalizer:
             logger.error(f"Error extracting keywords: {e}")
             return []
     
+    @staticmethod
+    def search_terms(text: str, max_length: int = SEARCH_MAX_CHARS) -> str:
+        """Segment text into space-separated lowercase words for full-text indexing and queries"""
+        if not text:
+            return ""
+        
+        try:
+            cleaned = SEARCH_CLEAN_PATTERN.sub(' ', text[:max_length].lower())
+            return ' '.join(get_tokenizer().tokenize(cleaned))
+        except Exception as e:
+            logger.error(f"Error building search terms: {e}")
+            return ""
+    
+    def add_search_terms(self, article: Dict) -> Dict:
+        """Add segmented title and body text used to build the article's search vector"""
+        body = ' '.join(part for part in (article.get('summary'), article.get('content')) if part)
+        article['search_title'] = self.search_terms(article.get('title', ''))
+        article['search_body'] = self.search_terms(body)
+        return article
+    
+    @staticmethod
+    def highlight(text: str, terms: List[str], max_length: int = 200) -> str:
+        """HTML-escaped snippet of text around the first matched term, with matches wrapped in <mark>"""
+        if not text:
+            return ""
+        
+        terms = sorted({term for term in terms if term}, key=len, reverse=True)
+        match = None
+        if terms:
+            pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+            match = pattern.search(text)
+        
+        if match is None:
+            return html.escape(DataNormalizer.truncate_text(text, max_length))
+        
+        # Start a little before the first match so it has some context
+        start = max(0, match.start() - max_length // 4)
+        space = text.rfind(' ', start, match.start())
+        if start > 0 and space != -1:
+            start = space + 1
+        window = text[start:start + max_length]
+        
+        parts = []
+        position = 0
+        for found in pattern.finditer(window):
+            parts.append(html.escape(window[position:found.start()]))
+            parts.append(f"<mark>{html.escape(found.group())}</mark>")
+            position = found.end()
+        parts.append(html.escape(window[position:]))
+        
+        snippet = ''.join(parts)
+        if start > 0:
+            snippet = '...' + snippet
+        if start + max_length < len(text):
+            snippet += '...'
+        return snippet
+    
     def normalize_article(self, article: Dict) -> Dict:
         """Normalize all fields in an article"""
         try:
@@ -0,0 +1,153 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+import logging
+from app.config import settings
+from app.scraper.rss_parser import RSSParser
+from app.scraper.html_scraper import HTMLScraper
+from app.scraper.content_extractor import ContentExtractor
+from app.scraper.normalizer import DataNormalizer
+from app.scraper.deduplicator import Deduplicator
+
+logger = logging.getLogger(__name__)
+
+# Per-process helpers, created on first use inside each worker
+_rss_parser: Optional[RSSParser] = None
+_normalizer: Optional[DataNormalizer] = None
+_deduplicator: Optional[Deduplicator] = None
+_html_scraper: Optional[HTMLScraper] = None
+_content_extractor: Optional[ContentExtractor] = None
+
+
+def _get_helpers():
+    global _rss_parser, _normalizer, _deduplicator, _html_scraper, _content_extractor
+    if _rss_parser is None:
+        _rss_parser = RSSParser()
+        _normalizer = DataNormalizer()
+        _deduplicator = Deduplicator()
+        _html_scraper = HTMLScraper()
+        _content_extractor = ContentExtractor(settings.enrichment_min_extracted_chars)
+    return _rss_parser, _normalizer, _deduplicator
+
+
+def _prepare(article_data: Dict) -> Dict:
+    """Normalize one parsed article and add hashes and search terms"""
+    _, normalizer, deduplicator = _get_helpers()
+    normalized = normalizer.normalize_article(article_data)
+    hashed = deduplicator.add_hash_to_article(normalized)
+    hashed = deduplicator.add_similarity_hash(hashed)
+    return normalizer.add_search_terms(hashed)
+
+
+def parse_and_normalize(content: bytes, source_id: int, category: str, url: str = '') -> List[Dict]:
+    """Parse raw feed bytes into normalized article dicts with hashes and search terms"""
+    rss_parser, _, _ = _get_helpers()
+
+    feed = rss_parser.parse_content(content, url)
+    return [_prepare(article_data) for article_data in rss_parser.parse_entries(feed, source_id, category, url)]
+
+
+def extract_html_links(content: bytes, url: str, config: Dict) -> List[str]:
+    """Article links from an HTML listing page"""
+    _get_helpers()
+    return _html_scraper.extract_links(content, url, config)
+
+
+def parse_and_normalize_html(pages: List[Tuple[str, bytes]], source_id: int, category: str, config: Dict) -> List[Dict]:
+    """Extract articles from fetched HTML pages into normalized article dicts, like feed entries"""
+    _get_helpers()
+    return [_prepare(article_data) for article_data in _html_scraper.parse_articles(pages, source_id, category, config)]
+
+
+def enrich_from_page(content: bytes, article: Dict) -> Optional[Dict]:
+    """
+    Extract an article page's main text and rebuild the fields derived from it
+
+    Returns content, tags and search terms to store, or None if the page had
+    nothing longer than what the article already has. Tags are only replaced
+    when they are the keywords ingest extracted from title and summary, so
+    tags supplied by the feed are kept.
+    """
+    _, normalizer, _ = _get_helpers()
+
+    text = _content_extractor.extract(content, article['url'])
+    if not text or len(text) <= len(article.get('content') or ''):
+        return None
+
+    enriched = {**article, 'content': text}
+    if not article.get('summary'):
+        enriched['summary'] = normalizer.truncate_text(text, 500)
+
+    ingest_keywords = normalizer.extract_keywords(f"{article.get('title', '')} {article.get('summary', '')}")
+    if not article.get('tags') or list(article['tags']) == ingest_keywords:
+        enriched['tags'] = normalizer.extract_keywords(f"{article.get('title', '')} {enriched['summary']} {text}")
+
+    return normalizer.add_search_terms(enriched)
+
+
+class ParsePool:
+    """Executor for CPU-bound feed parsing and normalization, kept off the event loop"""
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+
+    def _create_executor(self) -> Optional[Executor]:
+        mode = settings.parser_executor
+        workers = settings.parser_workers
+
+        if mode == 'process':
+            # spawn: forking a process that is running an event loop and threads is unsafe
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        elif mode == 'thread':
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='feed-parser')
+        else:
+            logger.info("Feed parsing runs inline on the event loop")
+            return None
+
+        logger.info(f"Started {mode} parse pool with {workers} workers")
+        return executor
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """Get the executor, creating it on first use so only processes that fetch pay for it"""
+        if self._executor is None and settings.parser_executor in ('process', 'thread'):
+            self._executor = self._create_executor()
+        return self._executor
+
+    async def run(self, func, *args):
+        """Run a module-level parsing function in the worker pool (inline without one)"""
+        executor = self.executor
+        if executor is None:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args))
+
+    async def parse_and_normalize(self, content: bytes, source_id: int, category: str, url: str = '') -> List[Dict]:
+        """Parse and normalize feed content in the worker pool"""
+        return await self.run(parse_and_normalize, content, source_id, category, url)
+
+    async def extract_html_links(self, content: bytes, url: str, config: Dict) -> List[str]:
+        """Extract article links from a listing page in the worker pool"""
+        return await self.run(extract_html_links, content, url, config)
+
+    async def enrich_from_page(self, content: bytes, article: Dict) -> Optional[Dict]:
+        """Extract main content for an article in the worker pool"""
+        return await self.run(enrich_from_page, content, article)
+
+    async def parse_and_normalize_html(self, pages: List[Tuple[str, bytes]], source_id: int, category: str, config: Dict) -> List[Dict]:
+        """Extract and normalize HTML article pages in the worker pool"""
+        return await self.run(parse_and_normalize_html, pages, source_id, category, config)
+
+    def shutdown(self):
+        """Shut down worker threads/processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Parse pool shut down")
+
+
+# Global parse pool instance
+parse_pool = ParsePool()
@@ -0,0 +1,238 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+import logging
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# A retry is not started with less time than this left before its deadline
+MIN_ATTEMPT_SECONDS = 1.0
+
+
+class TokenBucket:
+    """Token bucket that reserves a token per call and sleeps until it is due"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> float:
+        """Take one token, waiting if the bucket is empty; returns the seconds waited"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        # Going negative reserves a future token, so concurrent callers queue in order
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+
+        wait = -self._tokens / self.rate
+        await asyncio.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """
+    One token bucket per host
+
+    Sustained rate is one request per SCRAPER_DELAY_SECONDS with bursts of up
+    to SCRAPER_HOST_BURST, shared by every source and retry on the host.
+    """
+
+    def __init__(self, delay_seconds: Optional[float] = None, burst: Optional[int] = None):
+        delay = delay_seconds if delay_seconds is not None else settings.scraper_delay_seconds
+        self.rate = 1.0 / delay if delay > 0 else None
+        self.burst = burst or settings.scraper_host_burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats = {'requests': 0, 'throttled': 0}
+
+    async def acquire(self, url: str):
+        """Wait for the host's next request slot"""
+        self._stats['requests'] += 1
+        if self.rate is None:
+            return
+
+        host = urlparse(url).netloc.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+
+        if await bucket.acquire() > 0:
+            self._stats['throttled'] += 1
+
+    def stats(self) -> Dict:
+        return {**self._stats, 'hosts': len(self._buckets)}
+
+
+class CircuitBreaker:
+    """
+    Per-source circuit breaker
+
+    After SCRAPER_BREAKER_FAILURES consecutive failures the circuit opens
+    and the source is parked for a cool-off period that doubles on every
+    trip, up to SCRAPER_BREAKER_MAX_COOLDOWN_MINUTES. Once it has passed, one
+    trial fetch is let through: success closes the circuit, another failure
+    opens it again straight away.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        cooldown_minutes: Optional[float] = None,
+        max_cooldown_minutes: Optional[float] = None
+    ):
+        self.failure_threshold = failure_threshold or settings.scraper_breaker_failures
+        self.cooldown = timedelta(minutes=cooldown_minutes or settings.scraper_breaker_cooldown_minutes)
+        self.max_cooldown = timedelta(minutes=max_cooldown_minutes or settings.scraper_breaker_max_cooldown_minutes)
+        # key -> [consecutive failures, trips, open until]
+        self._state: Dict[str, list] = {}
+        self._stats = {'trips': 0, 'rejected': 0}
+
+    def allow(self, key: str) -> bool:
+        """Whether a request may be made now"""
+        state = self._state.get(key)
+        if state is None or state[2] is None or state[2] <= datetime.now(timezone.utc):
+            return True
+        self._stats['rejected'] += 1
+        return False
+
+    def open_until(self, key: str) -> Optional[datetime]:
+        """End of the current cool-off, or None if the circuit is closed"""
+        state = self._state.get(key)
+        if state is None or state[2] is None or state[2] <= datetime.now(timezone.utc):
+            return None
+        return state[2]
+
+    def record_success(self, key: str):
+        self._state.pop(key, None)
+
+    def record_failure(self, key: str):
+        state = self._state.setdefault(key, [0, 0, None])
+        state[0] += 1
+        if state[0] < self.failure_threshold:
+            return
+
+        state[1] += 1
+        cooldown = min(self.cooldown * 2 ** (state[1] - 1), self.max_cooldown)
+        state[2] = datetime.now(timezone.utc) + cooldown
+        self._stats['trips'] += 1
+        logger.warning(f"Circuit open for {key} after {state[0]} consecutive failures, parked for {cooldown}")
+
+    def park(self, key: str, seconds: float):
+        """Hold off until the server's Retry-After has passed"""
+        state = self._state.setdefault(key, [0, 0, None])
+        until = datetime.now(timezone.utc) + timedelta(seconds=min(seconds, self.max_cooldown.total_seconds()))
+        if state[2] is None or state[2] < until:
+            state[2] = until
+
+    def stats(self) -> Dict:
+        now = datetime.now(timezone.utc)
+        return {
+            **self._stats,
+            'open': sum(1 for state in self._state.values() if state[2] is not None and state[2] > now)
+        }
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    value = response.headers.get('retry-after')
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff from SCRAPER_DELAY_SECONDS with jitter"""
+    delay = min(max(settings.scraper_delay_seconds, 0.5) * 2 ** attempt, settings.scraper_retry_max_delay)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def request_with_retries(
+    send: Callable[[float], Awaitable[httpx.Response]],
+    url: str,
+    max_retries: Optional[int] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
+) -> httpx.Response:
+    """
+    Send a request through the host rate limiter, retrying transient failures
+
+    send(timeout) makes one attempt. Timeouts, connection errors and 429/5xx
+    responses are retried up to SCRAPER_MAX_RETRIES times with jittered
+    exponential backoff, or after the server's Retry-After when it is short
+    enough to wait for. With a deadline (time.monotonic()), each attempt's
+    timeout is capped at the time left and no retry starts that could not
+    finish by then. Returns the last response (the caller checks its status)
+    or raises the last transport error.
+    """
+    max_retries = settings.scraper_max_retries if max_retries is None else max_retries
+    timeout = settings.scraper_timeout if timeout is None else timeout
+    attempt = 0
+
+    while True:
+        await host_limiter.acquire(url)
+
+        attempt_timeout = timeout
+        if deadline is not None:
+            attempt_timeout = min(timeout, deadline - time.monotonic())
+            if attempt_timeout <= 0:
+                raise httpx.TimeoutException(f"No time left to fetch {url}")
+
+        try:
+            response = await send(attempt_timeout)
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff_seconds(attempt)
+            if not _time_for_retry(delay, deadline):
+                raise
+            logger.warning(f"Retrying {url} in {delay:.1f}s after {type(e).__name__}")
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                return response
+
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_seconds(attempt)
+            elif delay > settings.scraper_retry_max_delay:
+                # Longer than a fetch may wait: let the caller park the source instead
+                return response
+            if not _time_for_retry(delay, deadline):
+                return response
+            logger.warning(f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code}")
+
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+def _time_for_retry(delay: float, deadline: Optional[float]) -> bool:
+    """Whether a retry after delay would still have MIN_ATTEMPT_SECONDS before the deadline"""
+    return deadline is None or time.monotonic() + delay + MIN_ATTEMPT_SECONDS <= deadline
+
+
+# Global fetch-layer instances shared by all fetchers
+host_limiter = HostRateLimiter()
+source_breakers = CircuitBreaker()
@@ -0,0 +1,241 @@
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import logging
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.http_client import http_client
+from app.models import RobotsTxt
+
+logger = logging.getLogger(__name__)
+
+# Larger files are truncated, as major crawlers do
+ROBOTS_MAX_BYTES = 512 * 1024
+
+# urllib.robotparser only reads whole-second Crawl-delay values
+FRACTIONAL_CRAWL_DELAY_PATTERN = re.compile(r'^(\s*crawl-delay\s*:\s*)(\d*\.\d+)', re.IGNORECASE | re.MULTILINE)
+
+
+def _round_up_crawl_delay(match: re.Match) -> str:
+    return f"{match.group(1)}{math.ceil(float(match.group(2)))}"
+
+
+class RobotsEntry:
+    """Parsed robots.txt of one origin and when it expires"""
+
+    def __init__(self, origin: str, status_code: int, body: str, expires_at: datetime):
+        self.origin = origin
+        self.status_code = status_code
+        self.body = body
+        self.expires_at = expires_at
+
+        self._parser = RobotFileParser()
+        if status_code == 200:
+            self._parser.parse(FRACTIONAL_CRAWL_DELAY_PATTERN.sub(_round_up_crawl_delay, body).splitlines())
+        else:
+            # Missing, unreadable or unreachable robots.txt: nothing is disallowed
+            self._parser.allow_all = True
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= datetime.now(timezone.utc)
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        return self._parser.can_fetch(user_agent, url)
+
+    def crawl_delay(self, user_agent: str) -> Optional[float]:
+        """Seconds to wait between requests, from Crawl-delay or Request-rate"""
+        if self.status_code != 200:
+            return None
+
+        delays = []
+        crawl_delay = self._parser.crawl_delay(user_agent)
+        if crawl_delay:
+            delays.append(float(crawl_delay))
+        request_rate = self._parser.request_rate(user_agent)
+        if request_rate and request_rate.requests:
+            delays.append(request_rate.seconds / request_rate.requests)
+
+        if not delays:
+            return None
+        return min(max(delays), settings.robots_max_crawl_delay)
+
+
+class RobotsCache:
+    """
+    robots.txt rules shared by every fetcher in the process
+
+    Lookups go to an in-memory LRU, then to the robots_txt table, and only
+    then to the network, so restarts do not refetch every file. Entries
+    expire after ROBOTS_TTL_HOURS. Fetch errors and 5xx responses are cached
+    for ROBOTS_ERROR_TTL_MINUTES (keeping the last good copy if there is one)
+    so a broken host is not asked again on every fetch. Also paces requests
+    per host to honour Crawl-delay.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.user_agent = settings.scraper_user_agent
+        self.enabled = settings.scraper_respect_robots_txt
+        self.max_entries = max_entries or settings.robots_cache_max_entries
+        self._entries: "OrderedDict[str, RobotsEntry]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._stats = {'hits': 0, 'loaded': 0, 'fetched': 0, 'errors': 0, 'waits': 0}
+
+    @staticmethod
+    def get_origin(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+    async def get(self, url: str) -> RobotsEntry:
+        """Get the robots.txt entry for the origin of a URL"""
+        origin = self.get_origin(url)
+
+        entry = self._entries.get(origin)
+        if entry is not None and not entry.expired:
+            self._entries.move_to_end(origin)
+            self._stats['hits'] += 1
+            return entry
+
+        # One lookup per origin, however many sources on it are due at once
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(origin)
+            if entry is not None and not entry.expired:
+                self._stats['hits'] += 1
+                return entry
+
+            stored = await self._load(origin)
+            if stored is not None and not stored.expired:
+                self._stats['loaded'] += 1
+                entry = stored
+            else:
+                entry = await self._fetch(origin, stored or entry)
+                await self._save(entry)
+
+            self._remember(entry)
+            return entry
+
+    def _remember(self, entry: RobotsEntry):
+        self._entries[entry.origin] = entry
+        self._entries.move_to_end(entry.origin)
+        while len(self._entries) > self.max_entries:
+            origin, _ = self._entries.popitem(last=False)
+            self._locks.pop(origin, None)
+
+    async def _fetch(self, origin: str, previous: Optional[RobotsEntry]) -> RobotsEntry:
+        """Fetch robots.txt; errors get a short-lived entry"""
+        robots_url = f"{origin}/robots.txt"
+        now = datetime.now(timezone.utc)
+        self._stats['fetched'] += 1
+
+        try:
+            response = await http_client.client.get(
+                robots_url,
+                timeout=10,
+                headers={"User-Agent": self.user_agent},
+                follow_redirects=True
+            )
+            status_code = response.status_code
+            if status_code < 500:
+                body = response.content[:ROBOTS_MAX_BYTES].decode('utf-8', errors='replace') if status_code == 200 else ''
+                return RobotsEntry(origin, status_code, body, now + timedelta(hours=settings.robots_ttl_hours))
+            error = f"HTTP {status_code}"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        self._stats['errors'] += 1
+        logger.warning(f"Could not fetch robots.txt from {robots_url}: {error}")
+        expires_at = now + timedelta(minutes=settings.robots_error_ttl_minutes)
+
+        # Keep following the last rules we saw rather than treating the host as unrestricted
+        if previous is not None and previous.status_code == 200:
+            return RobotsEntry(origin, previous.status_code, previous.body, expires_at)
+        return RobotsEntry(origin, 0, '', expires_at)
+
+    async def _load(self, origin: str) -> Optional[RobotsEntry]:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(RobotsTxt).where(RobotsTxt.origin == origin))
+                row = result.scalar_one_or_none()
+                if row is None:
+                    return None
+                return RobotsEntry(row.origin, row.status_code, row.body or '', row.expires_at)
+        except Exception as e:
+            logger.error(f"Error loading stored robots.txt for {origin}: {e}")
+            return None
+
+    async def _save(self, entry: RobotsEntry):
+        try:
+            async with AsyncSessionLocal() as db:
+                values = {
+                    'origin': entry.origin,
+                    'status_code': entry.status_code,
+                    'body': entry.body,
+                    'fetched_at': datetime.now(timezone.utc),
+                    'expires_at': entry.expires_at
+                }
+                stmt = pg_insert(RobotsTxt).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[RobotsTxt.origin],
+                    set_={key: stmt.excluded[key] for key in values if key != 'origin'}
+                )
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error storing robots.txt for {entry.origin}: {e}")
+
+    async def can_fetch(self, url: str) -> bool:
+        """Check if URL is allowed by robots.txt"""
+        if not self.enabled:
+            return True
+
+        try:
+            entry = await self.get(url)
+            return entry.can_fetch(self.user_agent, url)
+        except Exception as e:
+            logger.error(f"Error checking robots.txt for {url}: {e}")
+            return False
+
+    async def wait_for_slot(self, url: str):
+        """
+        Wait until the host's Crawl-delay has passed since the previous request to it
+
+        Slots are reserved before sleeping, so concurrent requests to one host
+        are spaced out while other hosts are not held up.
+        """
+        if not self.enabled:
+            return
+
+        try:
+            delay = (await self.get(url)).crawl_delay(self.user_agent)
+        except Exception as e:
+            logger.error(f"Error reading crawl delay for {url}: {e}")
+            return
+        if not delay:
+            return
+
+        host = urlparse(url).netloc.lower()
+        now = time.monotonic()
+        start = max(now, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = start + delay
+
+        if start > now:
+            self._stats['waits'] += 1
+            await asyncio.sleep(start - now)
+
+    def stats(self) -> Dict:
+        """Get cache statistics"""
+        return {**self._stats, 'entries': len(self._entries)}
+
+
+# Global robots.txt cache instance
+robots_cache = RobotsCache()
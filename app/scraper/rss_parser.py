@@ -1,10 +1,13 @@
+import hashlib
 import feedparser
 import httpx
-from urllib.robotparser import RobotFileParser
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 from app.config import settings
+from app.http_client import http_client
+from app.scraper.rate_limit import request_with_retries, retry_after_seconds, source_breakers
+from app.scraper.robots import robots_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,88 +19,121 @@ class RSSParser:
         self.user_agent = settings.scraper_user_agent
         self.timeout = settings.scraper_timeout
         self.respect_robots = settings.scraper_respect_robots_txt
-        self.robots_cache = {}
     
     async def check_robots_txt(self, url: str) -> bool:
-        """Check if URL is allowed by robots.txt"""
+        """Check if URL is allowed by robots.txt (shared, persistent cache)"""
         if not self.respect_robots:
             return True
         
-        try:
-            # Extract base URL
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            base_url = f"{parsed.scheme}://{parsed.netloc}"
-            robots_url = f"{base_url}/robots.txt"
-            
-            # Check cache
-            if robots_url in self.robots_cache:
-                rp = self.robots_cache[robots_url]
-            else:
-                # Fetch and parse robots.txt
-                rp = RobotFileParser()
-                rp.set_url(robots_url)
-                
-                async with httpx.AsyncClient() as client:
-                    try:
-                        response = await client.get(
-                            robots_url,
-                            timeout=10,
-                            headers={"User-Agent": self.user_agent}
-                        )
-                        if response.status_code == 200:
-                            rp.parse(response.text.splitlines())
-                            self.robots_cache[robots_url] = rp
-                        else:
-                            # If robots.txt not found, assume allowed
-                            return True
-                    except Exception as e:
-                        logger.warning(f"Could not fetch robots.txt from {robots_url}: {e}")
-                        return True
-            
-            # Check if URL is allowed
-            return rp.can_fetch(self.user_agent, url)
-        
-        except Exception as e:
-            logger.error(f"Error checking robots.txt for {url}: {e}")
-            return False
+        return await robots_cache.can_fetch(url)
     
-    async def fetch_feed(self, url: str) -> Optional[feedparser.FeedParserDict]:
-        """Fetch and parse RSS feed"""
+    async def fetch_feed_content(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        previous_hash: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Fetch raw feed content using conditional GET
+        
+        Returns a dict with the body (None when unchanged) and the validators to
+        store for the next fetch, or None on error. Requests and retries stop
+        at deadline (time.monotonic()) when one is given.
+        """
         try:
+            # Sources that keep failing are parked instead of costing a timeout every cycle
+            if not source_breakers.allow(url):
+                logger.info(f"Skipping {url}: parked after repeated failures")
+                return None
+            
             # Check robots.txt
             if not await self.check_robots_txt(url):
                 logger.warning(f"URL {url} is disallowed by robots.txt")
                 return None
             
-            # Fetch feed
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
+            headers = {
+                "User-Agent": self.user_agent,
+                "Accept": "application/rss+xml, application/xml, text/xml"
+            }
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            
+            # Fetch feed (rate limited per host, transient failures retried)
+            response = await request_with_retries(
+                lambda timeout: http_client.client.get(
                     url,
-                    timeout=self.timeout,
-                    headers={
-                        "User-Agent": self.user_agent,
-                        "Accept": "application/rss+xml, application/xml, text/xml"
-                    },
+                    timeout=timeout,
+                    headers=headers,
                     follow_redirects=True
-                )
-                response.raise_for_status()
-                
-                # Parse feed
-                feed = feedparser.parse(response.content)
-                
-                if feed.bozo:
-                    logger.warning(f"Feed {url} has parsing errors: {feed.bozo_exception}")
-                
-                return feed
+                ),
+                url,
+                timeout=self.timeout,
+                deadline=deadline
+            )
+            
+            if response.status_code == 304:
+                source_breakers.record_success(url)
+                logger.info(f"Feed {url} not modified")
+                return {
+                    'content': None,
+                    'not_modified': True,
+                    'etag': response.headers.get('etag', etag),
+                    'last_modified': response.headers.get('last-modified', last_modified),
+                    'body_hash': previous_hash
+                }
+            
+            if response.status_code in (429, 503):
+                retry_after = retry_after_seconds(response)
+                if retry_after:
+                    source_breakers.park(url, retry_after)
+            
+            response.raise_for_status()
+            source_breakers.record_success(url)
+            
+            # Fallback for servers that ignore validators
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            not_modified = previous_hash is not None and body_hash == previous_hash
+            if not_modified:
+                logger.info(f"Feed {url} body unchanged since last fetch")
+            
+            return {
+                'content': None if not_modified else response.content,
+                'not_modified': not_modified,
+                'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified'),
+                'body_hash': body_hash
+            }
         
         except httpx.HTTPError as e:
+            source_breakers.record_failure(url)
             logger.error(f"HTTP error fetching feed {url}: {e}")
             return None
         except Exception as e:
             logger.error(f"Error fetching feed {url}: {e}")
             return None
     
+    async def fetch_feed(self, url: str) -> Optional[feedparser.FeedParserDict]:
+        """Fetch and parse RSS feed"""
+        result = await self.fetch_feed_content(url)
+        
+        if not result or result['content'] is None:
+            return None
+        
+        return self.parse_content(result['content'], url)
+    
+    def parse_content(self, content: bytes, url: str = '') -> feedparser.FeedParserDict:
+        """Parse raw feed content"""
+        feed = feedparser.parse(content)
+        
+        if feed.bozo:
+            logger.warning(f"Feed {url} has parsing errors: {feed.bozo_exception}")
+        
+        return feed
+    
     def parse_entry(self, entry: Dict, source_id: int, category: str) -> Dict:
         """Parse a single feed entry into article data"""
         try:
@@ -160,10 +196,8 @@ class RSSParser:
             logger.error(f"Error parsing entry: {e}")
             return None
     
-    async def parse_feed(self, url: str, source_id: int, category: str) -> List[Dict]:
-        """Fetch and parse all entries from a feed"""
-        feed = await self.fetch_feed(url)
-        
+    def parse_entries(self, feed: feedparser.FeedParserDict, source_id: int, category: str, url: str = '') -> List[Dict]:
+        """Parse all entries from a parsed feed into article data"""
         if not feed or not hasattr(feed, 'entries'):
             return []
         
@@ -175,3 +209,8 @@ class RSSParser:
         
         logger.info(f"Parsed {len(articles)} articles from {url}")
         return articles
+    
+    async def parse_feed(self, url: str, source_id: int, category: str) -> List[Dict]:
+        """Fetch and parse all entries from a feed"""
+        feed = await self.fetch_feed(url)
+        return self.parse_entries(feed, source_id, category, url)
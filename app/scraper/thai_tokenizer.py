@@ -0,0 +1,241 @@
+import mmap
+import os
+import re
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, List, Optional
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DICTIONARY_PATH = Path(__file__).parent / 'data' / 'thai_words.txt'
+
+# Compiled trie file layout (little-endian):
+#   header: magic, version, node count
+#   chars[n] uint32, first_child[n] uint32, child_count[n] uint16, terminal[n] uint8
+# Children of a node are stored contiguously and sorted by character, so lookups
+# walk the mmap directly without building Python objects.
+TRIE_MAGIC = b'THTR'
+TRIE_VERSION = 1
+TRIE_HEADER = struct.Struct('<4sII')
+
+# Split text into Thai runs and other word-like runs
+RUN_PATTERN = re.compile(r'[฀-๿]+|[^\s฀-๿]+')
+THAI_PATTERN = re.compile(r'[฀-๿]')
+
+# Following vowels, above/below vowels and tone marks cannot start a word,
+# so a dictionary match must not end right before one of them
+NON_STARTING_CHARS = frozenset(
+    chr(c) for c in list(range(0x0E30, 0x0E3B)) + [0x0E45] + list(range(0x0E47, 0x0E4F))
+)
+
+# Dictionary words shorter than this are joined to a following unknown run
+SHORT_WORD_CHARS = 3
+
+
+def build_trie(words: Iterable[str]) -> bytes:
+    """Compile words into the binary trie format"""
+    # Build a nested dict trie, then lay it out breadth-first
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    chars = array('I', [0])
+    first_child = array('I', [0])
+    child_count = array('H', [0])
+    terminal = array('B', [0])
+
+    queue = [(0, root)]
+    while queue:
+        next_queue = []
+        for index, node in queue:
+            children = sorted(char for char in node if char)
+            first_child[index] = len(chars)
+            child_count[index] = len(children)
+            for char in children:
+                child = node[char]
+                next_queue.append((len(chars), child))
+                chars.append(ord(char))
+                first_child.append(0)
+                child_count.append(0)
+                terminal.append(1 if '' in child else 0)
+        queue = next_queue
+
+    return (
+        TRIE_HEADER.pack(TRIE_MAGIC, TRIE_VERSION, len(chars))
+        + chars.tobytes()
+        + first_child.tobytes()
+        + child_count.tobytes()
+        + terminal.tobytes()
+    )
+
+
+def read_words(path: Path) -> List[str]:
+    """Read a word list (one word per line, # comments)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [
+            line.strip() for line in f
+            if line.strip() and not line.startswith('#')
+        ]
+
+
+class ThaiTokenizer:
+    """
+    Dictionary-based Thai word segmentation
+
+    Maximal matching over a memory-mapped trie: picks the segmentation with the
+    fewest unknown characters, then the fewest words. Unknown characters stay
+    together as one token with any short word just before them. Non-Thai runs
+    (Latin words, numbers) are returned as they are.
+    """
+
+    def __init__(self, dictionary_path: Optional[str] = None):
+        self.dictionary_path = Path(dictionary_path or settings.thai_dictionary_path or DEFAULT_DICTIONARY_PATH)
+        self._mmap = None
+        self._load()
+
+    def _compiled_path(self) -> Path:
+        """Trie file next to the word list, or in the temp dir if that is read-only"""
+        candidate = self.dictionary_path.with_suffix('.trie')
+        if os.access(candidate.parent, os.W_OK):
+            return candidate
+        return Path(tempfile.gettempdir()) / f"{self.dictionary_path.stem}.trie"
+
+    def _load(self):
+        compiled = self._compiled_path()
+
+        if not compiled.exists() or compiled.stat().st_mtime < self.dictionary_path.stat().st_mtime:
+            data = build_trie(read_words(self.dictionary_path))
+            # Write-then-rename so concurrent workers never map a half-written file
+            tmp_path = compiled.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, compiled)
+            logger.info(f"Compiled Thai dictionary {self.dictionary_path} to {compiled}")
+
+        with open(compiled, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = TRIE_HEADER.unpack_from(self._mmap, 0)
+        if magic != TRIE_MAGIC or version != TRIE_VERSION:
+            raise ValueError(f"Invalid Thai dictionary trie: {compiled}")
+
+        view = memoryview(self._mmap)
+        offset = TRIE_HEADER.size
+        self._chars = view[offset:offset + count * 4].cast('I')
+        offset += count * 4
+        self._first_child = view[offset:offset + count * 4].cast('I')
+        offset += count * 4
+        self._child_count = view[offset:offset + count * 2].cast('H')
+        offset += count * 2
+        self._terminal = view[offset:offset + count]
+        self.node_count = count
+
+    def _find_child(self, node: int, code: int) -> int:
+        """Index of the child of node with character code, or -1"""
+        low = self._first_child[node]
+        high = low + self._child_count[node]
+        index = bisect_left(self._chars, code, low, high)
+        if index < high and self._chars[index] == code:
+            return index
+        return -1
+
+    def prefix_ends(self, text: str, start: int) -> List[int]:
+        """End positions of dictionary words that start at text[start]"""
+        ends = []
+        terminal = self._terminal
+        node = 0
+        length = len(text)
+
+        for position in range(start, length):
+            node = self._find_child(node, ord(text[position]))
+            if node < 0:
+                break
+            end = position + 1
+            if terminal[node] and (end == length or text[end] not in NON_STARTING_CHARS):
+                ends.append(end)
+
+        return ends
+
+    def _segment_thai(self, text: str) -> List[str]:
+        length = len(text)
+        # best[i] = (unknown chars, words) for the best segmentation of text[:i]
+        best = [None] * (length + 1)
+        back = [0] * (length + 1)
+        known = [False] * (length + 1)
+        best[0] = (0, 0)
+
+        for start in range(length):
+            score = best[start]
+            if score is None:
+                continue
+
+            for end in self.prefix_ends(text, start):
+                candidate = (score[0], score[1] + 1)
+                if best[end] is None or candidate < best[end]:
+                    best[end] = candidate
+                    back[end] = start
+                    known[end] = True
+
+            # Fall back to a single unknown character
+            candidate = (score[0] + 1, score[1] + 1)
+            if best[start + 1] is None or candidate < best[start + 1]:
+                best[start + 1] = candidate
+                back[start + 1] = start
+                known[start + 1] = False
+
+        tokens = []
+        end = length
+        while end > 0:
+            start = back[end]
+            token = text[start:end]
+            # Merge runs of unknown characters into one token (usually a name)
+            if not known[end] and tokens and tokens[-1][1]:
+                tokens[-1] = (token + tokens[-1][0], True)
+            else:
+                tokens.append((token, not known[end]))
+            end = start
+        tokens.reverse()
+
+        # Fewest unknown characters favours a short dictionary word plus leftovers
+        # (มา + ตรฐาน, ละ + ออง) over one unlisted word, so as in ICU's Thai
+        # breaker a short word right before an unknown run is joined to it
+        merged = []
+        for token, unknown in tokens:
+            if unknown and merged and not merged[-1][1] and len(merged[-1][0]) < SHORT_WORD_CHARS:
+                merged[-1] = (merged[-1][0] + token, True)
+            else:
+                merged.append((token, unknown))
+
+        return [token for token, _ in merged]
+
+    def tokenize(self, text: str) -> List[str]:
+        """Split text into words"""
+        if not text:
+            return []
+
+        tokens = []
+        for run in RUN_PATTERN.findall(text):
+            if THAI_PATTERN.match(run):
+                tokens.extend(self._segment_thai(run))
+            else:
+                tokens.append(run)
+        return tokens
+
+
+_tokenizer: Optional[ThaiTokenizer] = None
+
+
+def get_tokenizer() -> ThaiTokenizer:
+    """Get the process-wide tokenizer, loading the dictionary on first use"""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = ThaiTokenizer()
+    return _tokenizer
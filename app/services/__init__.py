@@ -1,6 +1,9 @@
 # Services package initialization
 from app.services.article_service import ArticleService
 from app.services.trend_service import TrendService
+from app.services.export_service import ExportService
+from app.services.broadcast_service import BroadcastHub, broadcast_hub
+from app.services.enrichment_service import EnrichmentService, enrichment_service
 from app.services.scheduler_service import SchedulerService, scheduler_service
 
-__all__ = ['ArticleService', 'TrendService', 'SchedulerService', 'scheduler_service']
+__all__ = ['ArticleService', 'TrendService', 'ExportService', 'BroadcastHub', 'broadcast_hub', 'EnrichmentService', 'enrichment_service', 'SchedulerService', 'scheduler_service']
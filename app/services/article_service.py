@@ -1,23 +1,61 @@
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, update, and_, or_, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import json
 import logging
-from app.models import Article, Source
-from app.schemas import ArticleCreate, ArticleResponse
-from app.scraper import RSSParser, DataNormalizer, Deduplicator
+import random
+import time
+from app.cache import response_cache
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Article, Source, SEARCH_CONFIG, build_search_vector
+from app.scraper import RSSParser, HTMLScraper, DataNormalizer, Deduplicator, FetchEngine, parse_pool, source_breakers
+from app.services.trend_service import TrendService
+from app.services.broadcast_service import broadcast_hub
+from app.services.webhook_service import webhook_notifier
+from app.services.enrichment_service import enrichment_service
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT statement (asyncpg allows at most 32767 bind parameters)
+INSERT_BATCH_SIZE = 500
+
+# Adaptive scheduling: back off 1.5x on feeds with nothing new,
+# speed up feeds that return more than this many new articles per fetch
+ADAPTIVE_BACKOFF_FACTOR = 1.5
+ADAPTIVE_TARGET_NEW_ARTICLES = 3
+
+# Article columns written at ingest; the rest use server defaults
+ARTICLE_INSERT_COLUMNS = (
+    'source_id', 'title', 'summary', 'content', 'url', 'author', 'category',
+    'tags', 'published_at', 'content_hash', 'image_url', 'language',
+    'simhash', 'simhash_bands', 'cluster_id'
+)
+
 
 class ArticleService:
     """Business logic for article management"""
     
     def __init__(self):
         self.rss_parser = RSSParser()
+        self.html_scraper = HTMLScraper()
         self.normalizer = DataNormalizer()
         self.deduplicator = Deduplicator()
+        self.fetch_engine = FetchEngine()
+        self.trend_service = TrendService()
+    
+    @staticmethod
+    def _article_filters(since: Optional[datetime] = None, category: Optional[str] = None) -> list:
+        """Filter conditions shared by listing and counting"""
+        conditions = []
+        if since:
+            conditions.append(Article.created_at >= since)
+        if category:
+            conditions.append(Article.category == category)
+        return conditions
     
     async def get_articles(
         self,
@@ -25,30 +63,59 @@ class ArticleService:
         skip: int = 0,
         limit: int = 100,
         since: Optional[datetime] = None,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        after: Optional[Tuple[Optional[datetime], int]] = None
     ) -> List[Article]:
-        """Get articles with optional filters"""
+        """
+        Get articles with optional filters, newest first
+        
+        Order is published_at DESC NULLS LAST, id DESC. Pass `after` as the
+        (published_at, id) of the last article of the previous page to seek
+        straight to the next page instead of skipping rows with an offset.
+        """
         try:
-            query = select(Article)
-            
-            # Apply filters
-            conditions = []
-            if since:
-                conditions.append(Article.created_at >= since)
-            if category:
-                conditions.append(Article.category == category)
+            conditions = self._article_filters(since, category)
+            order_by = (Article.published_at.desc().nulls_last(), Article.id.desc())
             
-            if conditions:
-                query = query.where(and_(*conditions))
-            
-            # Order by published date (most recent first)
-            query = query.order_by(Article.published_at.desc())
+            if after is None and skip:
+                # Offset paging, kept for existing clients
+                result = await db.execute(
+                    select(Article)
+                    .where(*conditions)
+                    .order_by(*order_by)
+                    .offset(skip)
+                    .limit(limit)
+                )
+                return result.scalars().all()
             
-            # Pagination
-            query = query.offset(skip).limit(limit)
+            # Dated and undated articles are read as two index ranges, so the
+            # seek never needs an OR across them
+            articles = []
+            if after is None or after[0] is not None:
+                dated = conditions + [Article.published_at.isnot(None)]
+                if after is not None:
+                    dated.append(tuple_(Article.published_at, Article.id) < tuple_(after[0], after[1]))
+                
+                result = await db.execute(
+                    select(Article)
+                    .where(*dated)
+                    .order_by(*order_by)
+                    .limit(limit)
+                )
+                articles = list(result.scalars().all())
             
-            result = await db.execute(query)
-            articles = result.scalars().all()
+            if len(articles) < limit:
+                undated = conditions + [Article.published_at.is_(None)]
+                if after is not None and after[0] is None:
+                    undated.append(Article.id < after[1])
+                
+                result = await db.execute(
+                    select(Article)
+                    .where(*undated)
+                    .order_by(Article.id.desc())
+                    .limit(limit - len(articles))
+                )
+                articles.extend(result.scalars().all())
             
             return articles
         
@@ -56,6 +123,92 @@ class ArticleService:
             logger.error(f"Error getting articles: {e}")
             return []
     
+    async def count_articles(
+        self,
+        db: AsyncSession,
+        since: Optional[datetime] = None,
+        category: Optional[str] = None
+    ) -> Tuple[int, bool]:
+        """
+        Count articles matching the filters, returning (total, is_estimate)
+        
+        Counting stops after settings.api_count_exact_limit rows; beyond that
+        the total is the planner's row estimate, so the cost stays flat as
+        the archive grows.
+        """
+        conditions = self._article_filters(since, category)
+        exact_limit = settings.api_count_exact_limit
+        
+        limited = select(Article.id).where(*conditions).limit(exact_limit + 1).subquery()
+        count = await db.scalar(select(func.count()).select_from(limited))
+        if count <= exact_limit:
+            return count, False
+        
+        try:
+            # Filter values stay bound parameters rather than being inlined into the SQL
+            conn = await db.connection()
+            compiled = select(Article.id).where(*conditions).compile(dialect=conn.dialect)
+            params = compiled.construct_params()
+            if compiled.positional:
+                params = tuple(params[name] for name in compiled.positiontup)
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            return max(estimate, count), True
+        
+        except Exception as e:
+            logger.error(f"Error estimating article count: {e}")
+            return count, True
+    
+    async def search_articles(
+        self,
+        db: AsyncSession,
+        query_text: str,
+        limit: int = 20,
+        offset: int = 0,
+        since: Optional[datetime] = None,
+        category: Optional[str] = None
+    ) -> List[Tuple[Article, float]]:
+        """
+        Full-text search, returning (article, rank) pairs best first
+        
+        The query is segmented like the indexed text and all its words must
+        match. Ranking is limited to the newest settings.search_candidate_limit
+        matches, so very common words cannot make a search rank the whole table.
+        """
+        terms = self.normalizer.search_terms(query_text)
+        if not terms:
+            return []
+        
+        try:
+            tsquery = func.plainto_tsquery(SEARCH_CONFIG, terms)
+            
+            candidates = (
+                select(Article.id)
+                .where(Article.search_vector.op('@@')(tsquery), *self._article_filters(since, category))
+                .order_by(Article.published_at.desc().nulls_last(), Article.id.desc())
+                .limit(settings.search_candidate_limit)
+                .subquery()
+            )
+            rank = func.ts_rank_cd(Article.search_vector, tsquery).label('rank')
+            
+            result = await db.execute(
+                select(Article, rank)
+                .join(candidates, candidates.c.id == Article.id)
+                .options(selectinload(Article.source))
+                .order_by(rank.desc(), Article.published_at.desc().nulls_last(), Article.id.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+            
+            return [(row[0], row[1]) for row in result.all()]
+        
+        except Exception as e:
+            logger.error(f"Error searching articles for '{query_text}': {e}")
+            return []
+    
     async def get_article_by_id(self, db: AsyncSession, article_id: int) -> Optional[Article]:
         """Get a single article by ID"""
         try:
@@ -65,153 +218,462 @@ class ArticleService:
             logger.error(f"Error getting article {article_id}: {e}")
             return None
     
-    async def create_article(self, db: AsyncSession, article_data: dict) -> Optional[Article]:
-        """Create a new article"""
-        try:
-            # Normalize data
-            normalized = self.normalizer.normalize_article(article_data)
+    async def _insert_article_rows(self, db: AsyncSession, articles: List[dict]) -> List[dict]:
+        """Insert articles in one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING"""
+        rows = []
+        for article in articles:
+            if 'search_title' not in article:
+                self.normalizer.add_search_terms(article)
+            row = {column: article.get(column) for column in ARTICLE_INSERT_COLUMNS}
+            row['search_vector'] = build_search_vector(article['search_title'], article['search_body'])
+            rows.append(row)
+        
+        # No conflict target: skip rows clashing on either content_hash or url
+        stmt = (
+            pg_insert(Article)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(Article.id, Article.content_hash)
+        )
+        result = await db.execute(stmt)
+        inserted_ids = {row.content_hash: row.id for row in result.all()}
+        
+        return [
+            {**article, 'id': inserted_ids[article['content_hash']]}
+            for article in articles
+            if article['content_hash'] in inserted_ids
+        ]
+    
+    async def bulk_insert_articles(self, db: AsyncSession, articles: List[dict]) -> List[dict]:
+        """
+        Insert normalized articles in batches and return exactly the rows that were new
+        
+        Each batch runs in a savepoint. If a batch fails, its rows are retried one
+        by one so a single bad row does not discard the rest of the feed.
+        """
+        inserted = []
+        
+        for start in range(0, len(articles), INSERT_BATCH_SIZE):
+            batch = articles[start:start + INSERT_BATCH_SIZE]
             
-            # Add content hash
-            normalized = self.deduplicator.add_hash_to_article(normalized)
+            try:
+                async with db.begin_nested():
+                    inserted.extend(await self._insert_article_rows(db, batch))
+            except Exception as e:
+                logger.warning(f"Batch insert failed, retrying {len(batch)} articles individually: {e}")
+                
+                for article in batch:
+                    try:
+                        async with db.begin_nested():
+                            inserted.extend(await self._insert_article_rows(db, [article]))
+                    except Exception as e:
+                        logger.error(f"Error creating article {article.get('url')}: {e}")
+        
+        return inserted
+    
+    async def assign_clusters(self, db: AsyncSession, articles: List[dict]):
+        """Link articles to near-duplicates already stored, via the SimHash band index"""
+        bands = {
+            band
+            for article in articles if article.get('simhash_bands')
+            for band in article['simhash_bands']
+        }
+        if not bands:
+            return
+        
+        since = datetime.now(timezone.utc) - timedelta(hours=settings.simhash_window_hours)
+        result = await db.execute(
+            select(Article.id, Article.simhash, Article.simhash_bands, Article.cluster_id)
+            .where(
+                and_(
+                    Article.simhash_bands.overlap(list(bands)),
+                    Article.created_at >= since
+                )
+            )
+        )
+        
+        candidates_by_band = {}
+        for candidate in result.all():
+            for band in candidate.simhash_bands:
+                candidates_by_band.setdefault(band, []).append(candidate)
+        
+        for article in articles:
+            if article.get('simhash') is None:
+                continue
             
-            # Create article
-            article = Article(**normalized)
-            db.add(article)
-            await db.commit()
-            await db.refresh(article)
+            best = None
+            for band in article['simhash_bands']:
+                for candidate in candidates_by_band.get(band, []):
+                    distance = self.deduplicator.hamming_distance(article['simhash'], candidate.simhash)
+                    if distance <= settings.simhash_max_distance and (best is None or distance < best[0]):
+                        best = (distance, candidate)
             
-            return article
+            if best:
+                candidate = best[1]
+                article['cluster_id'] = candidate.cluster_id or candidate.id
+    
+    async def link_batch_duplicates(self, db: AsyncSession, inserted: List[dict]):
+        """Link near-duplicates inserted in the same batch to the first one of them"""
+        roots = []
+        updates = []
         
-        except Exception as e:
-            await db.rollback()
-            logger.error(f"Error creating article: {e}")
-            return None
+        for article in inserted:
+            if article.get('simhash') is None or article.get('cluster_id'):
+                continue
+            
+            for root in roots:
+                if self.deduplicator.hamming_distance(article['simhash'], root['simhash']) <= settings.simhash_max_distance:
+                    article['cluster_id'] = root['id']
+                    updates.append({'id': article['id'], 'cluster_id': root['id']})
+                    break
+            else:
+                roots.append(article)
+        
+        if updates:
+            await db.execute(update(Article), updates)
+    
+    def is_supported_source(self, source: Source) -> bool:
+        """Check if the source type has a fetcher"""
+        if source.type == 'html':
+            # HTML sources cannot be scraped without at least a link selector
+            return bool(source.config and source.config.get('link_selector'))
+        return source.type == 'rss'
     
-    async def get_existing_hashes(self, db: AsyncSession, since: Optional[datetime] = None) -> set:
-        """Get set of existing content hashes for deduplication"""
+    async def get_known_urls(self, urls: List[str]) -> set:
+        """URLs among these that are already stored (own session: called while other fetches run)"""
+        if not urls:
+            return set()
+        
         try:
-            query = select(Article.content_hash)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(Article.url).where(Article.url.in_(urls)))
+                return set(result.scalars().all())
+        except Exception as e:
+            logger.error(f"Error checking known article URLs: {e}")
+            return set()
+    
+    async def fetch_source_articles(self, source: Source) -> Tuple[List[dict], Optional[dict]]:
+        """
+        Fetch, parse and normalize article data from a source (does not use the caller's session)
+        
+        Parsing and normalization run in the parse pool so the event loop stays
+        free. Returns normalized article data with content hashes and the feed
+        validators to store on the source.
+        
+        HTML sources fetch the listing page, then only the article pages whose
+        URLs are not stored yet, a few at a time. Pages that keep failing are
+        skipped after HTML_ARTICLE_MAX_ATTEMPTS fetches.
+        """
+        logger.info(f"Fetching from source: {source.name} ({source.url})")
+        # Retries must fit in the fetch engine's per-source timeout
+        deadline = self.fetch_engine.fetch_deadline()
+        
+        if source.type == 'rss':
+            feed_result = await self.rss_parser.fetch_feed_content(
+                source.url,
+                etag=source.etag,
+                last_modified=source.last_modified,
+                previous_hash=source.feed_hash,
+                deadline=deadline
+            )
             
-            if since:
-                query = query.where(Article.created_at >= since)
+            if not feed_result:
+                return [], None
             
-            result = await db.execute(query)
-            hashes = {row[0] for row in result.all()}
+            # Unchanged feed: skip parsing entirely
+            if feed_result['not_modified']:
+                return [], feed_result
             
-            return hashes
+            articles_data = await parse_pool.parse_and_normalize(
+                feed_result['content'],
+                source.id,
+                source.category,
+                source.url
+            )
+            return articles_data, feed_result
         
-        except Exception as e:
-            logger.error(f"Error getting existing hashes: {e}")
-            return set()
+        if source.type == 'html':
+            config = {'language': source.language, **source.config}
+            listing_result = await self.html_scraper.fetch_page(
+                source.url,
+                etag=source.etag,
+                last_modified=source.last_modified,
+                previous_hash=source.feed_hash,
+                deadline=deadline
+            )
+            
+            if not listing_result:
+                return [], None
+            
+            if listing_result['not_modified']:
+                return [], listing_result
+            
+            links = await parse_pool.extract_html_links(listing_result['content'], source.url, config)
+            known = await self.get_known_urls([self.normalizer.normalize_url(link) for link in links])
+            # Pages that failed HTML_ARTICLE_MAX_ATTEMPTS times are skipped like known ones
+            new_links = [
+                link for link in links
+                if self.normalizer.normalize_url(link) not in known and not self.html_scraper.gave_up(link)
+            ]
+            
+            # Article pages have their own budget, so a Crawl-delay cannot cost the listing
+            pages = await self.html_scraper.fetch_article_pages(
+                new_links,
+                deadline=time.monotonic() + settings.html_article_timeout
+            )
+            articles_data = await parse_pool.parse_and_normalize_html(pages, source.id, source.category, config)
+            logger.info(f"Scraped {len(articles_data)} of {len(new_links)} new article pages from {source.name}")
+            
+            fetched = {url for url, _ in pages}
+            retry = [link for link in new_links if link not in fetched and not self.html_scraper.gave_up(link)]
+            if retry:
+                # Keep the stored validators so the next fetch reads the listing again
+                # and retries the missing pages (the stored ones are known by then);
+                # once every missing page is given up on, the validators advance
+                listing_result = {
+                    **listing_result,
+                    'etag': source.etag,
+                    'last_modified': source.last_modified,
+                    'body_hash': source.feed_hash
+                }
+            return articles_data, listing_result
+        
+        logger.warning(f"Source type {source.type} not yet implemented")
+        return [], None
     
-    async def fetch_from_source(self, db: AsyncSession, source: Source) -> int:
-        """Fetch articles from a single source"""
+    async def store_source_articles(
+        self,
+        db: AsyncSession,
+        source: Source,
+        articles_data: List[dict],
+        feed_result: Optional[dict] = None
+    ) -> List[dict]:
+        """
+        Deduplicate and insert normalized articles for a source
+        
+        Returns exactly the rows this call inserted (with their ids, from
+        INSERT ... RETURNING), after they are committed and handed to the
+        downstream consumers. feed_result is None when the fetch failed.
+        """
+        # A rollback expires the source, so its name is read up front for the error log
+        source_name = source.name
+        
         try:
-            logger.info(f"Fetching from source: {source.name} ({source.url})")
-            
-            # Get existing hashes (last 7 days to avoid checking entire DB)
-            since = datetime.utcnow() - timedelta(days=7)
-            existing_hashes = await self.get_existing_hashes(db, since)
-            
-            # Fetch and parse articles
-            if source.type == 'rss':
-                articles_data = await self.rss_parser.parse_feed(
-                    source.url,
-                    source.id,
-                    source.category
-                )
-            else:
-                logger.warning(f"Source type {source.type} not yet implemented")
-                return 0
+            # Saved in the same transaction as the articles, so a failed insert
+            # does not make the next fetch skip this body as unchanged
+            if feed_result:
+                source.etag = feed_result['etag']
+                source.last_modified = feed_result['last_modified']
+                source.feed_hash = feed_result['body_hash']
             
-            # Process articles
-            new_count = 0
-            for article_data in articles_data:
-                # Normalize
-                normalized = self.normalizer.normalize_article(article_data)
-                
-                # Check for duplicates
-                normalized = self.deduplicator.add_hash_to_article(normalized)
-                
-                if normalized['content_hash'] not in existing_hashes:
-                    # Create article directly to avoid nested async issues
-                    try:
-                        article = Article(**normalized)
-                        db.add(article)
-                        await db.flush()  # Flush instead of commit
-                        new_count += 1
-                        existing_hashes.add(normalized['content_hash'])
-                    except Exception as e:
-                        logger.error(f"Error creating article: {e}")
-                        await db.rollback()  # Rollback failed insert
+            # Warm the process-level dedupe index on first use
+            if not self.deduplicator.index.warmed:
+                await self.deduplicator.index.warm(db)
             
-            # Update source last_fetched_at
+            # Drop known hashes and duplicates within the feed itself
+            new_articles = []
+            seen_hashes = set()
+            for normalized in articles_data:
+                content_hash = normalized['content_hash']
+                if content_hash not in seen_hashes and not self.deduplicator.is_duplicate(normalized):
+                    new_articles.append(normalized)
+                    seen_hashes.add(content_hash)
+            
+            # Near-duplicates from other sources are kept but linked as a cluster
+            await self.assign_clusters(db, new_articles)
+            
+            # Insert the whole feed in one round-trip; rows that already exist are skipped by the DB
+            inserted = await self.bulk_insert_articles(db, new_articles)
+            await self.link_batch_duplicates(db, inserted)
+            new_count = len(inserted)
+            
+            # Keyword counters are updated in the same transaction as the articles
+            await self.trend_service.record_articles(db, inserted)
+            
+            # Webhook events are queued with the articles, so they survive webhook outages and restarts
+            await webhook_notifier.enqueue_new_articles(db, inserted)
+            
+            # Update source last_fetched_at and schedule the next fetch; a failed fetch
+            # (HTTP error, parked or disallowed source) keeps the current interval
+            # instead of backing off like a quiet feed
             source.last_fetched_at = datetime.utcnow()
+            self.schedule_next_fetch(source, new_count if feed_result is not None else None)
             await db.commit()
             
+            # Rows skipped on conflict also exist now, so record every attempted hash
+            self.deduplicator.index.add_many(seen_hashes)
+            
+            await self.publish_new_articles(inserted)
+            
             logger.info(f"Fetched {new_count} new articles from {source.name}")
-            return new_count
+            return inserted
+        
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error storing articles from source {source_name}: {e}")
+            return []
+    
+    async def publish_new_articles(self, inserted: List[dict]):
+        """Hand newly committed articles to the consumers that run after commit"""
+        if not inserted:
+            return
+        
+        # Cached API responses are stale once new articles are committed
+        await response_cache.invalidate()
+        
+        # Push to live feed subscribers
+        await broadcast_hub.publish(inserted)
+        
+        # Their webhook events were committed with them; let the delivery worker pick them up
+        webhook_notifier.wake()
+        
+        # Fetch the full text of articles whose feed only had a summary, without holding up ingest
+        enrichment_service.enqueue(inserted)
+    
+    async def fetch_from_source(self, db: AsyncSession, source: Source) -> List[dict]:
+        """Fetch articles from a single source, returning the articles inserted"""
+        try:
+            if not self.is_supported_source(source):
+                logger.warning(f"Source type {source.type} not yet implemented")
+                return []
+            
+            articles_data, feed_result = await self.fetch_source_articles(source)
+            return await self.store_source_articles(db, source, articles_data, feed_result)
         
         except Exception as e:
             logger.error(f"Error fetching from source {source.name}: {e}")
-            return 0
+            return []
     
-    async def fetch_from_all_sources(self, db: AsyncSession) -> dict:
-        """Fetch articles from all active sources"""
+    def schedule_next_fetch(self, source: Source, new_count: Optional[int]):
+        """
+        Adapt the source's fetch interval to its publishing rate and set the next fetch time
+        
+        Quiet feeds back off, busy feeds speed up, always within the configured
+        bounds. new_count=None (failed fetch) keeps the current interval.
+        """
+        interval = (
+            source.adaptive_interval_minutes
+            or source.fetch_interval_minutes
+            or settings.scheduler_fetch_interval_minutes
+        )
+        
+        if new_count is not None:
+            if new_count == 0:
+                interval *= ADAPTIVE_BACKOFF_FACTOR
+            else:
+                # Aim for a few new articles per fetch: at most 2x faster or 1.5x slower per step
+                factor = ADAPTIVE_TARGET_NEW_ARTICLES / new_count
+                interval *= min(max(factor, 0.5), ADAPTIVE_BACKOFF_FACTOR)
+        
+        interval = min(
+            max(interval, settings.scheduler_min_interval_minutes),
+            settings.scheduler_max_interval_minutes
+        )
+        source.adaptive_interval_minutes = round(interval)
+        
+        # Jitter keeps sources from drifting into the same tick
+        jitter = random.uniform(-settings.scheduler_jitter_ratio, settings.scheduler_jitter_ratio)
+        source.next_fetch_at = datetime.now(timezone.utc) + timedelta(minutes=interval * (1 + jitter))
+        
+        # A parked source is not due again before its cool-off ends
+        parked_until = source_breakers.open_until(source.url)
+        if parked_until and parked_until > source.next_fetch_at:
+            source.next_fetch_at = parked_until
+    
+    async def fetch_due_sources(self, db: AsyncSession) -> dict:
+        """Fetch active sources whose next fetch time has passed"""
         try:
-            # Get all active sources
+            now = datetime.now(timezone.utc)
             result = await db.execute(
-                select(Source).where(Source.is_active == True)
+                select(Source).where(
+                    and_(
+                        Source.is_active == True,
+                        or_(Source.next_fetch_at.is_(None), Source.next_fetch_at <= now)
+                    )
+                )
             )
             sources = result.scalars().all()
             
-            total_new = 0
+            # Sources never scheduled get a random offset inside their interval,
+            # so a fresh deployment does not fetch every feed in the same tick
+            due = []
+            for source in sources:
+                if source.next_fetch_at is None:
+                    interval = source.fetch_interval_minutes or settings.scheduler_fetch_interval_minutes
+                    source.next_fetch_at = now + timedelta(minutes=random.uniform(0, interval))
+                else:
+                    due.append(source)
+            await db.commit()
+            
+            if not due:
+                return {'total_new': 0, 'by_source': {}, 'new_article_ids': []}
+            
+            return await self.fetch_from_sources(db, due)
+        
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error fetching due sources: {e}")
+            return {'total_new': 0, 'by_source': {}, 'new_article_ids': []}
+    
+    async def mark_sources_due(self, db: AsyncSession) -> int:
+        """Make every active source due now, so the scheduler leader's next fetch_due_sources picks them up"""
+        result = await db.execute(
+            update(Source)
+            .where(Source.is_active == True)
+            .values(next_fetch_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+        return result.rowcount
+    
+    async def fetch_from_sources(self, db: AsyncSession, sources: List[Source]) -> dict:
+        """Fetch articles from the given sources concurrently"""
+        try:
             results = {}
-            new_articles = []
+            new_article_ids = []
             
+            supported = []
             for source in sources:
-                count = await self.fetch_from_source(db, source)
-                total_new += count
-                results[source.name] = count
-            
-            # Get newly created articles for webhook notification
-            if total_new > 0:
-                # Fetch articles created in the last minute
-                recent_time = datetime.utcnow() - timedelta(minutes=1)
-                recent_articles = await self.get_articles(
-                    db=db,
-                    since=recent_time,
-                    limit=total_new
-                )
+                if self.is_supported_source(source):
+                    supported.append(source)
+                else:
+                    logger.warning(f"Source type {source.type} not yet implemented")
+                    results[source.name] = 0
+            
+            # Network fetches run concurrently and keep reading the sources loaded in
+            # the caller's session. Results are stored one source at a time as they
+            # arrive, each in its own session, so a failed store's rollback cannot
+            # expire the sources that running fetches are still using.
+            async for source, fetched, error in self.fetch_engine.run(supported, self.fetch_source_articles):
+                source_name = source.name
                 
-                # Send webhook notification
-                if recent_articles:
-                    from app.services.webhook_service import webhook_notifier
+                async with AsyncSessionLocal() as store_db:
+                    stored_source = await store_db.get(Source, source.id)
+                    if stored_source is None:
+                        logger.warning(f"Source {source_name} was deleted during the fetch")
+                        results[source_name] = 0
+                        continue
                     
-                    # Convert to dict for webhook
-                    articles_data = [
-                        {
-                            'id': article.id,
-                            'title': article.title,
-                            'summary': article.summary,
-                            'url': article.url,
-                            'category': article.category,
-                            'published_at': article.published_at.isoformat() if article.published_at else None,
-                            'tags': article.tags,
-                            'source_id': article.source_id
-                        }
-                        for article in recent_articles
-                    ]
+                    if error is not None:
+                        results[source_name] = 0
+                        self.schedule_next_fetch(stored_source, None)
+                        await store_db.commit()
+                        continue
                     
-                    await webhook_notifier.send_new_articles(articles_data)
+                    articles_data, feed_result = fetched
+                    # Consumers already received these rows when they were committed
+                    inserted = await self.store_source_articles(store_db, stored_source, articles_data, feed_result)
+                
+                new_article_ids.extend(article['id'] for article in inserted)
+                results[source_name] = len(inserted)
             
-            logger.info(f"Total new articles fetched: {total_new}")
+            logger.info(f"Total new articles fetched: {len(new_article_ids)}")
             return {
-                'total_new': total_new,
-                'by_source': results
+                'total_new': len(new_article_ids),
+                'by_source': results,
+                'new_article_ids': new_article_ids
             }
         
         except Exception as e:
-            logger.error(f"Error fetching from all sources: {e}")
-            return {'total_new': 0, 'by_source': {}}
+            logger.error(f"Error fetching from sources: {e}")
+            return {'total_new': 0, 'by_source': {}, 'new_article_ids': []}
 
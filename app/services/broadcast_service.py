@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import text
+from app.cache import response_cache
+from app.config import settings
+from app.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'new_articles'
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7500
+LISTEN_CHECK_SECONDS = 30
+
+# Article fields pushed to live subscribers
+STREAM_FIELDS = (
+    'id', 'source_id', 'title', 'summary', 'url', 'category', 'tags',
+    'published_at', 'image_url', 'cluster_id'
+)
+
+
+def _event_from_article(article: Dict) -> Dict:
+    event = {field: article.get(field) for field in STREAM_FIELDS}
+    if isinstance(event['published_at'], datetime):
+        event['published_at'] = event['published_at'].isoformat()
+    return event
+
+
+class Subscription:
+    """One live-feed client: a bounded queue and its filters"""
+
+    def __init__(self, categories: Optional[Set[str]], source_ids: Optional[Set[int]], max_size: int):
+        self.categories = categories
+        self.source_ids = source_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def matches(self, event: Dict) -> bool:
+        if self.categories and event.get('category') not in self.categories:
+            return False
+        if self.source_ids and event.get('source_id') not in self.source_ids:
+            return False
+        return True
+
+    def offer(self, event: Dict):
+        """Queue an event without blocking; a slow client loses its oldest events"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class BroadcastHub:
+    """
+    Fan-out of newly committed articles to live-feed subscribers
+
+    Publishing never waits on subscribers: each has a bounded queue and a
+    client that falls behind drops its oldest events (and is told how many).
+    Fetches only run in the scheduler leader, so with the Postgres bridge on,
+    new articles go out through NOTIFY and every worker relays them to its
+    own subscribers.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self.use_pg_notify = settings.stream_pg_notify
+        self._listen_task: Optional[asyncio.Task] = None
+        self._listen_conn = None
+        self._stats = {'published': 0, 'dropped': 0}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, categories: Optional[Iterable[str]] = None, source_ids: Optional[Iterable[int]] = None) -> Subscription:
+        """Register a subscriber; raises RuntimeError when the subscriber limit is reached"""
+        if len(self._subscribers) >= settings.stream_max_subscribers:
+            raise RuntimeError("Too many live feed subscribers")
+
+        subscription = Subscription(
+            set(categories) if categories else None,
+            set(source_ids) if source_ids else None,
+            settings.stream_queue_size
+        )
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber"""
+        self._subscribers.discard(subscription)
+        self._stats['dropped'] += subscription.dropped
+
+    def _deliver(self, events: List[Dict]):
+        for subscription in list(self._subscribers):
+            for event in events:
+                if subscription.matches(event):
+                    subscription.offer(event)
+        self._stats['published'] += len(events)
+
+    async def publish(self, articles: List[Dict]):
+        """Push newly committed articles to subscribers in every worker"""
+        if not articles:
+            return
+
+        events = [_event_from_article(article) for article in articles]
+
+        if not self.use_pg_notify:
+            self._deliver(events)
+            return
+
+        try:
+            async with async_engine.connect() as conn:
+                for payload in self._notify_payloads(events):
+                    await conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": NOTIFY_CHANNEL, "payload": payload}
+                    )
+                await conn.commit()
+        except Exception as e:
+            # Still reach this worker's subscribers
+            logger.error(f"Error publishing articles through NOTIFY: {e}")
+            self._deliver(events)
+
+    @staticmethod
+    def _notify_payloads(events: List[Dict]) -> Iterable[str]:
+        """Pack events into JSON arrays that fit in a NOTIFY payload"""
+        batch = []
+        size = 2
+        for event in events:
+            encoded = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+            if len(encoded.encode('utf-8')) + 2 > NOTIFY_MAX_BYTES:
+                event = {**event, 'summary': None, 'tags': None}
+                encoded = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+
+            encoded_size = len(encoded.encode('utf-8')) + 1
+            if batch and size + encoded_size > NOTIFY_MAX_BYTES:
+                yield '[' + ','.join(batch) + ']'
+                batch = []
+                size = 2
+            batch.append(encoded)
+            size += encoded_size
+
+        if batch:
+            yield '[' + ','.join(batch) + ']'
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            self._deliver(json.loads(payload))
+            # The in-process response cache of this worker did not see the ingest
+            if settings.cache_backend == 'memory':
+                asyncio.get_running_loop().create_task(response_cache.invalidate())
+        except Exception as e:
+            logger.error(f"Error relaying live feed notification: {e}")
+
+    async def _listen_loop(self):
+        """Keep a LISTEN connection open, reconnecting if it drops"""
+        while True:
+            try:
+                if self._listen_conn is None:
+                    self._listen_conn = await async_engine.connect()
+                    # Notifications are only delivered between transactions
+                    await self._listen_conn.execution_options(isolation_level="AUTOCOMMIT")
+                    raw = await self._listen_conn.get_raw_connection()
+                    await raw.driver_connection.add_listener(NOTIFY_CHANNEL, self._on_notification)
+                    logger.info("Listening for new articles from other workers")
+
+                await asyncio.sleep(LISTEN_CHECK_SECONDS)
+                await self._listen_conn.exec_driver_sql("SELECT 1")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Live feed listener connection lost, reconnecting: {e}")
+                await self._close_listen_connection()
+                await asyncio.sleep(5)
+
+    async def _close_listen_connection(self):
+        if self._listen_conn is not None:
+            try:
+                await self._listen_conn.invalidate()
+            except Exception:
+                pass
+            self._listen_conn = None
+
+    async def start(self):
+        """Start relaying notifications from other workers (called from app lifespan)"""
+        if self.use_pg_notify and self._listen_task is None:
+            self._listen_task = asyncio.create_task(self._listen_loop())
+
+    async def stop(self):
+        """Stop the listener"""
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+        await self._close_listen_connection()
+
+    def stats(self) -> Dict:
+        """Get subscriber and delivery statistics"""
+        return {
+            **self._stats,
+            'dropped': self._stats['dropped'] + sum(s.dropped for s in self._subscribers),
+            'subscribers': len(self._subscribers)
+        }
+
+
+# Global broadcast hub instance
+broadcast_hub = BroadcastHub()
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy import update
+from app.cache import response_cache
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Article, build_search_vector
+from app.scraper.html_scraper import HTMLScraper
+from app.scraper.parse_pool import parse_pool
+from app.scraper.robots import robots_cache
+from app.services.trend_service import TrendService
+
+logger = logging.getLogger(__name__)
+
+# Article fields the enrichment step needs
+ENRICHMENT_FIELDS = ('id', 'url', 'title', 'summary', 'content', 'tags', 'published_at', 'cluster_id')
+
+
+class EnrichmentService:
+    """
+    Fills in the body of articles whose feed only carried a summary
+    
+    New articles are queued after their insert commits. Worker tasks fetch
+    their pages through the shared fetch layer (robots.txt, Crawl-delay,
+    per-host rate limit, retries), extract the main text in the parse pool
+    and update content, tags, search vector and trend counters. Ingestion
+    never waits for it. The queue is in memory: articles still queued at
+    shutdown, or dropped while it is full, keep their feed summary.
+    """
+    
+    def __init__(self):
+        self.enabled = settings.enrichment_enabled
+        self.html_scraper = HTMLScraper()
+        self.trend_service = TrendService()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._stats = {'queued': 0, 'dropped': 0, 'enriched': 0, 'unchanged': 0, 'failed': 0}
+    
+    def enqueue(self, articles: List[Dict]) -> int:
+        """Queue newly inserted articles with little content; returns how many were queued"""
+        if self._queue is None:
+            return 0
+        
+        queued = 0
+        for article in articles:
+            if not article.get('url') or len(article.get('content') or '') >= settings.enrichment_min_content_chars:
+                continue
+            try:
+                self._queue.put_nowait({field: article.get(field) for field in ENRICHMENT_FIELDS})
+                queued += 1
+            except asyncio.QueueFull:
+                self._stats['dropped'] += 1
+        
+        self._stats['queued'] += queued
+        return queued
+    
+    async def enrich(self, article: Dict) -> bool:
+        """Fetch one article's page and store its full content; returns whether it was updated"""
+        await robots_cache.wait_for_slot(article['url'])
+        page = await self.html_scraper.fetch_page(article['url'], track_failures=False)
+        if not page or not page['content']:
+            self._stats['failed'] += 1
+            return False
+        
+        enriched = await parse_pool.enrich_from_page(page['content'], article)
+        if enriched is None:
+            self._stats['unchanged'] += 1
+            return False
+        
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.execute(
+                    update(Article)
+                    .where(Article.id == article['id'])
+                    .values(
+                        content=enriched['content'],
+                        summary=enriched['summary'],
+                        tags=enriched['tags'],
+                        search_vector=build_search_vector(enriched['search_title'], enriched['search_body'])
+                    )
+                )
+                
+                if enriched['tags'] != article.get('tags'):
+                    await self.trend_service.update_article_tags(
+                        db, [{**article, 'old_tags': article.get('tags'), 'tags': enriched['tags']}]
+                    )
+                
+                await db.commit()
+            
+            except Exception:
+                await db.rollback()
+                raise
+        
+        self._stats['enriched'] += 1
+        return True
+    
+    async def _worker(self):
+        """Enrich queued articles until cancelled"""
+        while True:
+            article = await self._queue.get()
+            try:
+                if await self.enrich(article):
+                    # Refresh cached responses once the current backlog is done
+                    if self._queue.empty():
+                        await response_cache.invalidate()
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats['failed'] += 1
+                logger.error(f"Error enriching article {article.get('id')} ({article.get('url')}): {e}")
+            finally:
+                self._queue.task_done()
+    
+    async def start(self):
+        """Start the enrichment workers (called from app lifespan)"""
+        if self.enabled and not self._workers:
+            self._queue = asyncio.Queue(maxsize=settings.enrichment_queue_size)
+            self._workers = [
+                asyncio.create_task(self._worker())
+                for _ in range(settings.enrichment_concurrency)
+            ]
+            logger.info(f"Enrichment started with {len(self._workers)} workers")
+    
+    async def stop(self):
+        """Stop the workers; queued articles are not enriched"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+    
+    def stats(self) -> Dict:
+        """Get enrichment statistics"""
+        return {
+            **self._stats,
+            'enabled': self.enabled,
+            'workers': len(self._workers),
+            'pending': self._queue.qsize() if self._queue is not None else 0
+        }
+
+
+# Global enrichment service instance
+enrichment_service = EnrichmentService()
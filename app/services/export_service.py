@@ -0,0 +1,175 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+import logging
+from sqlalchemy import select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Article
+
+logger = logging.getLogger(__name__)
+
+# Columns written by every export format, in order
+EXPORT_COLUMNS = (
+    'id', 'source_id', 'title', 'summary', 'content', 'url', 'author', 'category',
+    'tags', 'published_at', 'created_at', 'content_hash', 'image_url', 'language', 'cluster_id'
+)
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects bytes until drained, keeping its own position for the Parquet footer"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """Bulk article export streamed from a server-side cursor"""
+
+    async def stream_rows(
+        self,
+        since: Optional[datetime] = None,
+        category: Optional[str] = None,
+        after_id: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Yield batches of article rows in (created_at, id) order
+
+        Opens its own session: the request's session is closed before a
+        streaming response body is sent. Rows are plain dicts read with
+        yield_per, so memory stays flat however many rows are exported.
+        """
+        batch_size = batch_size or settings.export_batch_size
+        columns = [getattr(Article, column) for column in EXPORT_COLUMNS]
+
+        conditions = []
+        if since:
+            conditions.append(Article.created_at >= since)
+        if category:
+            conditions.append(Article.category == category)
+        if after_id:
+            conditions.append(Article.id > after_id)
+
+        query = (
+            select(*columns)
+            .where(*conditions)
+            .order_by(Article.created_at, Article.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for partition in result.mappings().partitions(batch_size):
+                yield [dict(row) for row in partition]
+
+    async def ndjson_chunks(self, batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+        """One JSON object per line"""
+        async for rows in batches:
+            yield ''.join(
+                json.dumps(row, ensure_ascii=False, default=_json_default, separators=(',', ':')) + '\n'
+                for row in rows
+            ).encode('utf-8')
+
+    async def csv_chunks(self, batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+        """CSV with a header row; tags are a JSON array"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+
+        async for rows in batches:
+            for row in rows:
+                writer.writerow([
+                    json.dumps(row['tags'] or [], ensure_ascii=False) if column == 'tags'
+                    else _csv_value(row[column])
+                    for column in EXPORT_COLUMNS
+                ])
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+        # Header only, for an empty export
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    async def parquet_chunks(self, batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+        """Parquet with one row group per batch (requires pyarrow)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('source_id', pa.int64()),
+            ('title', pa.string()),
+            ('summary', pa.string()),
+            ('content', pa.string()),
+            ('url', pa.string()),
+            ('author', pa.string()),
+            ('category', pa.string()),
+            ('tags', pa.list_(pa.string())),
+            ('published_at', pa.timestamp('us', tz='UTC')),
+            ('created_at', pa.timestamp('us', tz='UTC')),
+            ('content_hash', pa.string()),
+            ('image_url', pa.string()),
+            ('language', pa.string()),
+            ('cluster_id', pa.int64()),
+        ])
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        try:
+            async for rows in batches:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from app.config import settings
+from app.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """
+    Single-leader election across uvicorn workers and replicas using a Postgres advisory lock
+
+    The leader holds a session-level advisory lock on a dedicated connection.
+    If the leader process dies its connection closes, Postgres releases the
+    lock, and the next process to try takes over.
+    """
+
+    def __init__(self, lock_key: Optional[int] = None, engine: Optional[AsyncEngine] = None):
+        self.lock_key = lock_key if lock_key is not None else settings.scheduler_leader_lock_key
+        self.engine = engine or async_engine
+        self.enabled = settings.scheduler_leader_election
+        self._conn: Optional[AsyncConnection] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process held the lock at the last check"""
+        return not self.enabled or self._conn is not None
+
+    async def ensure_leadership(self) -> bool:
+        """Check that this process still holds the lock, or try to take it"""
+        if not self.enabled:
+            return True
+
+        async with self._lock:
+            if self._conn is not None:
+                try:
+                    await self._conn.execute(text("SELECT 1"))
+                    return True
+                except Exception as e:
+                    # The lock went with the connection
+                    logger.warning(f"Lost scheduler leadership: {e}")
+                    await self._discard_connection()
+
+            conn = None
+            try:
+                conn = await self.engine.connect()
+                # Autocommit so holding the connection does not keep a transaction open
+                await conn.execution_options(isolation_level="AUTOCOMMIT")
+                result = await conn.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"),
+                    {"key": self.lock_key}
+                )
+
+                if result.scalar():
+                    self._conn = conn
+                    logger.info("Acquired scheduler leadership")
+                    return True
+
+                await conn.close()
+                return False
+
+            except Exception as e:
+                logger.error(f"Error acquiring scheduler leadership: {e}")
+                if conn is not None:
+                    await conn.invalidate()
+                return False
+
+    async def _discard_connection(self):
+        """Drop the lock connection without returning it to the pool"""
+        try:
+            await self._conn.invalidate()
+        except Exception:
+            pass
+        self._conn = None
+
+    async def release(self):
+        """Release leadership on shutdown so another process can take over immediately"""
+        async with self._lock:
+            if self._conn is None:
+                return
+
+            try:
+                await self._conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"),
+                    {"key": self.lock_key}
+                )
+                await self._conn.close()
+                logger.info("Released scheduler leadership")
+            except Exception as e:
+                logger.error(f"Error releasing scheduler leadership: {e}")
+                await self._discard_connection()
+
+            self._conn = None
+
+
+# Global leader election instance
+leader_election = LeaderElection()
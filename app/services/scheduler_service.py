@@ -1,12 +1,14 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime, date
+from datetime import datetime, date, timedelta, timezone
 import logging
+from app.cache import response_cache
 from app.config import settings
 from app.database import AsyncSessionLocal
 from app.services.article_service import ArticleService
-from app.services.trend_service import TrendService
+from app.services.trend_service import TrendService, trend_today
+from app.services.leader_service import leader_election
 
 logger = logging.getLogger(__name__)
 
@@ -18,15 +20,20 @@ class SchedulerService:
         self.scheduler = AsyncIOScheduler()
         self.article_service = ArticleService()
         self.trend_service = TrendService()
+        self.leader = leader_election
     
     async def fetch_articles_job(self):
-        """Scheduled job to fetch articles from all sources"""
+        """Scheduled job to fetch articles from sources that are due"""
         try:
-            logger.info("Starting scheduled article fetch")
+            # Every worker schedules the job; only the leader runs it
+            if not await self.leader.ensure_leadership():
+                return
             
             async with AsyncSessionLocal() as db:
-                results = await self.article_service.fetch_from_all_sources(db)
-                logger.info(f"Fetch completed: {results['total_new']} new articles")
+                results = await self.article_service.fetch_due_sources(db)
+                
+                if results['by_source']:
+                    logger.info(f"Fetch completed: {results['total_new']} new articles from {len(results['by_source'])} sources")
         
         except Exception as e:
             logger.error(f"Error in scheduled fetch job: {e}")
@@ -34,16 +41,51 @@ class SchedulerService:
     async def extract_trends_job(self):
         """Scheduled job to extract daily trends"""
         try:
+            if not await self.leader.ensure_leadership():
+                return
+            
             logger.info("Starting trend extraction")
             
             async with AsyncSessionLocal() as db:
-                today = date.today()
-                trends = await self.trend_service.extract_trends_for_date(db, today)
-                logger.info(f"Extracted {len(trends)} trends for {today}")
+                today = trend_today()
+                count = await self.trend_service.extract_trends_for_date(db, today)
+                logger.info(f"Reconciled {count} trend counters for {today}")
+            
+            await response_cache.invalidate()
         
         except Exception as e:
             logger.error(f"Error in trend extraction job: {e}")
     
+    async def rescore_trends_job(self):
+        """Scheduled job to refresh today's trend scores"""
+        try:
+            if not await self.leader.ensure_leadership():
+                return
+            
+            async with AsyncSessionLocal() as db:
+                if await self.trend_service.rescore_date(db, trend_today()):
+                    await response_cache.invalidate()
+        
+        except Exception as e:
+            logger.error(f"Error in trend rescore job: {e}")
+    
+    async def roll_baselines_job(self):
+        """Scheduled job to fold yesterday into the keyword baselines"""
+        try:
+            if not await self.leader.ensure_leadership():
+                return
+            
+            async with AsyncSessionLocal() as db:
+                today = trend_today()
+                await self.trend_service.roll_baselines(db, today - timedelta(days=1))
+                # Today's scores were computed against the old baselines
+                await self.trend_service.rescore_date(db, today)
+            
+            await response_cache.invalidate()
+        
+        except Exception as e:
+            logger.error(f"Error in keyword baseline job: {e}")
+    
     def start(self):
         """Start the scheduler"""
         if not settings.scheduler_enabled:
@@ -51,24 +93,46 @@ class SchedulerService:
             return
         
         try:
-            # Schedule article fetching
+            # Check for due sources every tick; each source runs on its own interval
             self.scheduler.add_job(
                 self.fetch_articles_job,
-                trigger=IntervalTrigger(minutes=settings.scheduler_fetch_interval_minutes),
+                trigger=IntervalTrigger(seconds=settings.scheduler_tick_seconds),
                 id='fetch_articles',
-                name='Fetch articles from all sources',
-                replace_existing=True
+                name='Fetch articles from due sources',
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
             )
             
-            # Schedule trend extraction (daily at 23:00)
+            # Schedule trend extraction (daily at 23:00 of the trend day)
             self.scheduler.add_job(
                 self.extract_trends_job,
-                trigger=CronTrigger(hour=23, minute=0),
+                trigger=CronTrigger(hour=23, minute=0, timezone=settings.trend_timezone),
                 id='extract_trends',
                 name='Extract daily trends',
                 replace_existing=True
             )
             
+            # Refresh today's burst scores (ingest only rescores the keywords it touches)
+            self.scheduler.add_job(
+                self.rescore_trends_job,
+                trigger=IntervalTrigger(minutes=settings.trend_rescore_minutes),
+                id='rescore_trends',
+                name='Refresh trend scores',
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+            
+            # Roll keyword baselines forward (daily at 00:10 trend time, after the day is complete)
+            self.scheduler.add_job(
+                self.roll_baselines_job,
+                trigger=CronTrigger(hour=0, minute=10, timezone=settings.trend_timezone),
+                id='roll_keyword_baselines',
+                name='Roll keyword baselines',
+                replace_existing=True
+            )
+            
             self.scheduler.start()
             logger.info("Scheduler started successfully")
         
@@ -84,6 +148,24 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"Error shutting down scheduler: {e}")
     
+    def run_fetch_now(self) -> bool:
+        """
+        Run the fetch job now instead of at its next tick
+        
+        The job still only fetches on the leader, and never overlaps a run
+        already in progress (max_instances=1). Returns False when this
+        process has no scheduler; the leader then fetches at its next tick.
+        """
+        if not self.scheduler.running or self.scheduler.get_job('fetch_articles') is None:
+            return False
+        
+        self.scheduler.modify_job('fetch_articles', next_run_time=datetime.now(timezone.utc))
+        return True
+    
+    async def release_leadership(self):
+        """Hand scheduled jobs over to another process"""
+        await self.leader.release()
+    
     def get_jobs(self):
         """Get list of scheduled jobs"""
         return self.scheduler.get_jobs()
@@ -1,112 +1,482 @@
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, update, delete, and_, case, cast, func, literal, bindparam, tuple_, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict
-from datetime import datetime, date, timedelta
-from collections import Counter
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, date, time, timedelta, timezone
+from zoneinfo import ZoneInfo
 import logging
-from app.models import Article, Trend
+from app.config import settings
+from app.models import Article, Trend, DailyArticleCount, KeywordBaseline
 
 logger = logging.getLogger(__name__)
 
+MAX_KEYWORD_LENGTH = 255  # Trend.keyword column size
+UPSERT_BATCH_SIZE = 1000
+TREND_TZ = ZoneInfo(settings.trend_timezone)
+
+
+def trend_day(published_at: datetime) -> date:
+    """Trend day of a publish time (naive times are UTC, as stored)"""
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    return published_at.astimezone(TREND_TZ).date()
+
+
+def trend_day_bounds(target_date: date) -> Tuple[datetime, datetime]:
+    """[start, end) of a trend day as aware datetimes, matching trend_day()"""
+    start = datetime.combine(target_date, time.min, tzinfo=TREND_TZ)
+    end = datetime.combine(target_date + timedelta(days=1), time.min, tzinfo=TREND_TZ)
+    return start, end
+
+
+def trend_today() -> date:
+    """The current trend day"""
+    return datetime.now(TREND_TZ).date()
+
+
+def burst_score(frequency, total: int, mean_rate, var_rate):
+    """
+    SQL expression scoring a keyword count against its baseline
+    
+    z-score of the day's count against the count expected from the keyword's
+    rolling daily rate. The variance gets a Poisson term (expected + 1) so
+    small counts and keywords without a baseline don't blow up; a keyword
+    never seen before scores roughly its count.
+    """
+    total = literal(float(total), Float)
+    expected = mean_rate * total
+    return (cast(frequency, Float) - expected) / func.sqrt(var_rate * total * total + expected + 1.0, type_=Float)
+
 
 class TrendService:
     """Trend extraction and analysis"""
     
-    async def extract_trends_for_date(
+    @staticmethod
+    def _aggregate_keywords(articles: List[Dict]) -> Dict[tuple, List[int]]:
+        """Group article IDs by (date, keyword), skipping near-duplicates"""
+        keyword_articles = {}  # (date, keyword) -> list of article IDs
+        
+        for article in articles:
+            # Near-duplicates only count once, through their cluster's first article
+            if article.get('cluster_id') or not article.get('published_at') or not article.get('tags'):
+                continue
+            
+            article_date = trend_day(article['published_at'])
+            for tag in set(article['tags']):
+                keyword = tag[:MAX_KEYWORD_LENGTH]
+                keyword_articles.setdefault((article_date, keyword), []).append(article['id'])
+        
+        return keyword_articles
+    
+    @staticmethod
+    def _count_articles(articles: List[Dict]) -> Dict[date, int]:
+        """Count articles per day that take part in trends"""
+        counts = {}
+        
+        for article in articles:
+            if article.get('cluster_id') or not article.get('published_at'):
+                continue
+            
+            article_date = trend_day(article['published_at'])
+            counts[article_date] = counts.get(article_date, 0) + 1
+        
+        return counts
+    
+    async def _upsert_daily_counts(
+        self,
+        db: AsyncSession,
+        counts: Dict[date, int],
+        replace: bool = False
+    ):
+        """Add to (or replace) the per-day article totals"""
+        if not counts:
+            return
+        
+        stmt = pg_insert(DailyArticleCount).values([
+            {'date': count_date, 'article_count': count}
+            for count_date, count in counts.items()
+        ])
+        
+        if replace:
+            article_count = stmt.excluded.article_count
+        else:
+            article_count = DailyArticleCount.article_count + stmt.excluded.article_count
+        
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['date'],
+                set_={'article_count': article_count}
+            )
+        )
+    
+    async def score_trends(
         self,
         db: AsyncSession,
         target_date: date,
-        min_frequency: int = 2
-    ) -> List[Trend]:
-        """Extract trending keywords for a specific date"""
+        keywords: Optional[List[str]] = None
+    ):
+        """Recompute burst scores for a date, or only for the given keywords"""
+        total = await db.scalar(
+            select(DailyArticleCount.article_count)
+            .where(DailyArticleCount.date == target_date)
+        ) or 0
+        
+        batches = [None] if keywords is None else [
+            keywords[start:start + UPSERT_BATCH_SIZE]
+            for start in range(0, len(keywords), UPSERT_BATCH_SIZE)
+        ]
+        
+        for batch in batches:
+            # Baselines are looked up once per row; keywords without one score against zero
+            rows = (
+                select(
+                    Trend.id,
+                    func.coalesce(KeywordBaseline.mean_rate, 0.0).label('mean_rate'),
+                    func.coalesce(KeywordBaseline.var_rate, 0.0).label('var_rate')
+                )
+                .outerjoin(KeywordBaseline, KeywordBaseline.keyword == Trend.keyword)
+                .where(Trend.date == target_date)
+            )
+            if batch is not None:
+                rows = rows.where(Trend.keyword.in_(batch))
+            rows = rows.subquery()
+            
+            await db.execute(
+                update(Trend)
+                .where(Trend.id == rows.c.id)
+                .values(score=burst_score(Trend.frequency, total, rows.c.mean_rate, rows.c.var_rate))
+                .execution_options(synchronize_session=False)
+            )
+    
+    async def _upsert_trends(
+        self,
+        db: AsyncSession,
+        keyword_articles: Dict[tuple, List[int]],
+        replace: bool = False
+    ) -> int:
+        """
+        Write keyword counters in multi-row upserts, adding to (or replacing) existing counts
+        
+        Rows go in (date, keyword) order so concurrent writers (ingest and the
+        enrichment workers) lock shared counters in the same order and cannot
+        deadlock each other.
+        """
+        rows = [
+            {
+                'date': trend_date,
+                'keyword': keyword,
+                'frequency': len(article_ids),
+                'article_ids': article_ids
+            }
+            for (trend_date, keyword), article_ids in sorted(keyword_articles.items())
+        ]
+        
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            stmt = pg_insert(Trend).values(rows[start:start + UPSERT_BATCH_SIZE])
+            
+            if replace:
+                set_ = {
+                    'frequency': stmt.excluded.frequency,
+                    'article_ids': stmt.excluded.article_ids,
+                    'updated_at': func.now()
+                }
+            else:
+                set_ = {
+                    'frequency': Trend.frequency + stmt.excluded.frequency,
+                    'article_ids': func.array_cat(Trend.article_ids, stmt.excluded.article_ids),
+                    'updated_at': func.now()
+                }
+            
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=['date', 'keyword'],
+                    set_=set_
+                )
+            )
+        
+        return len(rows)
+    
+    async def record_articles(self, db: AsyncSession, articles: List[Dict]) -> int:
+        """
+        Add newly inserted articles to the per-day keyword counters
+        
+        Called at ingest inside the same transaction as the insert, so trend
+        reads never need to scan articles. Scores of the touched keywords are
+        refreshed right away so rising stories show up on the next read.
+        """
+        await self._upsert_daily_counts(db, self._count_articles(articles))
+        
+        keyword_articles = self._aggregate_keywords(articles)
+        if not keyword_articles:
+            return 0
+        
+        count = await self._upsert_trends(db, keyword_articles)
+        
+        keywords_by_date = {}
+        for trend_date, keyword in keyword_articles:
+            keywords_by_date.setdefault(trend_date, []).append(keyword)
+        for trend_date, keywords in keywords_by_date.items():
+            await self.score_trends(db, trend_date, keywords)
+        
+        return count
+    
+    async def update_article_tags(self, db: AsyncSession, changes: List[Dict]) -> int:
+        """
+        Move articles whose tags changed after ingest to their new keyword counters
+        
+        Each change has the article's id, published_at, cluster_id and its
+        old_tags and new tags. Counters of removed keywords are decremented (and
+        dropped at zero), added keywords are upserted, and both are rescored.
+        Runs in the caller's transaction.
+        """
+        removed = []
+        added = {}
+        touched = {}
+        
+        for change in changes:
+            if change.get('cluster_id') or not change.get('published_at'):
+                continue
+            
+            change_date = trend_day(change['published_at'])
+            old_keywords = {tag[:MAX_KEYWORD_LENGTH] for tag in change.get('old_tags') or []}
+            new_keywords = {tag[:MAX_KEYWORD_LENGTH] for tag in change.get('tags') or []}
+            
+            for keyword in old_keywords - new_keywords:
+                removed.append({'b_date': change_date, 'b_keyword': keyword, 'b_id': change['id']})
+                touched.setdefault(change_date, set()).add(keyword)
+            for keyword in new_keywords - old_keywords:
+                added.setdefault((change_date, keyword), []).append(change['id'])
+                touched.setdefault(change_date, set()).add(keyword)
+        
+        if touched:
+            # Lock the existing counters up front in (date, keyword) order, as ingest does,
+            # so decrementing removed keywords before adding new ones cannot invert it
+            keys = sorted((trend_date, keyword) for trend_date, keywords in touched.items() for keyword in keywords)
+            await db.execute(
+                select(Trend.id)
+                .where(tuple_(Trend.date, Trend.keyword).in_(keys))
+                # "C" collation sorts by code point, like the Python sort of the upserts
+                .order_by(Trend.date, Trend.keyword.collate('C'))
+                .with_for_update()
+            )
+        
+        if removed:
+            removed.sort(key=lambda row: (row['b_date'], row['b_keyword'], row['b_id']))
+            trends = Trend.__table__
+            await db.execute(
+                update(trends)
+                .where(trends.c.date == bindparam('b_date'), trends.c.keyword == bindparam('b_keyword'))
+                .values(
+                    frequency=trends.c.frequency - 1,
+                    article_ids=func.array_remove(trends.c.article_ids, bindparam('b_id')),
+                    updated_at=func.now()
+                ),
+                removed
+            )
+            await db.execute(
+                delete(Trend).where(
+                    Trend.date.in_(list({row['b_date'] for row in removed})),
+                    Trend.frequency <= 0
+                )
+            )
+        
+        if added:
+            await self._upsert_trends(db, added)
+        
+        for trend_date, keywords in touched.items():
+            await self.score_trends(db, trend_date, list(keywords))
+        
+        return len(removed) + sum(len(ids) for ids in added.values())
+    
+    async def extract_trends_for_date(
+        self,
+        db: AsyncSession,
+        target_date: date
+    ) -> int:
+        """
+        Rebuild keyword counters for a date from the stored articles
+        
+        Trends are maintained at ingest; this reconciles the counters (e.g. for
+        backfills or after manual edits) with one aggregate query and bulk upserts.
+        The day is the same [start, end) range ingest buckets articles into, and
+        keywords no longer found that day are deleted.
+        """
         try:
-            # Get articles for the date
-            start_datetime = datetime.combine(target_date, datetime.min.time())
-            end_datetime = datetime.combine(target_date, datetime.max.time())
+            start_datetime, end_datetime = trend_day_bounds(target_date)
             
-            result = await db.execute(
-                select(Article).where(
+            keyword = func.left(func.unnest(Article.tags), MAX_KEYWORD_LENGTH).label('keyword')
+            inner = (
+                select(Article.id, keyword)
+                .where(
                     and_(
                         Article.published_at >= start_datetime,
-                        Article.published_at <= end_datetime
+                        Article.published_at < end_datetime,
+                        Article.cluster_id.is_(None)
                     )
                 )
+                .subquery()
+            )
+            result = await db.execute(
+                select(inner.c.keyword, func.array_agg(func.distinct(inner.c.id)))
+                .group_by(inner.c.keyword)
             )
-            articles = result.scalars().all()
-            
-            if not articles:
-                logger.info(f"No articles found for {target_date}")
-                return []
-            
-            # Collect all keywords/tags
-            keyword_articles = {}  # keyword -> list of article IDs
-            
-            for article in articles:
-                if article.tags:
-                    for tag in article.tags:
-                        if tag not in keyword_articles:
-                            keyword_articles[tag] = []
-                        keyword_articles[tag].append(article.id)
-            
-            # Count frequencies
-            keyword_freq = {k: len(v) for k, v in keyword_articles.items()}
-            
-            # Filter by minimum frequency
-            trending_keywords = {k: v for k, v in keyword_freq.items() if v >= min_frequency}
-            
-            # Create or update trend records
-            trends = []
-            for keyword, frequency in trending_keywords.items():
-                # Check if trend already exists
-                existing = await db.execute(
-                    select(Trend).where(
-                        and_(
-                            Trend.date == target_date,
-                            Trend.keyword == keyword
-                        )
+            
+            keyword_articles = {
+                (target_date, row[0]): list(row[1])
+                for row in result.all()
+                if row[0]
+            }
+            
+            article_count = await db.scalar(
+                select(func.count(Article.id))
+                .where(
+                    and_(
+                        Article.published_at >= start_datetime,
+                        Article.published_at < end_datetime,
+                        Article.cluster_id.is_(None)
                     )
                 )
-                trend = existing.scalar_one_or_none()
-                
-                if trend:
-                    # Update existing
-                    trend.frequency = frequency
-                    trend.article_ids = keyword_articles[keyword]
-                    trend.updated_at = datetime.utcnow()
-                else:
-                    # Create new
-                    trend = Trend(
-                        date=target_date,
-                        keyword=keyword,
-                        frequency=frequency,
-                        article_ids=keyword_articles[keyword]
-                    )
-                    db.add(trend)
-                
-                trends.append(trend)
+            )
+            await self._upsert_daily_counts(db, {target_date: article_count}, replace=True)
             
+            await db.execute(
+                delete(Trend)
+                .where(
+                    Trend.date == target_date,
+                    Trend.keyword.not_in([keyword for _, keyword in keyword_articles])
+                )
+                .execution_options(synchronize_session=False)
+            )
+            count = await self._upsert_trends(db, keyword_articles, replace=True)
+            await self.score_trends(db, target_date)
             await db.commit()
             
-            logger.info(f"Extracted {len(trends)} trends for {target_date}")
-            return trends
+            logger.info(f"Rebuilt {count} keyword counters for {target_date}")
+            return count
         
         except Exception as e:
             await db.rollback()
             logger.error(f"Error extracting trends for {target_date}: {e}")
-            return []
+            return 0
+    
+    async def rescore_date(self, db: AsyncSession, target_date: date) -> bool:
+        """Refresh every score for a date (keywords not seen since the day's total grew drift upwards)"""
+        try:
+            await self.score_trends(db, target_date)
+            await db.commit()
+            return True
+        
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error rescoring trends for {target_date}: {e}")
+            return False
+    
+    async def roll_baselines(self, db: AsyncSession, target_date: date) -> int:
+        """
+        Fold a finished day into the per-keyword baselines
+        
+        Each baseline is an exponentially weighted mean and variance of the
+        keyword's daily share of articles, so scoring never rescans history.
+        Keywords missing that day decay towards zero and are dropped once
+        negligible. Safe to re-run: baselines already at target_date are skipped.
+        """
+        try:
+            total = await db.scalar(
+                select(DailyArticleCount.article_count)
+                .where(DailyArticleCount.date == target_date)
+            )
+            if not total:
+                logger.info(f"No articles counted for {target_date}, baselines unchanged")
+                return 0
+            
+            alpha = settings.trend_baseline_alpha
+            
+            # Existing keywords: rate is 0 on days the keyword did not appear
+            baseline = aliased(KeywordBaseline)
+            day = (
+                select(
+                    baseline.keyword,
+                    (cast(func.coalesce(Trend.frequency, 0), Float) / literal(float(total), Float)).label('rate')
+                )
+                .outerjoin(
+                    Trend,
+                    and_(Trend.keyword == baseline.keyword, Trend.date == target_date)
+                )
+                .where(baseline.updated_date < target_date)
+                .subquery()
+            )
+            diff = day.c.rate - KeywordBaseline.mean_rate
+            result = await db.execute(
+                update(KeywordBaseline)
+                .where(KeywordBaseline.keyword == day.c.keyword)
+                .values(
+                    mean_rate=KeywordBaseline.mean_rate + alpha * diff,
+                    var_rate=(1 - alpha) * (KeywordBaseline.var_rate + alpha * diff * diff),
+                    days_seen=KeywordBaseline.days_seen + case((day.c.rate > 0, 1), else_=0),
+                    updated_date=target_date
+                )
+                .execution_options(synchronize_session=False)
+            )
+            updated = result.rowcount
+            
+            # New keywords start from a zero baseline
+            rate = cast(Trend.frequency, Float) / literal(float(total), Float)
+            result = await db.execute(
+                pg_insert(KeywordBaseline)
+                .from_select(
+                    ['keyword', 'mean_rate', 'var_rate', 'days_seen', 'updated_date'],
+                    select(
+                        Trend.keyword,
+                        alpha * rate,
+                        alpha * (1 - alpha) * rate * rate,
+                        literal(1),
+                        literal(target_date)
+                    )
+                    .where(Trend.date == target_date)
+                )
+                .on_conflict_do_nothing(index_elements=['keyword'])
+            )
+            inserted = result.rowcount
+            
+            result = await db.execute(
+                delete(KeywordBaseline)
+                .where(KeywordBaseline.mean_rate < settings.trend_baseline_min_rate)
+                .execution_options(synchronize_session=False)
+            )
+            pruned = result.rowcount
+            
+            await db.commit()
+            
+            logger.info(f"Rolled keyword baselines for {target_date}: {updated} updated, {inserted} new, {pruned} dropped")
+            return updated + inserted
+        
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error rolling keyword baselines for {target_date}: {e}")
+            return 0
     
     async def get_trends_for_date(
         self,
         db: AsyncSession,
         target_date: date,
-        limit: int = 20
+        limit: int = 20,
+        min_frequency: int = 2,
+        rank: str = 'score'
     ) -> List[Trend]:
-        """Get top trends for a specific date"""
+        """Get top trends for a specific date (top-K scan of the (date, score) or (date, frequency) index)"""
         try:
+            order_by = Trend.frequency.desc() if rank == 'frequency' else Trend.score.desc()
+            
             result = await db.execute(
                 select(Trend)
-                .where(Trend.date == target_date)
-                .order_by(Trend.frequency.desc())
+                .where(
+                    and_(
+                        Trend.date == target_date,
+                        Trend.frequency >= min_frequency
+                    )
+                )
+                .order_by(order_by)
                 .limit(limit)
             )
             trends = result.scalars().all()
@@ -1,60 +1,299 @@
+import asyncio
+import hashlib
+import hmac
 import httpx
+import json
 import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
+from sqlalchemy import select, update, delete, insert, or_, func, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
+from app.database import AsyncSessionLocal
+from app.http_client import http_client
+from app.models import WebhookOutbox
+from app.services.leader_service import leader_election
 
 logger = logging.getLogger(__name__)
 
+# Key holding the items of each event in the delivered payload
+EVENT_ITEMS_KEY = {
+    'new_articles': 'articles',
+    'new_trends': 'trends'
+}
+
+
+def article_webhook_item(article: Dict) -> Dict:
+    """Article fields sent to the webhook"""
+    published_at = article.get('published_at')
+    return {
+        'id': article['id'],
+        'title': article.get('title'),
+        'summary': article.get('summary'),
+        'url': article.get('url'),
+        'category': article.get('category'),
+        'published_at': published_at.isoformat() if isinstance(published_at, datetime) else published_at,
+        'tags': article.get('tags'),
+        'source_id': article.get('source_id')
+    }
+
 
 class WebhookNotifier:
-    """Send notifications to n8n webhook"""
+    """
+    Send notifications to n8n webhook through a durable outbox
+    
+    Ingest writes one outbox row per article in the same transaction as the
+    article, so nothing is lost if the webhook is down or the process dies.
+    A background worker claims pending rows with a lease (FOR UPDATE SKIP
+    LOCKED), posts them in batches, deletes them once acknowledged and
+    reschedules failures with exponential backoff. Delivery is at-least-once:
+    receivers should dedupe on article id.
+    """
     
     def __init__(self):
         self.webhook_url = settings.webhook_url
         self.webhook_secret = settings.webhook_secret
         self.enabled = settings.webhook_enabled and bool(self.webhook_url)
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stats = {'delivered': 0, 'requests': 0, 'failed_requests': 0, 'dead': 0}
     
-    async def send_new_articles(self, articles: List[Dict]) -> bool:
-        """Send new articles to n8n webhook"""
-        if not self.enabled:
-            logger.debug("Webhook notifications disabled")
-            return False
+    def _headers(self, body: bytes, delivery_id: Optional[str] = None) -> Dict[str, str]:
+        headers = {
+            "Content-Type": "application/json"
+        }
+        
+        # Add secret header if configured
+        if self.webhook_secret:
+            headers["X-Webhook-Secret"] = self.webhook_secret
+            
+            # Signature over timestamp and body lets the receiver reject forged or replayed requests
+            timestamp = str(int(time.time()))
+            signature = hmac.new(
+                self.webhook_secret.encode('utf-8'),
+                timestamp.encode('utf-8') + b'.' + body,
+                hashlib.sha256
+            ).hexdigest()
+            headers["X-Webhook-Timestamp"] = timestamp
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+        
+        if delivery_id:
+            headers["X-Webhook-Delivery"] = delivery_id
+        
+        return headers
+    
+    async def _post(self, payload: Dict, delivery_id: Optional[str] = None):
+        """POST a JSON payload; raises on network errors and non-2xx responses"""
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        response = await http_client.client.post(
+            self.webhook_url,
+            content=body,
+            headers=self._headers(body, delivery_id),
+            timeout=settings.webhook_timeout
+        )
+        response.raise_for_status()
+    
+    async def enqueue_new_articles(self, db: AsyncSession, articles: List[Dict]):
+        """Queue new articles for delivery in the caller's transaction (committed with the articles)"""
+        if not self.enabled or not articles:
+            return
         
+        await db.execute(
+            insert(WebhookOutbox),
+            [
+                {'event': 'new_articles', 'payload': article_webhook_item(article)}
+                for article in articles
+            ]
+        )
+    
+    def wake(self):
+        """Tell the delivery worker that new rows were committed"""
+        if self.enabled:
+            self._wake.set()
+    
+    async def _claim(self, db: AsyncSession, limit: int) -> list:
+        """Lease up to limit due rows; rows leased by another worker are skipped"""
+        now = func.now()
+        due = (
+            select(WebhookOutbox.id)
+            .where(
+                WebhookOutbox.failed_at.is_(None),
+                WebhookOutbox.next_attempt_at <= now,
+                or_(WebhookOutbox.locked_until.is_(None), WebhookOutbox.locked_until < now)
+            )
+            .order_by(WebhookOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        
+        result = await db.execute(
+            update(WebhookOutbox)
+            .where(WebhookOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                locked_until=now + timedelta(seconds=settings.webhook_lease_seconds),
+                attempts=WebhookOutbox.attempts + 1
+            )
+            .returning(WebhookOutbox.id, WebhookOutbox.event, WebhookOutbox.payload, WebhookOutbox.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        rows = sorted(result.all(), key=lambda row: row.id)
+        await db.commit()
+        return rows
+    
+    @staticmethod
+    def _backoff_seconds(attempts: int) -> float:
+        """Exponential backoff with jitter, so failed batches do not retry in lockstep"""
+        delay = min(
+            settings.webhook_backoff_base_seconds * 2 ** (attempts - 1),
+            settings.webhook_backoff_max_seconds
+        )
+        return delay * random.uniform(0.5, 1.0)
+    
+    async def _deliver_batch(self, event: str, rows: list) -> Optional[str]:
+        """Post one batch; returns the error message, or None on success"""
+        ids = [row.id for row in rows]
+        delivery_id = hashlib.sha256(','.join(map(str, ids)).encode()).hexdigest()[:32]
+        payload = {
+            "event": event,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "count": len(rows),
+            EVENT_ITEMS_KEY.get(event, 'items'): [row.payload for row in rows]
+        }
+        
+        self._stats['requests'] += 1
         try:
-            headers = {
-                "Content-Type": "application/json"
-            }
+            await self._post(payload, delivery_id)
+            return None
+        except httpx.HTTPError as e:
+            self._stats['failed_requests'] += 1
+            logger.error(f"HTTP error sending webhook ({len(rows)} {event}): {e}")
+            return str(e) or type(e).__name__
+        except Exception as e:
+            self._stats['failed_requests'] += 1
+            logger.error(f"Error sending webhook ({len(rows)} {event}): {e}")
+            return str(e) or type(e).__name__
+    
+    async def _settle(self, db: AsyncSession, delivered: List[int], failed: list):
+        """Delete acknowledged rows and reschedule (or give up on) failed ones"""
+        if delivered:
+            await db.execute(delete(WebhookOutbox).where(WebhookOutbox.id.in_(delivered)))
+            self._stats['delivered'] += len(delivered)
+        
+        if failed:
+            now = datetime.now(timezone.utc)
+            outbox = WebhookOutbox.__table__
+            params = []
+            for row, error in failed:
+                dead = row.attempts >= settings.webhook_max_attempts
+                params.append({
+                    'b_id': row.id,
+                    'b_next': now + timedelta(seconds=self._backoff_seconds(row.attempts)),
+                    'b_error': error[:1000],
+                    'b_failed': now if dead else None
+                })
+                if dead:
+                    self._stats['dead'] += 1
+                    logger.error(f"Giving up on webhook outbox row {row.id} after {row.attempts} attempts")
             
-            # Add secret header if configured
-            if self.webhook_secret:
-                headers["X-Webhook-Secret"] = self.webhook_secret
+            await db.execute(
+                update(outbox)
+                .where(outbox.c.id == bindparam('b_id'))
+                .values(
+                    next_attempt_at=bindparam('b_next'),
+                    last_error=bindparam('b_error'),
+                    failed_at=bindparam('b_failed'),
+                    locked_until=None
+                ),
+                params
+            )
+        
+        await db.commit()
+    
+    async def drain_once(self) -> int:
+        """Claim one round of due rows and deliver them concurrently; returns rows claimed"""
+        batch_size = settings.webhook_batch_size
+        
+        async with AsyncSessionLocal() as db:
+            rows = await self._claim(db, batch_size * settings.webhook_concurrency)
+            if not rows:
+                return 0
             
-            # Prepare payload
-            payload = {
-                "event": "new_articles",
-                "timestamp": articles[0].get("created_at") if articles else None,
-                "count": len(articles),
-                "articles": articles
-            }
+            batches = []
+            for event in dict.fromkeys(row.event for row in rows):
+                event_rows = [row for row in rows if row.event == event]
+                for start in range(0, len(event_rows), batch_size):
+                    batches.append((event, event_rows[start:start + batch_size]))
+            
+            errors = await asyncio.gather(*(self._deliver_batch(event, batch) for event, batch in batches))
+            
+            delivered = []
+            failed = []
+            for (event, batch), error in zip(batches, errors):
+                if error is None:
+                    delivered.extend(row.id for row in batch)
+                else:
+                    failed.extend((row, error) for row in batch)
             
-            # Send to webhook
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
+            await self._settle(db, delivered, failed)
+            
+            if delivered:
+                logger.info(f"Delivered {len(delivered)} outbox events to webhook")
+            return len(rows)
+    
+    async def _run(self):
+        """Deliver outbox rows while this process is the scheduler leader"""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=settings.webhook_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                
+                if self._wake.is_set():
+                    self._wake.clear()
+                    # Let articles from other sources in the same cycle join the batch
+                    await asyncio.sleep(settings.webhook_linger_seconds)
                 
-                logger.info(f"Sent {len(articles)} articles to webhook: {self.webhook_url}")
-                return True
+                if not await leader_election.ensure_leadership():
+                    continue
+                
+                # Keep going while there is a backlog
+                while await self.drain_once() >= settings.webhook_batch_size * settings.webhook_concurrency:
+                    pass
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in webhook delivery worker: {e}")
+                await asyncio.sleep(settings.webhook_poll_seconds)
+    
+    async def start(self):
+        """Start the delivery worker (called from app lifespan)"""
+        if not settings.scheduler_enabled:
+            # The worker takes the scheduler's leader lock, so it only runs where the
+            # scheduler does; events queued here are delivered by the leader
+            logger.info("Webhook delivery worker not started: scheduler is disabled")
+            return
         
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error sending webhook: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Error sending webhook: {e}")
-            return False
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Webhook delivery worker started")
+    
+    async def stop(self):
+        """Stop the delivery worker; rows it had claimed are redelivered after their lease"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def stats(self) -> Dict:
+        """Get delivery statistics"""
+        return {**self._stats, 'enabled': self.enabled, 'running': self._task is not None}
     
     async def send_trends(self, trends: List[Dict]) -> bool:
         """Send trending topics to n8n webhook"""
@@ -62,29 +301,16 @@ class WebhookNotifier:
             return False
         
         try:
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            if self.webhook_secret:
-                headers["X-Webhook-Secret"] = self.webhook_secret
-            
             payload = {
                 "event": "new_trends",
                 "count": len(trends),
                 "trends": trends
             }
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                
-                logger.info(f"Sent {len(trends)} trends to webhook")
-                return True
+            await self._post(payload)
+            
+            logger.info(f"Sent {len(trends)} trends to webhook")
+            return True
         
         except Exception as e:
             logger.error(f"Error sending trends webhook: {e}")
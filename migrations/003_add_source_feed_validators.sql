@@ -0,0 +1,13 @@
+-- Migration: Add conditional GET validators to sources
+-- Date: 2026-10-16
+-- Description: Store ETag, Last-Modified and a body hash per source so unchanged feeds are not re-downloaded or re-parsed
+
+ALTER TABLE sources
+ADD COLUMN IF NOT EXISTS etag TEXT,
+ADD COLUMN IF NOT EXISTS last_modified VARCHAR(64),
+ADD COLUMN IF NOT EXISTS feed_hash VARCHAR(64);
+
+-- Verify the change
+SELECT column_name, data_type, character_maximum_length
+FROM information_schema.columns
+WHERE table_name = 'sources' AND column_name IN ('etag', 'last_modified', 'feed_hash');
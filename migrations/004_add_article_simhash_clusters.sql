@@ -0,0 +1,17 @@
+-- Migration: Add SimHash near-duplicate clustering to articles
+-- Date: 2026-10-16
+-- Description: Store a 64-bit SimHash and its LSH band keys per article, and link near-duplicates to the first article of their cluster
+
+ALTER TABLE articles
+ADD COLUMN IF NOT EXISTS simhash BIGINT,
+ADD COLUMN IF NOT EXISTS simhash_bands INTEGER[],
+ADD COLUMN IF NOT EXISTS cluster_id INTEGER REFERENCES articles(id);
+
+-- Band lookup uses the && (overlap) operator
+CREATE INDEX IF NOT EXISTS ix_articles_simhash_bands ON articles USING GIN (simhash_bands);
+CREATE INDEX IF NOT EXISTS ix_articles_cluster_id ON articles (cluster_id);
+
+-- Verify the change
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'articles' AND column_name IN ('simhash', 'simhash_bands', 'cluster_id');
@@ -0,0 +1,14 @@
+-- Migration: Add per-source adaptive scheduling
+-- Date: 2026-10-16
+-- Description: Track an adapted fetch interval and the next fetch time for each source
+
+ALTER TABLE sources
+ADD COLUMN IF NOT EXISTS adaptive_interval_minutes INTEGER,
+ADD COLUMN IF NOT EXISTS next_fetch_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS ix_sources_next_fetch_at ON sources (next_fetch_at);
+
+-- Verify the change
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'sources' AND column_name IN ('adaptive_interval_minutes', 'next_fetch_at');
@@ -0,0 +1,20 @@
+-- Migration: Maintain trends incrementally at ingest
+-- Date: 2026-10-16
+-- Description: Make (date, keyword) unique so ingest can upsert keyword counters, and index top-K reads by frequency
+
+-- Keep the most recently updated row for any duplicated (date, keyword)
+DELETE FROM trends t
+USING trends newer
+WHERE t.date = newer.date
+  AND t.keyword = newer.keyword
+  AND (t.updated_at, t.id) < (newer.updated_at, newer.id);
+
+ALTER TABLE trends
+ADD CONSTRAINT uq_trends_date_keyword UNIQUE (date, keyword);
+
+CREATE INDEX IF NOT EXISTS ix_trends_date_frequency ON trends (date, frequency);
+
+-- Verify the change
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'trends';
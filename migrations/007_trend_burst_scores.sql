@@ -0,0 +1,41 @@
+-- Migration: Score trends against rolling keyword baselines
+-- Date: 2026-10-16
+-- Description: Add per-day article totals, per-keyword EWMA baselines and a burst score on trends
+
+CREATE TABLE IF NOT EXISTS daily_article_counts (
+    date DATE PRIMARY KEY,
+    article_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS keyword_baselines (
+    keyword VARCHAR(255) PRIMARY KEY,
+    mean_rate DOUBLE PRECISION NOT NULL DEFAULT 0,
+    var_rate DOUBLE PRECISION NOT NULL DEFAULT 0,
+    days_seen INTEGER NOT NULL DEFAULT 0,
+    updated_date DATE NOT NULL
+);
+
+ALTER TABLE trends
+ADD COLUMN IF NOT EXISTS score DOUBLE PRECISION NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS ix_trends_date_score ON trends (date, score);
+
+-- Backfill daily totals from stored articles (near-duplicates are not counted).
+-- Days are TREND_TIMEZONE days, as ingest counts them; edit the zone if you changed it
+INSERT INTO daily_article_counts (date, article_count)
+SELECT (published_at AT TIME ZONE 'Asia/Bangkok')::date, COUNT(*)
+FROM articles
+WHERE published_at IS NOT NULL
+  AND cluster_id IS NULL
+GROUP BY (published_at AT TIME ZONE 'Asia/Bangkok')::date
+ON CONFLICT (date) DO UPDATE SET article_count = EXCLUDED.article_count;
+
+-- Baselines build up from here on as the nightly job rolls each day forward.
+-- Until then every keyword scores against a zero baseline (score ~ frequency).
+UPDATE trends SET score = frequency;
+
+-- Verify the change
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name IN ('trends', 'daily_article_counts', 'keyword_baselines')
+ORDER BY table_name, ordinal_position;
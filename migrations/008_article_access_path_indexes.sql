@@ -0,0 +1,34 @@
+-- Migration: Composite and covering indexes for article access paths
+-- Date: 2026-10-16
+-- Description: Match indexes to the listing order (published_at DESC NULLS LAST, id DESC), category listings,
+--              date-range aggregates by category/source, and per-source lookups; drop the single-column
+--              indexes they replace.
+--
+-- CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block; run this file with psql
+-- without --single-transaction. tests/test_query_plans.py checks the plans.
+
+-- GET /articles without a category, cursor seeks, and index-only date-range aggregates
+-- (trending categories, top sources, daily article totals)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_published_id
+ON articles (published_at DESC NULLS LAST, id DESC)
+INCLUDE (category, source_id, cluster_id);
+
+-- GET /articles?category=...
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_category_published_id
+ON articles (category, published_at DESC NULLS LAST, id DESC);
+
+-- source_id had no index (per-source listings, and deletes of sources checking the foreign key)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_source_published
+ON articles (source_id, published_at DESC);
+
+-- Covered by the composite indexes above
+DROP INDEX CONCURRENTLY IF EXISTS ix_articles_published_at;
+DROP INDEX CONCURRENTLY IF EXISTS ix_articles_category;
+
+ANALYZE articles;
+
+-- Verify the change
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'articles'
+ORDER BY indexname;
@@ -0,0 +1,22 @@
+-- Migration: Full-text search over articles
+-- Date: 2026-10-16
+-- Description: Store a tsvector of Thai-segmented title (weight A) and summary/content (weight B) per article,
+--              with a GIN index for GET /articles/search
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run this file with psql
+-- without --single-transaction.
+
+ALTER TABLE articles
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_search_vector
+ON articles USING GIN (search_vector);
+
+-- New articles get their vector at insert. Postgres cannot segment Thai, so existing
+-- articles are backfilled from the application:
+--   python scripts/backfill_search_vectors.py
+
+-- Verify the change
+SELECT COUNT(*) AS articles_without_search_vector
+FROM articles
+WHERE search_vector IS NULL;
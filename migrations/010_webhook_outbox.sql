@@ -0,0 +1,29 @@
+-- Migration: Durable webhook outbox
+-- Date: 2026-10-16
+-- Description: Queue webhook events in the ingest transaction; a background worker delivers them
+--              in batches with retries (at-least-once) and deletes rows once acknowledged
+
+CREATE TABLE IF NOT EXISTS webhook_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    event VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMPTZ,
+    last_error TEXT,
+    failed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Only pending rows are polled; failed rows stay for inspection and manual replay
+CREATE INDEX IF NOT EXISTS ix_webhook_outbox_pending
+ON webhook_outbox (next_attempt_at)
+WHERE failed_at IS NULL;
+
+-- Replay failed deliveries:
+--   UPDATE webhook_outbox SET failed_at = NULL, attempts = 0, next_attempt_at = NOW() WHERE failed_at IS NOT NULL;
+
+-- Verify the change
+SELECT event, COUNT(*) FILTER (WHERE failed_at IS NULL) AS pending, COUNT(*) FILTER (WHERE failed_at IS NOT NULL) AS failed
+FROM webhook_outbox
+GROUP BY event;
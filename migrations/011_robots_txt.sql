@@ -0,0 +1,18 @@
+-- Migration: Persistent robots.txt cache
+-- Date: 2026-10-16
+-- Description: Store fetched robots.txt per origin with an expiry, so restarts and other workers
+--              reuse it instead of refetching; failed fetches are stored with a short expiry
+
+CREATE TABLE IF NOT EXISTS robots_txt (
+    origin TEXT PRIMARY KEY,
+    status_code INTEGER NOT NULL,
+    body TEXT,
+    fetched_at TIMESTAMPTZ NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+-- Verify the change
+SELECT origin, status_code, LENGTH(body) AS body_bytes, fetched_at, expires_at
+FROM robots_txt
+ORDER BY fetched_at DESC
+LIMIT 20;
@@ -0,0 +1,12 @@
+-- Migration: Per-source scraper configuration
+-- Date: 2026-10-16
+-- Description: Store type-specific source settings from sources.yaml, such as the CSS/XPath
+--              selectors of 'html' sources
+
+ALTER TABLE sources
+ADD COLUMN IF NOT EXISTS config JSONB;
+
+-- Verify the change
+SELECT id, name, type, config
+FROM sources
+WHERE type = 'html';
@@ -0,0 +1,21 @@
+-- Migration: Wider SimHash LSH bands
+-- Date: 2026-10-16
+-- Description: Rebuild article band keys as 4 bands of 16 bits (was 8 bands of 8 bits). With only
+--              2,048 distinct 8-bit band keys, the near-duplicate lookup returned most of the window
+--              for every feed batch. Band i's key is (i << 16) | the hash's i-th 16 bits.
+--              SIMHASH_MAX_DISTANCE must be at most 3 with this layout.
+
+UPDATE articles
+SET simhash_bands = ARRAY[
+    (simhash & 65535)::INTEGER,
+    (65536 + ((simhash >> 16) & 65535))::INTEGER,
+    (131072 + ((simhash >> 32) & 65535))::INTEGER,
+    (196608 + ((simhash >> 48) & 65535))::INTEGER
+]
+WHERE simhash IS NOT NULL;
+
+-- Verify the change (expect no rows with another band count)
+SELECT array_length(simhash_bands, 1) AS bands, count(*)
+FROM articles
+WHERE simhash IS NOT NULL
+GROUP BY 1;
@@ -0,0 +1,19 @@
+-- Migration: Drop single-column trend indexes
+-- Date: 2026-10-16
+-- Description: (date, score) and (date, frequency) serve the top-K trend reads, but with the
+--              single-column date index present the planner fetches the whole day through it and
+--              sorts instead. The single-column frequency index has no query that uses it.
+--
+-- DROP INDEX CONCURRENTLY cannot run inside a transaction block; run this file with psql
+-- without --single-transaction. tests/test_query_plans.py checks the plans.
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_trends_date;
+DROP INDEX CONCURRENTLY IF EXISTS ix_trends_frequency;
+
+ANALYZE trends;
+
+-- Verify the change
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'trends'
+ORDER BY indexname;
@@ -0,0 +1,29 @@
+-- Migration: Count daily article totals by trend day
+-- Date: 2026-10-16
+-- Description: 007 backfilled daily_article_counts by published_at::date, i.e. in the server's
+--              timezone (UTC in the stock image), while ingest counts TREND_TIMEZONE days
+--              (Asia/Bangkok). Recount every day from the stored articles in the trend timezone.
+--              Edit the zone below if TREND_TIMEZONE is set to something else.
+--
+-- Run it while ingest is paused: articles inserted during the recount can be miscounted
+-- (the nightly reconcile recounts the current day anyway). Trend rows for older days can
+-- be rebuilt with TrendService.extract_trends_for_date.
+
+BEGIN;
+
+DELETE FROM daily_article_counts;
+
+INSERT INTO daily_article_counts (date, article_count)
+SELECT (published_at AT TIME ZONE 'Asia/Bangkok')::date, COUNT(*)
+FROM articles
+WHERE published_at IS NOT NULL
+  AND cluster_id IS NULL
+GROUP BY (published_at AT TIME ZONE 'Asia/Bangkok')::date;
+
+COMMIT;
+
+-- Verify the change
+SELECT date, article_count
+FROM daily_article_counts
+ORDER BY date DESC
+LIMIT 7;
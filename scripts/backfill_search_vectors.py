@@ -0,0 +1,69 @@
+"""
+Build search vectors for articles stored before full-text search existed
+
+Usage:
+    python scripts/backfill_search_vectors.py [--batch-size 500]
+
+Safe to stop and re-run: only articles without a vector are processed.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import bindparam, select, update  # noqa: E402
+from app.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models import Article, build_search_vector  # noqa: E402
+from app.scraper.normalizer import DataNormalizer  # noqa: E402
+
+
+async def main(batch_size: int):
+    normalizer = DataNormalizer()
+    # Core table update: runs as a single executemany rather than an ORM bulk update
+    articles = Article.__table__
+    stmt = (
+        update(articles)
+        .where(articles.c.id == bindparam('b_id'))
+        .values(search_vector=build_search_vector(bindparam('b_title'), bindparam('b_body')))
+    )
+
+    total = 0
+    last_id = 0
+    start = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        while True:
+            result = await db.execute(
+                select(Article.id, Article.title, Article.summary, Article.content)
+                .where(Article.search_vector.is_(None), Article.id > last_id)
+                .order_by(Article.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            params = []
+            for row in rows:
+                terms = normalizer.add_search_terms({'title': row.title, 'summary': row.summary, 'content': row.content})
+                params.append({'b_id': row.id, 'b_title': terms['search_title'], 'b_body': terms['search_body']})
+
+            await db.execute(stmt, params)
+            await db.commit()
+
+            last_id = rows[-1].id
+            total += len(rows)
+            print(f"{total} articles indexed ({total / (time.perf_counter() - start):.0f}/s)")
+
+    await async_engine.dispose()
+    print(f"Done: {total} articles")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
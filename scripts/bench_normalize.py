@@ -0,0 +1,208 @@
+"""
+Benchmark per-article normalization: BeautifulSoup clean_html vs the lxml fast path
+
+Feeds are parsed into article dicts exactly as ingest does, then each
+article is normalized with the previous BeautifulSoup cleaner and with the
+current one. Also reports how many cleaned fields differ between the two.
+
+Usage:
+    python scripts/bench_normalize.py [feed files or URLs...]
+    python scripts/bench_normalize.py --sources sources.yaml --save scripts/data/feeds
+    python scripts/bench_normalize.py --synthetic
+
+Without feeds the saved corpus in scripts/data/feeds is used (see the
+README there); --synthetic adds a generated feed of regular entries.
+The previous cleaner needs beautifulsoup4, which is no longer an app
+dependency: pip install -r requirements-bench.txt. Without it only the
+current cleaner is timed.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import yaml  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.scraper.normalizer import DataNormalizer  # noqa: E402
+from app.scraper.rss_parser import RSSParser  # noqa: E402
+
+CLEANED_FIELDS = ('title', 'summary', 'content', 'author')
+
+CORPUS_DIR = Path(__file__).resolve().parent / 'data' / 'feeds'
+
+PARAGRAPHS = [
+    "นายกรัฐมนตรีประกาศมาตรการช่วยเหลือเกษตรกรที่ได้รับผลกระทบจากน้ำท่วมในภาคเหนือ &amp; ภาคอีสาน",
+    "ธนาคารแห่งประเทศไทยคงอัตราดอกเบี้ยนโยบายไว้ที่ระดับเดิม <a href=\"https://example.com/bot\">อ่านต่อ</a>",
+    "ตลาดหลักทรัพย์ปิดตลาดปรับตัวขึ้นตามแรงซื้อของนักลงทุนต่างชาติใน<strong>หุ้นกลุ่มพลังงาน</strong>",
+    "Apple เปิดตัว iPhone รุ่นใหม่พร้อมชิปประมวลผลที่เร็วขึ้นและกล้องที่ดีขึ้น&nbsp;ราคาเริ่มต้น 32,900 บาท",
+]
+
+SAMPLE_ENTRY = """
+<item>
+  <title>{title}</title>
+  <link>https://example.com/news/{n}</link>
+  <guid>https://example.com/news/{n}</guid>
+  <pubDate>Fri, 16 Oct 2026 08:{minute:02d}:00 +0700</pubDate>
+  <dc:creator>กองบรรณาธิการ</dc:creator>
+  <description><![CDATA[<p>{summary}</p>]]></description>
+  <content:encoded><![CDATA[<figure><img src="https://example.com/{n}.jpg"/><figcaption>ภาพประกอบ</figcaption></figure>{body}<script>track({n})</script>]]></content:encoded>
+</item>"""
+
+
+def sample_feed(entries: int = 50) -> bytes:
+    items = []
+    for n in range(entries):
+        body = ''.join(f"<p>{PARAGRAPHS[(n + i) % len(PARAGRAPHS)]}</p>\n" for i in range(4 + n % 12))
+        items.append(SAMPLE_ENTRY.format(
+            n=n,
+            minute=n % 60,
+            title=re.sub(r'<[^>]+>', '', PARAGRAPHS[n % len(PARAGRAPHS)])[:60],
+            summary=PARAGRAPHS[(n + 1) % len(PARAGRAPHS)],
+            body=body
+        ))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>Sample</title>'
+        + ''.join(items) + '</channel></rss>'
+    ).encode('utf-8')
+
+
+def load_feeds(locations):
+    """Raw bytes of each feed file or URL"""
+    feeds = []
+    for location in locations:
+        try:
+            if location.startswith(('http://', 'https://')):
+                response = httpx.get(
+                    location,
+                    timeout=settings.scraper_timeout,
+                    headers={"User-Agent": settings.scraper_user_agent},
+                    follow_redirects=True
+                )
+                response.raise_for_status()
+                feeds.append((location, response.content))
+            else:
+                feeds.append((location, Path(location).read_bytes()))
+        except Exception as e:
+            print(f"Skipping {location}: {e}")
+    return feeds
+
+
+def save_feeds(feeds, directory: str):
+    """Write fetched feeds to directory, named after their host and path"""
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    for location, content in feeds:
+        if not location.startswith(('http://', 'https://')):
+            continue
+        name = re.sub(r'[^\w.-]+', '_', location.split('://', 1)[1]).strip('_')
+        (target / f"{name}.xml").write_bytes(content)
+        print(f"Saved {location} to {target / name}.xml")
+
+
+def feed_urls(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        sources = yaml.safe_load(f).get('sources') or []
+    return [source['url'] for source in sources if source.get('type', 'rss') == 'rss' and source.get('is_active', True)]
+
+
+def old_clean_html(html_text: str) -> str:
+    """The previous BeautifulSoup implementation"""
+    from bs4 import BeautifulSoup
+
+    if not html_text:
+        return ""
+    text = BeautifulSoup(html_text, 'lxml').get_text(separator=' ', strip=True)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class OldDataNormalizer(DataNormalizer):
+    clean_html = staticmethod(old_clean_html)
+
+
+def bench(name, normalizer, articles, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for article in articles:
+            normalizer.normalize_article(article)
+    elapsed = time.perf_counter() - start
+    per_article = elapsed / (rounds * len(articles)) * 1e6
+    print(f"{name:<28} {per_article:>10.1f} us/article {rounds * len(articles) / elapsed:>10.0f} articles/s")
+    return per_article
+
+
+def main(args) -> int:
+    locations = list(args.feeds)
+    if args.sources:
+        locations.extend(feed_urls(args.sources))
+    if locations:
+        feeds = load_feeds(locations)
+        if args.save:
+            save_feeds(feeds, args.save)
+    elif not args.synthetic:
+        feeds = load_feeds(sorted(str(path) for path in CORPUS_DIR.glob('*.xml')))
+    else:
+        feeds = []
+    if args.synthetic:
+        feeds.append(('synthetic sample', sample_feed()))
+
+    parser = RSSParser()
+    articles = []
+    for url, content in feeds:
+        feed = parser.parse_content(content, url)
+        articles.extend(parser.parse_entries(feed, 0, 'news', url))
+    if not articles:
+        print("No feed entries to benchmark")
+        return 1
+
+    chars = sum(len(article.get(field) or '') for article in articles for field in CLEANED_FIELDS)
+    print(f"{len(articles)} entries from {len(feeds)} feeds, {chars / len(articles):.0f} chars of text per entry")
+    rounds = args.rounds or max(1, 2000 // len(articles))
+    print(f"{rounds} rounds\n")
+
+    new = DataNormalizer()
+    # Warm up the tokenizer dictionary outside the timed section
+    new.normalize_article(articles[0])
+
+    # normalize_article logs and swallows errors, so check for bs4 up front
+    try:
+        import bs4  # noqa: F401
+        old = OldDataNormalizer()
+        old.normalize_article(articles[0])
+    except ImportError:
+        old = None
+        print("beautifulsoup4 is not installed (pip install -r requirements-bench.txt), "
+              "skipping the comparison and only timing the current cleaner\n")
+
+    after = bench("normalize_article (lxml)", new, articles, rounds)
+    if old is None:
+        return 0
+    before = bench("normalize_article (bs4)", old, articles, rounds)
+    print(f"\nSpeed-up: {before / after:.2f}x")
+
+    differences = 0
+    for article in articles:
+        for field in CLEANED_FIELDS:
+            if article.get(field) and old.clean_html(article[field]) != new.clean_html(article[field]):
+                differences += 1
+                if differences <= 3:
+                    print(f"\nDiffers in {field} of {article.get('url')}:")
+                    print(f"  bs4:  {old.clean_html(article[field])[:200]!r}")
+                    print(f"  lxml: {new.clean_html(article[field])[:200]!r}")
+    print(f"\n{differences} cleaned fields differ between the two")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark per-article normalization")
+    parser.add_argument('feeds', nargs='*', help="Saved feed files or feed URLs")
+    parser.add_argument('--sources', help="Also fetch every active RSS source in this sources file")
+    parser.add_argument('--save', metavar='DIR', help="Save fetched feeds to DIR (e.g. to refresh scripts/data/feeds)")
+    parser.add_argument('--synthetic', action='store_true', help="Also benchmark a generated feed of regular entries")
+    parser.add_argument('--rounds', type=int, help="Passes over the corpus (default: about 2000 articles)")
+    sys.exit(main(parser.parse_args()))
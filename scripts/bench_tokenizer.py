@@ -0,0 +1,129 @@
+"""
+Benchmark Thai word segmentation on held-out news text
+
+Reports throughput against the previous regex/whitespace keyword split,
+the ingest cost of segmenting an article body for search, how many Thai tokens are not dictionary words, and, if
+PyThaiNLP is installed (pip install pythainlp), how closely word boundaries
+agree with its newmm segmenter. The built-in sample is news text written
+independently of the word list, so it contains names and words the
+dictionary does not have.
+
+Usage:
+    python scripts/bench_tokenizer.py [--dictionary PATH] [text files...]
+"""
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.scraper.normalizer import DataNormalizer, SEARCH_MAX_CHARS  # noqa: E402
+from app.scraper.thai_tokenizer import ThaiTokenizer, THAI_PATTERN, read_words  # noqa: E402
+
+HELD_OUT_TEXTS = [
+    "กรมควบคุมมลพิษรายงานค่าฝุ่นละอองขนาดเล็ก PM2.5 เกินมาตรฐานใน 42 พื้นที่ของกรุงเทพมหานครและปริมณฑล แนะประชาชนสวมหน้ากากอนามัยเมื่อออกนอกอาคาร",
+    "สำนักงานคณะกรรมการอาหารและยาเตือนผู้บริโภคอย่าหลงเชื่อโฆษณาผลิตภัณฑ์เสริมอาหารลดน้ำหนักที่อวดอ้างสรรพคุณเกินจริงทางสื่อออนไลน์",
+    "ทัพนักกีฬาไทยคว้าเหรียญทองเทควันโดรุ่นน้ำหนักไม่เกิน 49 กิโลกรัมหญิง หลังเอาชนะคู่แข่งจากเกาหลีใต้ในรอบชิงชนะเลิศอย่างสนุก",
+    "คณะรัฐมนตรีอนุมัติงบประมาณกลางกว่าสามพันล้านบาทเพื่อเยียวยาเกษตรกรผู้ปลูกข้าวที่ประสบอุทกภัยในจังหวัดพิษณุโลก สุโขทัย และพิจิตร",
+    "ผู้ว่าการการไฟฟ้าส่วนภูมิภาคเผยแผนติดตั้งสถานีอัดประจุไฟฟ้าสำหรับรถยนต์ไฟฟ้าเพิ่มอีกหนึ่งร้อยแห่งตามถนนสายหลักทั่วประเทศภายในสิ้นปี",
+    "นักวิจัยจุฬาลงกรณ์มหาวิทยาลัยพัฒนาชุดตรวจคัดกรองเชื้อไวรัสแบบรวดเร็วที่ทราบผลภายในสิบห้านาทีและมีต้นทุนต่ำกว่าชุดตรวจนำเข้าครึ่งหนึ่ง",
+    "ตลาดหลักทรัพย์แห่งประเทศไทยปิดภาคเช้าปรับตัวลดลงเล็กน้อยจากแรงขายทำกำไรในหุ้นกลุ่มธนาคารพาณิชย์ ขณะที่นักลงทุนรอดูตัวเลขเงินเฟ้อของสหรัฐ",
+    "เทศบาลนครเชียงใหม่ขอความร่วมมือผู้ประกอบการร้านอาหารริมคูเมืองงดวางโต๊ะบนทางเท้าระหว่างเทศกาลยี่เป็ง เพื่อความปลอดภัยของนักท่องเที่ยว",
+    "ศาลปกครองกลางมีคำสั่งทุเลาการบังคับตามประกาศกระทรวงอุตสาหกรรม กรณีโรงงานคัดแยกขยะอิเล็กทรอนิกส์ในอำเภอบ้านโพธิ์ จังหวัดฉะเชิงเทรา",
+    "ค่ายมือถือรายใหญ่เปิดตัวแพ็กเกจอินเทอร์เน็ตไม่จำกัดความเร็วสำหรับนักศึกษา พร้อมส่วนลดค่าเครื่องสมาร์ตโฟนรุ่นใหม่เมื่อสมัครสัญญารายปี",
+]
+
+
+def old_extract_keywords(text: str, max_keywords: int = 10) -> list:
+    """The previous whitespace-split implementation"""
+    cleaned = re.sub(r'[^\u0E00-\u0E7Fa-zA-Z0-9\s]', '', text.lower())
+    words = cleaned.split()
+    thai_stopwords = {'ที่', 'และ', 'ใน', 'เป็น', 'ของ', 'มี', 'จาก', 'ได้', 'ว่า', 'ให้', 'แล้ว', 'ไป', 'มา', 'ไม่', 'ก็', 'ถ้า', 'จะ', 'ทั้ง', 'นี้', 'นั้น'}
+    filtered_words = [w for w in words if len(w) > 2 and w not in thai_stopwords]
+    return [word for word, count in Counter(filtered_words).most_common(max_keywords)]
+
+
+def load_texts(paths):
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.extend(line.strip() for line in f if line.strip())
+    return texts
+
+
+def boundaries(tokens):
+    """Character offsets where words end, ignoring whitespace"""
+    ends = set()
+    position = 0
+    for token in tokens:
+        token = re.sub(r'\s+', '', token)
+        if token:
+            position += len(token)
+            ends.add(position)
+    return ends
+
+
+def bench(name, func, texts, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    count = rounds * len(texts)
+    chars = rounds * sum(len(text) for text in texts)
+    print(f"{name:<22} {count / elapsed:>10.0f} texts/s {chars / elapsed / 1e6:>8.2f} Mchars/s")
+    return chars / elapsed
+
+
+def main(args):
+    texts = load_texts(args.texts) if args.texts else HELD_OUT_TEXTS
+    rounds = max(1, 2000 // len(texts))
+
+    # Load (and compile if needed) the dictionary outside the timed section
+    start = time.perf_counter()
+    tokenizer = ThaiTokenizer(args.dictionary)
+    print(f"Dictionary load: {(time.perf_counter() - start) * 1000:.1f} ms ({tokenizer.node_count} trie nodes)")
+    print(f"{len(texts)} texts x {rounds} rounds\n")
+
+    bench("regex split (old)", old_extract_keywords, texts, rounds)
+    chars_per_second = bench("tokenize", tokenizer.tokenize, texts, rounds)
+    bench("extract_keywords", DataNormalizer.extract_keywords, texts, rounds)
+
+    # search_terms segments up to SEARCH_MAX_CHARS of every ingested body
+    per_article = SEARCH_MAX_CHARS / chars_per_second
+    print(f"\nSearch terms for a {SEARCH_MAX_CHARS} char body: {per_article * 1000:.1f} ms, "
+          f"about {60 / per_article:.0f} articles/min per parse worker")
+
+    words = set(read_words(tokenizer.dictionary_path))
+    thai_tokens = [token for text in texts for token in tokenizer.tokenize(text) if THAI_PATTERN.match(token)]
+    unknown = [token for token in thai_tokens if token not in words]
+    print(f"\n{len(unknown)} of {len(thai_tokens)} Thai tokens are not dictionary words: {unknown[:20]}")
+
+    try:
+        from pythainlp.tokenize import word_tokenize
+    except ImportError:
+        print("\nInstall pythainlp to compare word boundaries with its newmm segmenter")
+    else:
+        matched = predicted = expected = 0
+        for text in texts:
+            ours = boundaries(tokenizer.tokenize(text))
+            reference = boundaries(word_tokenize(text, engine='newmm'))
+            matched += len(ours & reference)
+            predicted += len(ours)
+            expected += len(reference)
+        precision, recall = matched / predicted, matched / expected
+        print(f"\nBoundary agreement with newmm: precision {precision:.3f}, recall {recall:.3f}, "
+              f"F1 {2 * precision * recall / (precision + recall):.3f}")
+
+    print("\nSample output:")
+    print(f"  {tokenizer.tokenize(texts[0])}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark Thai word segmentation")
+    parser.add_argument('texts', nargs='*', help="Text files, one text per line (default: built-in held-out sample)")
+    parser.add_argument('--dictionary', help="Word list to use instead of the configured one")
+    main(parser.parse_args())
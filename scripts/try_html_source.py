@@ -0,0 +1,79 @@
+"""
+Try an HTML source's selectors without touching the database
+
+Fetches the listing page, follows the article links it finds and prints the
+normalized articles the ingest pipeline would insert. Useful while writing
+selectors, and against saved pages served locally:
+
+    python -m http.server 8000 --directory saved_pages/
+    python scripts/try_html_source.py "Example Thai Outlet" --url http://localhost:8000/listing.html
+
+Usage:
+    python scripts/try_html_source.py SOURCE_NAME [--url URL] [--sources sources.yaml]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yaml  # noqa: E402
+from app.http_client import http_client  # noqa: E402
+from app.scraper import HTMLScraper  # noqa: E402
+from app.scraper.parse_pool import extract_html_links, parse_and_normalize_html  # noqa: E402
+
+PRINTED_FIELDS = ('url', 'title', 'published_at', 'author', 'image_url', 'tags', 'summary')
+
+
+def load_source(path: str, name: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        sources = yaml.safe_load(f).get('sources') or []
+    for source in sources:
+        if source['name'] == name:
+            return source
+    raise SystemExit(f"No source named {name!r} in {path}")
+
+
+async def main(args) -> int:
+    source = load_source(args.sources, args.name)
+    url = args.url or source['url']
+    config = {'language': source.get('language', 'th'), **(source.get('config') or {})}
+    if not config.get('link_selector'):
+        raise SystemExit("Source config has no link_selector")
+
+    scraper = HTMLScraper()
+    try:
+        listing = await scraper.fetch_page(url)
+        if not listing or not listing['content']:
+            print(f"Could not fetch listing page {url}")
+            return 1
+
+        links = extract_html_links(listing['content'], url, config)
+        print(f"{len(links)} article links on {url}")
+        for link in links:
+            print(f"  {link}")
+
+        pages = await scraper.fetch_article_pages(links)
+        articles = parse_and_normalize_html(pages, 0, source.get('category'), config)
+        print(f"\n{len(articles)} articles extracted from {len(pages)} pages\n")
+
+        for article in articles:
+            print(json.dumps(
+                {field: article.get(field) for field in PRINTED_FIELDS},
+                ensure_ascii=False, indent=2, default=str
+            ))
+            print(f"  content: {len(article.get('content') or '')} characters\n")
+
+        return 0 if articles else 1
+    finally:
+        await http_client.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Try an HTML source's selectors")
+    parser.add_argument('name', help="Source name in the sources file")
+    parser.add_argument('--url', help="Listing page to use instead of the source URL (e.g. a local copy)")
+    parser.add_argument('--sources', default='sources.yaml', help="Sources file (default: sources.yaml)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
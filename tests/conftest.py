@@ -0,0 +1,49 @@
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+
+import pytest
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope='session')
+def postgres_url():
+    """
+    asyncpg URL of a throwaway Postgres database
+
+    Uses TEST_DATABASE_URL when set (tests create and drop their own tables
+    there, so never point it at real data). Otherwise starts a temporary
+    cluster with initdb/pg_ctl if they are on PATH, and skips if not.
+    """
+    url = os.environ.get('TEST_DATABASE_URL')
+    if url:
+        yield url
+        return
+
+    initdb, pg_ctl = shutil.which('initdb'), shutil.which('pg_ctl')
+    if not (initdb and pg_ctl) or os.geteuid() == 0:
+        pytest.skip("needs TEST_DATABASE_URL, or initdb/pg_ctl on PATH (as a non-root user)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, 'data')
+        port = _free_port()
+        subprocess.run(
+            [initdb, '-D', data_dir, '-U', 'postgres', '--auth=trust'],
+            check=True, capture_output=True
+        )
+        subprocess.run(
+            [pg_ctl, '-D', data_dir, '-l', os.path.join(tmp, 'postgres.log'), '-w',
+             '-o', f"-p {port} -k {tmp} -c listen_addresses=127.0.0.1", 'start'],
+            check=True, capture_output=True
+        )
+        try:
+            yield f"postgresql+asyncpg://postgres@127.0.0.1:{port}/postgres"
+        finally:
+            subprocess.run([pg_ctl, '-D', data_dir, '-m', 'immediate', 'stop'], capture_output=True)
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import Source
+from app.services.article_service import ArticleService, ADAPTIVE_BACKOFF_FACTOR
+
+
+class FakeSession:
+    """Just enough of AsyncSession for a store that inserts nothing"""
+
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = ArticleService()
+    monkeypatch.setattr(service.deduplicator.index, 'warmed', True)
+
+    async def record_articles(db, articles):
+        return 0
+
+    monkeypatch.setattr(service.trend_service, 'record_articles', record_articles)
+    return service
+
+
+def make_source() -> Source:
+    return Source(
+        id=1,
+        name='Example',
+        type='rss',
+        url='https://example.com/feed',
+        fetch_interval_minutes=30,
+        adaptive_interval_minutes=60
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_keeps_interval(service):
+    source = make_source()
+    db = FakeSession()
+
+    await service.store_source_articles(db, source, [], None)
+
+    assert db.commits == 1
+    assert source.adaptive_interval_minutes == 60
+    assert source.next_fetch_at < datetime.now(timezone.utc) + timedelta(minutes=60 * 1.5)
+
+
+@pytest.mark.asyncio
+async def test_quiet_feed_backs_off(service):
+    source = make_source()
+    feed_result = {'etag': None, 'last_modified': None, 'body_hash': 'abc', 'not_modified': True}
+
+    await service.store_source_articles(FakeSession(), source, [], feed_result)
+
+    assert source.adaptive_interval_minutes == round(60 * ADAPTIVE_BACKOFF_FACTOR)
+    assert source.feed_hash == 'abc'
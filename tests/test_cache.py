@@ -0,0 +1,43 @@
+import pytest
+from starlette.requests import Request
+
+from app.cache import ResponseCache
+
+
+def make_request(path: str, query: str = '') -> Request:
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [],
+    })
+
+
+@pytest.mark.asyncio
+async def test_vary_keeps_entries_apart():
+    cache = ResponseCache()
+    cache.enabled = True
+
+    _, key = await cache.get(make_request('/trends/today', 'limit=20'), vary='2026-10-16')
+    await cache.store(make_request('/trends/today', 'limit=20'), key, {'date': '2026-10-16'})
+
+    cached, _ = await cache.get(make_request('/trends/today', 'limit=20'), vary='2026-10-16')
+    assert cached is not None and cached.body == b'{"date":"2026-10-16"}'
+
+    # After midnight the same URL resolves to another day and misses
+    cached, _ = await cache.get(make_request('/trends/today', 'limit=20'), vary='2026-10-17')
+    assert cached is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_entries():
+    cache = ResponseCache()
+    cache.enabled = True
+
+    _, key = await cache.get(make_request('/articles', 'limit=5&category='))
+    await cache.store(make_request('/articles'), key, {'articles': []})
+    assert (await cache.get(make_request('/articles', 'category=&limit=5')))[0] is not None
+
+    await cache.invalidate()
+    assert (await cache.get(make_request('/articles', 'limit=5')))[0] is None
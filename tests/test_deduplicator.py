@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from app.config import settings
+from app.scraper.deduplicator import Deduplicator, SIMHASH_BANDS, SIMHASH_BITS
+
+WINDOW_SIZE = 2000
+
+
+def random_texts(count: int, seed: int = 7):
+    """Unrelated article-sized texts over a shared vocabulary"""
+    rnd = random.Random(seed)
+    vocabulary = [
+        ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rnd.randint(3, 9)))
+        for _ in range(3000)
+    ]
+    return [' '.join(rnd.choices(vocabulary, k=rnd.randint(40, 200))) for _ in range(count)]
+
+
+@pytest.fixture(scope='module')
+def hashes():
+    return [Deduplicator.generate_similarity_hash(text) for text in random_texts(WINDOW_SIZE + 50)]
+
+
+def test_max_distance_is_within_band_guarantee():
+    assert settings.simhash_max_distance <= SIMHASH_BANDS - 1
+
+
+def test_band_keys_fit_integer_column(hashes):
+    for simhash in hashes:
+        bands = Deduplicator.simhash_bands(simhash)
+        assert len(bands) == SIMHASH_BANDS
+        assert all(0 <= band < 2 ** 31 for band in bands)
+
+
+def test_hashes_within_max_distance_share_a_band(hashes):
+    rnd = random.Random(11)
+    for simhash in hashes[:500]:
+        flipped = simhash
+        for bit in rnd.sample(range(SIMHASH_BITS), SIMHASH_BANDS - 1):
+            flipped ^= 1 << bit
+        flipped = Deduplicator._to_signed(flipped & ((1 << SIMHASH_BITS) - 1))
+
+        assert Deduplicator.hamming_distance(simhash, flipped) == SIMHASH_BANDS - 1
+        assert set(Deduplicator.simhash_bands(simhash)) & set(Deduplicator.simhash_bands(flipped))
+
+
+@pytest.mark.parametrize('batch_size', [10, 30, 50])
+def test_batch_lookup_returns_few_candidates(hashes, batch_size):
+    """The overlap query for one feed batch must touch a small fraction of the window"""
+    window = [set(Deduplicator.simhash_bands(simhash)) for simhash in hashes[:WINDOW_SIZE]]
+    batch_keys = {
+        band
+        for simhash in hashes[WINDOW_SIZE:WINDOW_SIZE + batch_size]
+        for band in Deduplicator.simhash_bands(simhash)
+    }
+
+    candidates = sum(1 for bands in window if bands & batch_keys)
+    assert candidates / WINDOW_SIZE < 0.02
+
+
+def test_near_duplicate_texts_are_within_max_distance():
+    text = random_texts(1, seed=3)[0]
+    edited = text + ' updated'
+
+    distance = Deduplicator.hamming_distance(
+        Deduplicator.generate_similarity_hash(text),
+        Deduplicator.generate_similarity_hash(edited)
+    )
+    assert distance <= settings.simhash_max_distance
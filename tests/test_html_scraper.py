@@ -0,0 +1,224 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.http_client import http_client
+from app.models import Source
+from app.scraper import rate_limit
+from app.scraper.html_scraper import HTMLScraper
+from app.scraper.robots import robots_cache
+from app.services.article_service import ArticleService
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'html'
+
+SITE = 'https://news.example.co.th'
+REGIONAL = 'http://regional.example.co.th'
+
+# Saved pages served by the mock site, by URL
+PAGES = {
+    f'{SITE}/news/': 'listing_utf8.html',
+    f'{SITE}/news/2024/11/pm25-bangkok': 'article_utf8.html',
+    f'{SITE}/news/2024/11/ev-chargers': 'article_jsonld.html',
+    f'{REGIONAL}/north/list.php': 'listing_tis620.html',
+    f'{REGIONAL}/north/detail.php?id=1201': 'article_tis620.html',
+}
+
+LISTING_CONFIG = {'link_selector': 'h3.post-title a::attr(href)'}
+REGIONAL_CONFIG = {
+    'link_selector': "xpath://a[@class='headline']/@href",
+    'article': {
+        'title': 'span.topic',
+        'content': 'div.body',
+    },
+}
+
+BANGKOK = timezone(timedelta(hours=7))
+
+
+def fixture(name: str) -> bytes:
+    return (FIXTURES / name).read_bytes()
+
+
+@pytest.fixture(autouse=True)
+def local_site(monkeypatch):
+    """Serve the saved pages through the shared HTTP client, with no robots.txt or rate limit"""
+    async def can_fetch(url):
+        return True
+
+    async def wait_for_slot(url):
+        return None
+
+    def handler(request):
+        name = PAGES.get(str(request.url))
+        if name is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=fixture(name), headers={'Content-Type': 'text/html'})
+
+    monkeypatch.setattr(robots_cache, 'can_fetch', can_fetch)
+    monkeypatch.setattr(robots_cache, 'wait_for_slot', wait_for_slot)
+    monkeypatch.setattr(rate_limit.host_limiter, 'rate', None)
+    # MockTransport holds no connections, so the client needs no closing
+    monkeypatch.setattr(http_client, '_client', httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_extract_links_resolves_and_deduplicates():
+    links = HTMLScraper().extract_links(fixture('listing_utf8.html'), f'{SITE}/news/', LISTING_CONFIG)
+
+    assert links == [
+        f'{SITE}/news/2024/11/pm25-bangkok',
+        f'{SITE}/news/2024/11/ev-chargers',
+        f'{SITE}/news/2024/11/flood-relief?ref=listing',
+    ]
+
+
+def test_extract_links_external_and_limit():
+    scraper = HTMLScraper()
+    content = fixture('listing_utf8.html')
+
+    links = scraper.extract_links(content, f'{SITE}/news/', {**LISTING_CONFIG, 'follow_external_links': True})
+    assert links[-1] == 'https://partner.example.com/promo/smartphone'
+    assert len(links) == 4
+
+    links = scraper.extract_links(content, f'{SITE}/news/', {**LISTING_CONFIG, 'max_articles': 2})
+    assert links == [f'{SITE}/news/2024/11/pm25-bangkok', f'{SITE}/news/2024/11/ev-chargers']
+
+
+def test_extract_links_tis620_listing_with_xpath():
+    scraper = HTMLScraper()
+    content = fixture('listing_tis620.html')
+
+    links = scraper.extract_links(content, f'{REGIONAL}/north/list.php', REGIONAL_CONFIG)
+
+    assert links == [f'{REGIONAL}/north/detail.php?id=1201', f'{REGIONAL}/north/detail.php?id=1198']
+    tree = scraper.parse_document(content, f'{REGIONAL}/north/list.php')
+    assert scraper.select(tree, 'a.headline')[0] == 'เทศบาลนครเชียงใหม่ขอความร่วมมืองดวางโต๊ะบนทางเท้า'
+
+
+def test_parse_article_metadata_defaults():
+    url = f'{SITE}/news/2024/11/pm25-bangkok'
+    article = HTMLScraper().parse_article(fixture('article_utf8.html'), url, 7, 'environment', {})
+
+    assert article['title'] == 'ค่าฝุ่น PM2.5 เกินมาตรฐานหลายพื้นที่ในกรุงเทพฯ'
+    assert article['summary'] == 'กรมควบคุมมลพิษรายงานค่าฝุ่นเกินมาตรฐานใน 42 พื้นที่'
+    assert article['author'] == 'ทีมข่าวสิ่งแวดล้อม'
+    assert article['tags'] == ['ฝุ่น PM2.5', 'กรุงเทพมหานคร']
+    assert article['image_url'] == f'{SITE}/images/2024/11/pm25.jpg'
+    assert article['published_at'] == datetime(2024, 11, 28, 8, 30, tzinfo=BANGKOK)
+    assert article['content'].startswith('<article>')
+    assert article['source_id'] == 7 and article['category'] == 'environment' and article['url'] == url
+
+
+def test_parse_article_configured_selectors():
+    config = {
+        'article': {
+            'title': 'h2.headline',
+            'content': "xpath://div[@id='story']",
+            'author': '.byline .reporter',
+        }
+    }
+    article = HTMLScraper().parse_article(fixture('article_utf8.html'), f'{SITE}/news/2024/11/pm25-bangkok', 7, 'environment', config)
+
+    assert article['title'] == 'ค่าฝุ่น PM2.5 เกินมาตรฐานหลายพื้นที่ในกรุงเทพฯ'
+    assert article['author'] == 'สมชาย ใจดี'
+    assert article['content'].startswith('<div id="story">')
+    assert 'ติดตามรายงานคุณภาพอากาศ' in article['content']
+    # Fields without a configured selector still use the defaults
+    assert article['tags'] == ['ฝุ่น PM2.5', 'กรุงเทพมหานคร']
+
+
+def test_parse_article_json_ld_fallback():
+    article = HTMLScraper().parse_article(fixture('article_jsonld.html'), f'{SITE}/news/2024/11/ev-chargers', 7, 'economy', {})
+
+    assert article['title'] == 'กฟภ. เพิ่มสถานีอัดประจุไฟฟ้าอีกหนึ่งร้อยแห่ง'
+    assert article['summary'] == 'ติดตั้งตามถนนสายหลักทั่วประเทศภายในสิ้นปี'
+    assert article['author'] == 'วิภา รักษ์ดี'
+    assert article['image_url'] == 'https://cdn.example.co.th/ev-chargers.jpg'
+    assert article['tags'] == ['รถยนต์ไฟฟ้า', 'พลังงาน']
+    assert article['published_at'] == datetime(2024, 11, 27, 14, 5, tzinfo=BANGKOK)
+
+
+def test_parse_article_tis620():
+    article = HTMLScraper().parse_article(
+        fixture('article_tis620.html'), f'{REGIONAL}/north/detail.php?id=1201', 3, 'regional', REGIONAL_CONFIG
+    )
+
+    assert article['title'] == 'เทศบาลนครเชียงใหม่ขอความร่วมมืองดวางโต๊ะบนทางเท้า'
+    assert 'เทศกาลยี่เป็ง' in article['content']
+    assert article['published_at'] == datetime(2024, 11, 28, 10, 0, tzinfo=BANGKOK)
+
+
+@pytest.mark.asyncio
+async def test_scrape_listing_and_articles_from_local_site():
+    scraper = HTMLScraper()
+
+    listing = await scraper.fetch_page(f'{SITE}/news/')
+    links = scraper.extract_links(listing['content'], f'{SITE}/news/', LISTING_CONFIG)
+    pages = await scraper.fetch_article_pages(links)
+    articles = scraper.parse_articles(pages, 7, 'news', LISTING_CONFIG)
+
+    # flood-relief is not on the mock site, so it is left out
+    assert [url for url, _ in pages] == links[:2]
+    assert [article['title'] for article in articles] == [
+        'ค่าฝุ่น PM2.5 เกินมาตรฐานหลายพื้นที่ในกรุงเทพฯ',
+        'กฟภ. เพิ่มสถานีอัดประจุไฟฟ้าอีกหนึ่งร้อยแห่ง',
+    ]
+
+    again = await scraper.fetch_page(f'{SITE}/news/', previous_hash=listing['body_hash'])
+    assert again['not_modified'] and again['content'] is None
+
+
+@pytest.mark.asyncio
+async def test_article_pages_past_deadline_left_out(monkeypatch):
+    async def fetch_page(url, track_failures=True, deadline=None):
+        if url.endswith('slow'):
+            await asyncio.sleep(10)
+        return {'content': url.encode()}
+
+    scraper = HTMLScraper()
+    monkeypatch.setattr(scraper, 'fetch_page', fetch_page)
+
+    urls = ['https://example.com/a', 'https://example.com/slow', 'https://example.com/b']
+    started = time.monotonic()
+    pages = await scraper.fetch_article_pages(urls, deadline=started + 0.2)
+
+    assert [url for url, _ in pages] == ['https://example.com/a', 'https://example.com/b']
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_dead_article_link_given_up_after_max_attempts(monkeypatch):
+    async def get_known_urls(urls):
+        return set()
+
+    monkeypatch.setattr(settings, 'parser_executor', 'inline')
+    monkeypatch.setattr(settings, 'html_article_max_attempts', 2)
+    service = ArticleService()
+    monkeypatch.setattr(service, 'get_known_urls', get_known_urls)
+    source = Source(id=7, name='Example', type='html', url=f'{SITE}/news/', category='news', language='th', config=LISTING_CONFIG)
+    dead = f'{SITE}/news/2024/11/flood-relief?ref=listing'
+
+    # flood-relief 404s: the listing validators are held back so it is retried
+    articles, listing = await service.fetch_source_articles(source)
+    assert len(articles) == 2 and listing['body_hash'] is None
+
+    # On its last attempt the validators advance
+    articles, listing = await service.fetch_source_articles(source)
+    assert listing['body_hash'] is not None
+    assert service.html_scraper.gave_up(dead)
+
+    # and later fetches of the listing skip it
+    requested = []
+    fetch_article_pages = service.html_scraper.fetch_article_pages
+
+    async def recording_fetch(urls, deadline=None):
+        requested.extend(urls)
+        return await fetch_article_pages(urls, deadline=deadline)
+
+    monkeypatch.setattr(service.html_scraper, 'fetch_article_pages', recording_fetch)
+    await service.fetch_source_articles(source)
+    assert dead not in requested and len(requested) == 2
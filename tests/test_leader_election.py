@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.services import webhook_service
+from app.services.leader_service import LeaderElection
+from app.services.scheduler_service import SchedulerService
+from app.services.webhook_service import WebhookNotifier
+
+LOCK_KEY = 7242999
+POLL_SECONDS = 0.5
+
+
+async def lock_holders(engine) -> int:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND objid = :key AND granted"),
+            {'key': LOCK_KEY}
+        )
+        return result.scalar()
+
+
+@pytest.mark.asyncio
+async def test_failover_to_follower(postgres_url):
+    # One engine per instance stands in for two worker processes
+    engines = [create_async_engine(postgres_url, poolclass=NullPool) for _ in range(3)]
+    first, second = (LeaderElection(LOCK_KEY, engine) for engine in engines[:2])
+    admin = engines[2]
+
+    try:
+        results = [await first.ensure_leadership(), await second.ensure_leadership()]
+        assert sorted(results) == [False, True]
+        assert await lock_holders(admin) == 1
+
+        leader, follower = (first, second) if results[0] else (second, first)
+        assert leader.is_leader and not follower.is_leader
+
+        # Kill the leader's connection from the server side, as if its process died
+        pid = (await leader._conn.execute(text("SELECT pg_backend_pid()"))).scalar()
+        async with admin.connect() as conn:
+            await conn.execute(text("SELECT pg_terminate_backend(:pid)"), {'pid': pid})
+
+        # The follower's next poll takes over
+        await asyncio.sleep(POLL_SECONDS)
+        assert await follower.ensure_leadership()
+        assert await lock_holders(admin) == 1
+
+        # The old leader notices its lock is gone and stays a follower
+        assert not await leader.ensure_leadership()
+        assert not leader.is_leader
+
+    finally:
+        await first.release()
+        await second.release()
+        for engine in engines:
+            await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_release_hands_over_immediately(postgres_url):
+    engines = [create_async_engine(postgres_url, poolclass=NullPool) for _ in range(2)]
+    first, second = (LeaderElection(LOCK_KEY, engine) for engine in engines)
+
+    try:
+        assert await first.ensure_leadership()
+        assert not await second.ensure_leadership()
+
+        await first.release()
+        assert await second.ensure_leadership()
+
+    finally:
+        await first.release()
+        await second.release()
+        for engine in engines:
+            await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_webhook_worker_stays_off_without_scheduler(monkeypatch):
+    async def ensure_leadership():
+        raise AssertionError("a process without the scheduler must not take the leader lock")
+
+    monkeypatch.setattr(settings, 'scheduler_enabled', False)
+    monkeypatch.setattr(webhook_service.leader_election, 'ensure_leadership', ensure_leadership)
+    notifier = WebhookNotifier()
+    notifier.enabled = True
+
+    await notifier.start()
+
+    assert notifier._task is None
+    await notifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_manual_fetch_runs_the_scheduled_job(monkeypatch):
+    runs = []
+
+    async def fetch_articles_job():
+        runs.append(True)
+
+    monkeypatch.setattr(settings, 'scheduler_enabled', True)
+    monkeypatch.setattr(settings, 'scheduler_tick_seconds', 3600)
+    service = SchedulerService()
+    assert not service.run_fetch_now()
+
+    # The job itself checks leadership, so a manual fetch cannot bypass the leader
+    monkeypatch.setattr(service, 'fetch_articles_job', fetch_articles_job)
+    service.start()
+    try:
+        assert service.run_fetch_now()
+        await asyncio.sleep(0.5)
+        assert runs == [True]
+    finally:
+        service.shutdown()
@@ -0,0 +1,85 @@
+import time
+
+import httpx
+import pytest
+
+from app.http_client import http_client
+from app.scraper import html_scraper, rate_limit
+from app.scraper.html_scraper import HTMLScraper
+from app.scraper.rate_limit import CircuitBreaker, request_with_retries
+from app.scraper.robots import robots_cache
+
+URL = 'https://example.com/news'
+
+
+@pytest.fixture(autouse=True)
+def no_host_spacing(monkeypatch):
+    monkeypatch.setattr(rate_limit.host_limiter, 'rate', None)
+
+
+@pytest.mark.asyncio
+async def test_attempt_timeout_capped_at_deadline():
+    timeouts = []
+
+    async def send(timeout):
+        timeouts.append(timeout)
+        return httpx.Response(200)
+
+    await request_with_retries(send, URL, timeout=30, deadline=time.monotonic() + 5)
+
+    assert len(timeouts) == 1
+    assert 4 < timeouts[0] <= 5
+
+
+@pytest.mark.asyncio
+async def test_no_retry_that_cannot_finish_by_deadline(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'backoff_seconds', lambda attempt: 2.0)
+    calls = 0
+
+    async def send(timeout):
+        nonlocal calls
+        calls += 1
+        raise httpx.ReadTimeout("timed out")
+
+    started = time.monotonic()
+    with pytest.raises(httpx.ReadTimeout):
+        await request_with_retries(send, URL, max_retries=3, timeout=30, deadline=started + 2.5)
+
+    assert calls == 1
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_retries_within_deadline(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'backoff_seconds', lambda attempt: 0.01)
+    statuses = iter([503, 503, 200])
+
+    async def send(timeout):
+        return httpx.Response(next(statuses))
+
+    response = await request_with_retries(send, URL, max_retries=3, deadline=time.monotonic() + 5)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_html_page_parked_on_long_retry_after(monkeypatch):
+    breakers = CircuitBreaker(failure_threshold=3)
+    monkeypatch.setattr(html_scraper, 'source_breakers', breakers)
+
+    async def can_fetch(url):
+        return True
+
+    monkeypatch.setattr(robots_cache, 'can_fetch', can_fetch)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(429, headers={'Retry-After': '3600'})
+    ))
+    monkeypatch.setattr(http_client, '_client', client)
+
+    try:
+        assert await HTMLScraper().fetch_page(URL) is None
+    finally:
+        await client.aclose()
+
+    assert breakers.open_until(URL) is not None
+    assert not breakers.allow(URL)
@@ -0,0 +1,42 @@
+import pytest
+
+from app.scraper.normalizer import DataNormalizer
+from app.scraper.thai_tokenizer import ThaiTokenizer, get_tokenizer
+
+
+@pytest.fixture
+def small_tokenizer(tmp_path):
+    """Tokenizer whose dictionary lacks the words under test"""
+    path = tmp_path / 'words.txt'
+    path.write_text('\n'.join(['มา', 'ละ', 'ใน', 'ประกาศ', 'รัฐบาล', 'ใหม่']), encoding='utf-8')
+    return ThaiTokenizer(str(path))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('มาตรฐาน', ['มาตรฐาน']),
+    ('ละออง', ['ละออง']),
+    ('ฝุ่นละอองเกินมาตรฐานในกรุงเทพมหานคร', ['ฝุ่นละออง', 'เกิน', 'มาตรฐาน', 'ใน', 'กรุงเทพมหานคร']),
+    ('กระทรวงสาธารณสุขเตือนประชาชน', ['กระทรวงสาธารณสุข', 'เตือน', 'ประชาชน']),
+])
+def test_common_words(text, expected):
+    assert get_tokenizer().tokenize(text) == expected
+
+
+def test_short_word_joins_unknown_run(small_tokenizer):
+    assert small_tokenizer.tokenize('มาตรฐาน') == ['มาตรฐาน']
+    assert small_tokenizer.tokenize('ละออง') == ['ละออง']
+
+
+def test_longer_word_before_unknown_run_stays_separate(small_tokenizer):
+    assert small_tokenizer.tokenize('รัฐบาลประกาศมาตรฐานใหม่') == ['รัฐบาล', 'ประกาศ', 'มาตรฐาน', 'ใหม่']
+
+
+def test_non_thai_runs_are_kept():
+    assert get_tokenizer().tokenize('ค่าฝุ่น PM2.5 สูง') == ['ค่า', 'ฝุ่น', 'PM2.5', 'สูง']
+
+
+def test_keywords_have_no_fragments():
+    keywords = DataNormalizer.extract_keywords('ฝุ่นละอองเกินมาตรฐาน ฝุ่นละอองเกินมาตรฐาน')
+    assert 'ฝุ่นละออง' in keywords
+    assert 'มาตรฐาน' in keywords
+    assert 'ออง' not in keywords and 'ตรฐาน' not in keywords
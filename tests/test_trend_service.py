@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.services.trend_service import TrendService, trend_day, trend_day_bounds
+
+# Around Bangkok midnight between 16 and 17 October (17:00 UTC)
+BOUNDARY_TIMES = [
+    datetime(2026, 10, 16, 16, 59, 59, tzinfo=timezone.utc),
+    datetime(2026, 10, 16, 17, 0, tzinfo=timezone.utc),
+    datetime(2026, 10, 16, 23, 30, tzinfo=timezone.utc),
+    datetime(2026, 10, 17, 0, 30, tzinfo=timezone.utc),
+    datetime(2026, 10, 16, 17, 0),  # naive, stored as UTC
+]
+
+
+@pytest.mark.parametrize('published_at', BOUNDARY_TIMES)
+def test_ingest_day_matches_reconcile_range(published_at):
+    day = trend_day(published_at)
+    start, end = trend_day_bounds(day)
+
+    aware = published_at if published_at.tzinfo else published_at.replace(tzinfo=timezone.utc)
+    assert start <= aware < end
+    assert end - start == timedelta(days=1)
+
+
+def test_articles_bucketed_by_trend_day():
+    articles = [
+        {'id': 1, 'published_at': BOUNDARY_TIMES[0], 'tags': ['ฝุ่น']},
+        {'id': 2, 'published_at': BOUNDARY_TIMES[1], 'tags': ['ฝุ่น']},
+    ]
+
+    assert TrendService._aggregate_keywords(articles) == {
+        (date(2026, 10, 16), 'ฝุ่น'): [1],
+        (date(2026, 10, 17), 'ฝุ่น'): [2],
+    }
+    assert TrendService._count_articles(articles) == {date(2026, 10, 16): 1, date(2026, 10, 17): 1}
+
+
+class RecordingSession:
+    """Stands in for AsyncSession, keeping the statements executed"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+
+
+@pytest.mark.asyncio
+async def test_counters_written_in_lock_order():
+    day = date(2026, 10, 16)
+    keyword_articles = {
+        (day, 'ฝุ่น'): [3],
+        (day - timedelta(days=1), 'น้ำท่วม'): [1],
+        (day, 'PM2.5'): [2],
+    }
+    db = RecordingSession()
+
+    await TrendService()._upsert_trends(db, keyword_articles)
+
+    rows = db.statements[0][0].compile().params
+    keys = [(rows[f'date_m{i}'], rows[f'keyword_m{i}']) for i in range(3)]
+    assert keys == sorted(keyword_articles)
+
+
+@pytest.mark.asyncio
+async def test_tag_changes_lock_before_writing(monkeypatch):
+    async def score_trends(db, target_date, keywords=None):
+        return None
+
+    published_at = datetime(2026, 10, 16, 3, 0, tzinfo=timezone.utc)
+    changes = [
+        {'id': 2, 'published_at': published_at, 'old_tags': ['ฝุ่น', 'PM2.5'], 'tags': ['อากาศ']},
+        {'id': 1, 'published_at': published_at, 'old_tags': ['ฝุ่น'], 'tags': []},
+    ]
+    service = TrendService()
+    monkeypatch.setattr(service, 'score_trends', score_trends)
+    db = RecordingSession()
+
+    await service.update_article_tags(db, changes)
+
+    lock, _ = db.statements[0]
+    assert 'FOR UPDATE' in str(lock)
+    _, removed = db.statements[1]
+    assert [(row['b_keyword'], row['b_id']) for row in removed] == [('PM2.5', 2), ('ฝุ่น', 1), ('ฝุ่น', 2)]